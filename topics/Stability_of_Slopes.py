@@ -4,42 +4,44 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import math
+import os
+import time
+
+from topics import slope_engine
+from topics.slope_engine import calculate_infinite_slope
 
 # =========================================================
 # HELPER FUNCTIONS
 # =========================================================
-def calculate_infinite_slope(beta, phi, c, gamma, gamma_sat, z, u, case):
-    beta_r = math.radians(beta)
-    phi_r = math.radians(phi)
-    
-    if case == "Dry Cohesionless (Sand)":
-        if beta > 0:
-            fs = math.tan(phi_r) / math.tan(beta_r)
-            formula = r"FS = \frac{\tan \phi'}{\tan \beta}"
-        else:
-            return 999.0, "Stable (Flat)"
-            
-    elif case == "Seepage Parallel to Slope":
-        gamma_w = 9.81
-        gamma_prime = gamma_sat - gamma_w
-        if beta > 0:
-            fs = (gamma_prime / gamma_sat) * (math.tan(phi_r) / math.tan(beta_r))
-            formula = r"FS = \frac{\gamma'}{\gamma_{sat}} \frac{\tan \phi'}{\tan \beta}"
-        else:
-            return 999.0, "Stable"
-            
-    else: # Cohesive
-        sigma_n = gamma * z * (math.cos(beta_r)**2)
-        tau_mob = gamma * z * math.sin(beta_r) * math.cos(beta_r)
-        resisting = c + (sigma_n - u) * math.tan(phi_r)
-        
-        if tau_mob > 0.001:
-            fs = resisting / tau_mob
-            formula = r"FS = \frac{c' + (\gamma z \cos^2\beta - u)\tan\phi'}{\gamma z \sin\beta \cos\beta}"
-        else:
-            return 999.0, "Stable (Flat)"
-            
-    return fs, formula
+def distribution_input(label, key, mean, std, low=None, high=None):
+    """Renders distribution inputs for one random variable and returns its spec."""
+    c1, c2, c3 = st.columns([1.2, 1, 1])
+    dist = c1.selectbox(label, ["Constant", "Normal", "Lognormal", "Truncated"], index=1, key=f"{key}_dist")
+    m = c2.number_input("Mean", value=float(mean), key=f"{key}_mean")
+    s = c3.number_input("Std. Dev.", 0.0, value=float(std), key=f"{key}_std", disabled=(dist == "Constant"))
+    spec = {"dist": dist.lower(), "mean": m, "std": s}
+    if dist == "Truncated":
+        t1, t2 = st.columns(2)
+        spec["low"] = t1.number_input("Lower Bound", value=float(low if low is not None else m - 2 * s), key=f"{key}_low")
+        spec["high"] = t2.number_input("Upper Bound", value=float(high if high is not None else m + 2 * s), key=f"{key}_high")
+    return spec
+
+def seismic_input(key):
+    """Renders optional pseudo-static coefficient inputs and returns (kh, kv)."""
+    if not st.checkbox("Pseudo-Static Seismic Load", key=f"{key}_seismic"):
+        return 0.0, 0.0
+    s1, s2 = st.columns(2)
+    kh = s1.number_input("k_h (downslope)", 0.0, 1.0, 0.1, step=0.01, key=f"{key}_kh")
+    kv = s2.number_input("k_v (upward)", -0.5, 0.5, 0.0, step=0.01, key=f"{key}_kv")
+    return kh, kv
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def fs_design_grid(case, y_param, beta_lim, y_lim, n_pts, phi, c, gamma, gamma_sat, z, u):
+    """Cached FS design grid, keyed on the fixed inputs and the sweep ranges."""
+    beta_vals = np.linspace(beta_lim[0], beta_lim[1], n_pts)
+    y_vals = np.linspace(y_lim[0], y_lim[1], n_pts)
+    fs = slope_engine.infinite_slope_grid(case, beta_vals, y_vals, y_param, phi, c, gamma, gamma_sat, z, u)
+    return beta_vals, y_vals, np.array(fs)
 
 # =========================================================
 # MAIN APP
@@ -47,10 +49,11 @@ def calculate_infinite_slope(beta, phi, c, gamma, gamma_sat, z, u, case):
 def app():
 
     
-    tab_trans, tab_rot, tab_comp = st.tabs([
+    tab_trans, tab_rot, tab_comp, tab_seis = st.tabs([
         "1. Translational (Infinite)", 
         "2. Rotational (Circular)", 
-        "3. Compound (Block)"
+        "3. Compound (Block)",
+        "4. Seismic (Newmark)"
     ])
 
     # ---------------------------------------------------------
@@ -84,6 +87,7 @@ def app():
                 if st.checkbox("Include Pore Pressure?", key="trans_check_u"):
                     u_val = st.number_input("Pore Pressure (u) [kPa]", 0.0, 100.0, 20.0, key="trans_u")
 
+            kh_t, kv_t = seismic_input("trans")
             calc_t = st.button("Calculate FS", type="primary", key="btn_calc_translational")
 
         with col_t2:
@@ -111,7 +115,7 @@ def app():
             st.pyplot(fig_t)
             
             if calc_t:
-                fs_val, form_tex = calculate_infinite_slope(beta, phi_prime, c_prime, gamma, gamma_sat, z, u_val, soil_case)
+                fs_val, form_tex = calculate_infinite_slope(beta, phi_prime, c_prime, gamma, gamma_sat, z, u_val, soil_case, kh_t, kv_t)
                 st.latex(form_tex)
                 if fs_val < 1.0:
                     st.error(f"**FS = {fs_val:.2f} (Unstable)**")
@@ -120,6 +124,103 @@ def app():
                 else:
                     st.success(f"**FS = {fs_val:.2f} (Stable)**")
 
+        st.markdown("---")
+        with st.expander("Monte Carlo Reliability Analysis"):
+            st.caption(f"Random inputs for the selected condition: **{soil_case}**. FS is evaluated for all samples at once, in chunks.")
+            col_mc1, col_mc2 = st.columns([0.45, 0.55], gap="medium")
+
+            with col_mc1:
+                mc_params = {"z": z}
+                mc_params["beta"] = distribution_input("Slope Angle β [deg]", "mc_beta", beta, 2.0, 0.5, 60.0)
+                mc_params["phi"] = distribution_input("Friction Angle ϕ' [deg]", "mc_phi", phi_prime, 3.0, 0.0, 45.0)
+                if soil_case == "Seepage Parallel to Slope":
+                    mc_params["gamma"] = distribution_input("Saturated Unit Weight γ_sat [kN/m³]", "mc_gsat", gamma_sat, 1.0)
+                elif soil_case == "Cohesive Soil (c-ϕ)":
+                    mc_params["c"] = distribution_input("Cohesion c' [kPa]", "mc_c", c_prime, 3.0, 0.0)
+                    mc_params["gamma"] = distribution_input("Unit Weight γ [kN/m³]", "mc_gamma", gamma, 1.0)
+                    mc_params["water_depth"] = distribution_input("Water Table Depth d_w [m]", "mc_dw", z, 1.0, 0.0, z)
+
+                m1, m2, m3 = st.columns(3)
+                n_mc = m1.number_input("Samples", 1000, 10_000_000, 1_000_000, step=100_000, key="mc_n")
+                chunk_mc = m2.number_input("Chunk Size", 1000, 1_000_000, 100_000, step=10_000, key="mc_chunk")
+                seed_mc = m3.number_input("Random Seed", 0, 2**31 - 1, 42, key="mc_seed")
+                calc_mc = st.button("Run Monte Carlo", type="primary", key="btn_calc_mc")
+
+            with col_mc2:
+                if calc_mc:
+                    try:
+                        mc = slope_engine.monte_carlo_infinite_slope(soil_case, mc_params, int(n_mc), int(chunk_mc), int(seed_mc))
+                    except ValueError as e:
+                        st.error(f"Invalid distribution: {e}")
+                    else:
+                        r1, r2, r3 = st.columns(3)
+                        r1.metric("Probability of Failure", f"{mc['pf']:.2e}")
+                        r2.metric("Reliability Index β", f"{mc['beta']:.2f}")
+                        r3.metric("Mean FS (σ)", f"{mc['mean']:.2f} ({mc['std']:.2f})")
+                        st.latex(r"P_f = P(FS < 1), \quad \beta = \frac{\mu_{FS} - 1}{\sigma_{FS}}")
+
+                        fig_mc, ax_mc = plt.subplots(figsize=(6, 3.5))
+                        edges = mc["hist_edges"]
+                        dens = mc["hist_counts"] / (mc["n"] * np.diff(edges))
+                        colors = ['#E57373' if e < 1.0 else '#81C784' for e in edges[:-1]]
+                        ax_mc.bar(edges[:-1], dens, width=np.diff(edges), align='edge', color=colors, edgecolor='none')
+                        ax_mc.axvline(1.0, color='red', linestyle='--', linewidth=1.5, label="FS = 1")
+                        ax_mc.set_xlabel("Factor of Safety")
+                        ax_mc.set_ylabel("Probability Density")
+                        ax_mc.legend()
+                        st.pyplot(fig_mc)
+                        st.caption(f"{mc['n']:,} samples (seed {int(seed_mc)}); FS outside {edges[0]:.0f}–{edges[-1]:.0f} is binned at the ends.")
+
+        with st.expander("FS Design Charts (Parametric Sweep)"):
+            st.caption("FS over a grid of slope angle × failure depth (or water table ratio), using the inputs above as fixed values.")
+            col_dc1, col_dc2 = st.columns([0.35, 0.65], gap="medium")
+
+            with col_dc1:
+                y_choice = st.radio("Y-Axis Parameter:", ["Failure Depth z", "Water Table Ratio m"], key="dc_y")
+                y_param = "z" if "Depth" in y_choice else "m"
+                y_label = "Failure Depth z [m]" if y_param == "z" else "Water Table Ratio m = h_w / z"
+                beta_lim = st.slider("Slope Angle Range β [deg]", 1.0, 60.0, (10.0, 45.0), key="dc_beta")
+                if y_param == "z":
+                    y_lim = st.slider("Depth Range z [m]", 0.5, 20.0, (1.0, 10.0), key="dc_z")
+                else:
+                    y_lim = st.slider("Water Table Ratio Range m", 0.0, 1.0, (0.0, 1.0), key="dc_m")
+                n_grid = st.number_input("Grid Points per Axis", 10, 500, 150, key="dc_n")
+                # Keep both ranges non-degenerate for the grid and read-off sliders
+                beta_lim = (beta_lim[0], max(beta_lim[1], beta_lim[0] + 0.5))
+                y_lim = (y_lim[0], max(y_lim[1], y_lim[0] + 0.05))
+
+                beta_vals, y_vals, fs_grid = fs_design_grid(soil_case, y_param, beta_lim, y_lim, int(n_grid),
+                                                            phi_prime, c_prime, gamma, gamma_sat, z, u_val)
+
+                st.markdown("**Read-off Point**")
+                beta_pick = st.slider("β [deg]", beta_lim[0], beta_lim[1], float(np.mean(beta_lim)), key="dc_pick_beta")
+                y_pick = st.slider(y_label, float(y_lim[0]), float(y_lim[1]), float(np.mean(y_lim)), key="dc_pick_y")
+
+            with col_dc2:
+                fig_dc, ax_dc = plt.subplots(figsize=(7, 5))
+                fs_plot = np.clip(fs_grid, 0, 3.0)
+                cf = ax_dc.contourf(beta_vals, y_vals, fs_plot, levels=np.linspace(0, 3.0, 31), cmap='RdYlGn')
+                cs = ax_dc.contour(beta_vals, y_vals, fs_grid, levels=[1.0, 1.5], colors=['red', 'black'], linewidths=[2, 1.5])
+                ax_dc.clabel(cs, fmt={1.0: "FS=1.0", 1.5: "FS=1.5"}, fontsize=8)
+                ax_dc.plot(beta_pick, y_pick, 'k*', markersize=12)
+                fig_dc.colorbar(cf, ax=ax_dc, label="FS (clipped at 3)")
+                ax_dc.set_xlabel("Slope Angle β [deg]")
+                ax_dc.set_ylabel(y_label)
+                ax_dc.set_title(f"FS Design Chart – {soil_case}")
+                st.pyplot(fig_dc)
+
+                i_b = int(np.abs(beta_vals - beta_pick).argmin())
+                i_y = int(np.abs(y_vals - y_pick).argmin())
+                st.write(f"**FS at β = {beta_vals[i_b]:.1f}°, {y_label.split(' [')[0]} = {y_vals[i_y]:.2f}:** {fs_grid[i_y, i_b]:.3f}")
+
+                grid_df = pd.DataFrame({
+                    "Slope Angle β (deg)": np.tile(beta_vals, len(y_vals)),
+                    y_label: np.repeat(y_vals, len(beta_vals)),
+                    "FS": fs_grid.ravel(),
+                })
+                st.download_button("Download Grid (CSV)", grid_df.to_csv(index=False).encode("utf-8"),
+                                   file_name=f"fs_design_grid_{y_param}.csv", mime="text/csv", key="dc_csv")
+
     # ---------------------------------------------------------
     # TAB 2: ROTATIONAL (CIRCULAR)
     # ---------------------------------------------------------
@@ -133,240 +234,767 @@ def app():
         
         # --- A. MASS PROCEDURE ---
         if "Mass Procedure" in method:
-            col_r1, col_r2 = st.columns([0.4, 0.6], gap="medium")
+            circle_mode = st.radio("Failure Circle:", ["Manual (Single Circle)", "Automatic Critical-Circle Search"],
+                                   horizontal=True, key="mass_circle_mode")
+
+            if "Manual" in circle_mode:
+                col_r1, col_r2 = st.columns([0.4, 0.6], gap="medium")
             
-            with col_r1:
-                st.subheader("1. Geometry & Loads")
-                H_slope = st.number_input("Slope Height (H) [m]", 1.0, 50.0, 8.5, key="mass_H")
-                beta_slope = st.number_input("Slope Angle [deg]", 0.0, 90.0, 45.0, key="mass_beta")
+                with col_r1:
+                    st.subheader("1. Geometry & Loads")
+                    H_slope = st.number_input("Slope Height (H) [m]", 1.0, 50.0, 8.5, key="mass_H")
+                    beta_slope = st.number_input("Slope Angle [deg]", 0.0, 90.0, 45.0, key="mass_beta")
                 
-                st.markdown("**Failure Circle**")
-                R = st.number_input("Radius (R) [m]", 5.0, 50.0, 12.1, key="mass_R")
-                dist_d = st.number_input("Moment Arm (d) [m]", 0.0, 20.0, 4.5, help="Horizontal distance from Center O to Centroid", key="mass_d")
+                    st.markdown("**Failure Circle**")
+                    R = st.number_input("Radius (R) [m]", 5.0, 50.0, 12.1, key="mass_R")
+                    dist_d = st.number_input("Moment Arm (d) [m]", 0.0, 20.0, 4.5, help="Horizontal distance from Center O to Centroid", key="mass_d")
                 
-                st.subheader("2. Soil Properties")
-                gamma_clay = st.number_input("Unit Weight (γ) [kN/m³]", 10.0, 25.0, 19.0, key="mass_gamma")
-                Cu = st.number_input("Undrained Shear Strength (Cu) [kPa]", 10.0, 200.0, 65.0, key="mass_cu")
+                    st.subheader("2. Soil Properties")
+                    gamma_clay = st.number_input("Unit Weight (γ) [kN/m³]", 10.0, 25.0, 19.0, key="mass_gamma")
+                    Cu = st.number_input("Undrained Shear Strength (Cu) [kPa]", 10.0, 200.0, 65.0, key="mass_cu")
                 
-                st.caption("Weight Calculation:")
-                area_approx = st.number_input("Area of Sliding Mass [m²]", 1.0, 500.0, 70.0, key="mass_area")
-                W_calc = area_approx * gamma_clay
-                st.write(f"Weight (W) = {W_calc:.1f} kN/m")
+                    st.caption("Weight Calculation:")
+                    area_approx = st.number_input("Area of Sliding Mass [m²]", 1.0, 500.0, 70.0, key="mass_area")
+                    W_calc = area_approx * gamma_clay
+                    st.write(f"Weight (W) = {W_calc:.1f} kN/m")
                 
-                calc_rot = st.button("Calculate FS (Mass Procedure)", type="primary", key="btn_calc_mass")
+                    kh_m, kv_m = seismic_input("mass")
+                    calc_rot = st.button("Calculate FS (Mass Procedure)", type="primary", key="btn_calc_mass")
 
-            with col_r2:
-                st.subheader("Failure Diagram")
-                fig_c, ax_c = plt.subplots(figsize=(8, 6))
+                with col_r2:
+                    st.subheader("Failure Diagram")
+                    fig_c, ax_c = plt.subplots(figsize=(8, 6))
                 
-                # 1. Slope Geometry
-                # Use standard variable names X_crest and Y_crest
-                X_crest = H_slope / math.tan(math.radians(beta_slope)) if beta_slope > 0 else 10
-                Y_crest = H_slope
+                    # 1. Slope Geometry
+                    # Use standard variable names X_crest and Y_crest
+                    X_crest = H_slope / math.tan(math.radians(beta_slope)) if beta_slope > 0 else 10
+                    Y_crest = H_slope
                 
-                ground_x = [-10, 0, X_crest, X_crest + 10]
-                ground_y = [0, 0, Y_crest, Y_crest]
+                    ground_x = [-10, 0, X_crest, X_crest + 10]
+                    ground_y = [0, 0, Y_crest, Y_crest]
                 
-                ax_c.plot(ground_x, ground_y, 'k-', linewidth=2.5, label="Ground Surface")
+                    ax_c.plot(ground_x, ground_y, 'k-', linewidth=2.5, label="Ground Surface")
                 
-                # 2. Failure Circle (Arc)
-                o_x = -2.0 
-                o_y = math.sqrt(R**2 - o_x**2) 
+                    # 2. Failure Circle (Arc)
+                    o_x = -2.0 
+                    o_y = math.sqrt(R**2 - o_x**2) 
                 
-                # Calculate Intersection with Crest
-                term = R**2 - (Y_crest - o_y)**2
+                    # Calculate Intersection with Crest
+                    term = R**2 - (Y_crest - o_y)**2
                 
-                if term > 0:
-                    x_intersect = o_x + math.sqrt(term)
+                    if term > 0:
+                        x_intersect = o_x + math.sqrt(term)
                     
-                    theta_start = math.atan2(0 - o_y, 0 - o_x)
-                    theta_end = math.atan2(Y_crest - o_y, x_intersect - o_x)
+                        theta_start = math.atan2(0 - o_y, 0 - o_x)
+                        theta_end = math.atan2(Y_crest - o_y, x_intersect - o_x)
                     
-                    thetas = np.linspace(theta_start, theta_end, 50)
-                    arc_x = o_x + R * np.cos(thetas)
-                    arc_y = o_y + R * np.sin(thetas)
+                        thetas = np.linspace(theta_start, theta_end, 50)
+                        arc_x = o_x + R * np.cos(thetas)
+                        arc_y = o_y + R * np.sin(thetas)
                     
-                    # 3. Create the "Wedge" Polygon (Hatched)
-                    poly_verts = list(zip(arc_x, arc_y))
-                    poly_verts.append((X_crest, Y_crest)) 
-                    poly_verts.append((0, 0)) 
+                        # 3. Create the "Wedge" Polygon (Hatched)
+                        poly_verts = list(zip(arc_x, arc_y))
+                        poly_verts.append((X_crest, Y_crest)) 
+                        poly_verts.append((0, 0)) 
                     
-                    soil_mass = patches.Polygon(poly_verts, closed=True, facecolor='none', edgecolor='black', hatch='//', alpha=0.5)
-                    ax_c.add_patch(soil_mass)
-                    ax_c.plot(arc_x, arc_y, 'k-', linewidth=1.5)
+                        soil_mass = patches.Polygon(poly_verts, closed=True, facecolor='none', edgecolor='black', hatch='//', alpha=0.5)
+                        ax_c.add_patch(soil_mass)
+                        ax_c.plot(arc_x, arc_y, 'k-', linewidth=1.5)
                     
-                    # Calculate Arc Length
-                    theta_deg = math.degrees(theta_end - theta_start)
-                    L_calc = (theta_deg/360) * 2 * math.pi * R
-                else:
-                    L_calc = 0
-                    st.error("Geometry Error: Circle does not intersect crest or R is too small.")
+                        # Calculate Arc Length
+                        theta_deg = math.degrees(theta_end - theta_start)
+                        L_calc = (theta_deg/360) * 2 * math.pi * R
+                    else:
+                        L_calc = 0
+                        st.error("Geometry Error: Circle does not intersect crest or R is too small.")
 
-                # Annotations
-                ax_c.plot(o_x, o_y, 'bo', label="O")
-                ax_c.plot([o_x, 0], [o_y, 0], 'b--', linewidth=1)
-                ax_c.text(o_x/2, o_y/2, f"R={R}m", color='blue', rotation=60)
+                    # Annotations
+                    ax_c.plot(o_x, o_y, 'bo', label="O")
+                    ax_c.plot([o_x, 0], [o_y, 0], 'b--', linewidth=1)
+                    ax_c.text(o_x/2, o_y/2, f"R={R}m", color='blue', rotation=60)
                 
-                X_w = o_x + dist_d
-                Y_w = Y_crest / 2 
-                ax_c.plot([o_x, o_x], [o_y, o_y+2], 'k-', linewidth=0.5)
-                ax_c.plot([X_w, X_w], [Y_w, o_y+2], 'k-', linewidth=0.5)
-                ax_c.annotate(f"d={dist_d}m", xy=(o_x, o_y+1.5), xytext=(X_w, o_y+1.5), arrowprops=dict(arrowstyle='<->'))
+                    X_w = o_x + dist_d
+                    Y_w = Y_crest / 2 
+                    ax_c.plot([o_x, o_x], [o_y, o_y+2], 'k-', linewidth=0.5)
+                    ax_c.plot([X_w, X_w], [Y_w, o_y+2], 'k-', linewidth=0.5)
+                    ax_c.annotate(f"d={dist_d}m", xy=(o_x, o_y+1.5), xytext=(X_w, o_y+1.5), arrowprops=dict(arrowstyle='<->'))
                 
-                ax_c.arrow(X_w, Y_w, 0, -3, head_width=0.5, color='black', width=0.1)
-                ax_c.text(X_w + 0.5, Y_w - 3, "W", fontweight='bold')
-
-                ax_c.set_aspect('equal')
-                ax_c.set_xlim(-5, X_crest + 10)
-                ax_c.set_ylim(-2, o_y + 5)
-                ax_c.axis('off')
-                st.pyplot(fig_c)
+                    ax_c.arrow(X_w, Y_w, 0, -3, head_width=0.5, color='black', width=0.1)
+                    ax_c.text(X_w + 0.5, Y_w - 3, "W", fontweight='bold')
+
+                    ax_c.set_aspect('equal')
+                    ax_c.set_xlim(-5, X_crest + 10)
+                    ax_c.set_ylim(-2, o_y + 5)
+                    ax_c.axis('off')
+                    st.pyplot(fig_c)
                 
-                if calc_rot:
-                    M_res = Cu * L_calc * R
-                    M_drv = W_calc * dist_d
+                    if calc_rot:
+                        M_res = Cu * L_calc * R
+                        # Horizontal inertia acts at the centroid, taken at mid-height of the slope as drawn
+                        M_drv = W_calc * ((1 - kv_m) * dist_d + kh_m * (o_y - Y_w))
                     
-                    if M_drv > 0:
-                        FS = M_res / M_drv
-                        st.markdown("### Results")
-                        st.latex(r"FS = \frac{C_u \cdot L_{arc} \cdot R}{W \cdot d}")
-                        st.write(f"**L_arc:** {L_calc:.2f} m")
-                        st.write(f"**Resisting Moment:** {M_res:.1f} kNm")
-                        st.write(f"**Driving Moment:** {M_drv:.1f} kNm")
-                        if FS < 1.0: st.error(f"**FS = {FS:.2f} (Unstable)**")
-                        else: st.success(f"**FS = {FS:.2f} (Stable)**")
+                        if M_drv > 0:
+                            FS = M_res / M_drv
+                            st.markdown("### Results")
+                            if kh_m or kv_m:
+                                st.latex(r"FS = \frac{C_u \cdot L_{arc} \cdot R}{(1-k_v) W d + k_h W d_v}")
+                                st.caption(f"Seismic lever arm d_v = {o_y - Y_w:.2f} m (centroid at mid-height).")
+                            else:
+                                st.latex(r"FS = \frac{C_u \cdot L_{arc} \cdot R}{W \cdot d}")
+                            st.write(f"**L_arc:** {L_calc:.2f} m")
+                            st.write(f"**Resisting Moment:** {M_res:.1f} kNm")
+                            st.write(f"**Driving Moment:** {M_drv:.1f} kNm")
+                            if FS < 1.0: st.error(f"**FS = {FS:.2f} (Unstable)**")
+                            else: st.success(f"**FS = {FS:.2f} (Stable)**")
+
+            else:
+                col_a1, col_a2 = st.columns([0.4, 0.6], gap="medium")
+
+                with col_a1:
+                    st.subheader("1. Geometry & Soil")
+                    H_s = st.number_input("Slope Height (H) [m]", 1.0, 50.0, 8.5, key="search_H")
+                    beta_s = st.number_input("Slope Angle [deg]", 1.0, 90.0, 45.0, key="search_beta")
+                    gamma_s = st.number_input("Unit Weight (γ) [kN/m³]", 10.0, 25.0, 19.0, key="search_gamma")
+                    cu_s = st.number_input("Undrained Shear Strength (Cu) [kPa]", 10.0, 200.0, 65.0, key="search_cu")
+
+                    X_crest_s = H_s / math.tan(math.radians(beta_s))
+                    extent_s = max(10.0, 3 * H_s)
+                    ground_x_s, ground_y_s = slope_engine.build_ground_profile(H_s, beta_s, extent_s)
+
+                    st.subheader("2. Search Grid")
+                    g1, g2 = st.columns(2)
+                    xc_min = g1.number_input("Centre x min [m]", value=round(-0.5 * H_s, 1), key="search_xc_min")
+                    xc_max = g2.number_input("Centre x max [m]", value=round(X_crest_s + 0.5 * H_s, 1), key="search_xc_max")
+                    yc_min = g1.number_input("Centre y min [m]", value=round(1.0 * H_s, 1), key="search_yc_min")
+                    yc_max = g2.number_input("Centre y max [m]", value=round(3.0 * H_s, 1), key="search_yc_max")
+                    yt_min = g1.number_input("Circle bottom min [m]", value=round(-0.5 * H_s, 1), key="search_yt_min",
+                                             help="Lowest elevation reached by the trial circles (R = y_c - y_bottom).")
+                    yt_max = g2.number_input("Circle bottom max [m]", value=round(0.5 * H_s, 1), key="search_yt_max")
+                    n_x = g1.number_input("Centres in x", 5, 200, 50, key="search_nx")
+                    n_y = g2.number_input("Centres in y", 5, 200, 50, key="search_ny")
+                    n_r = st.number_input("Radii per Centre", 1, 100, 20, key="search_nr")
+
+                    kh_s, kv_s = seismic_input("search")
+                    calc_search = st.button("Search Critical Circle", type="primary", key="btn_search_mass")
+
+                with col_a2:
+                    st.subheader("Critical Circle")
+                    if calc_search:
+                        res = slope_engine.critical_circle_search(
+                            ground_x_s, ground_y_s, gamma_s, cu_s,
+                            (xc_min, xc_max), (yc_min, yc_max), (yt_min, yt_max),
+                            int(n_x), int(n_y), int(n_r), kh=kh_s, kv=kv_s
+                        )
+                        best = res["best"]
+
+                        if best is None:
+                            st.error("No admissible circle in the search grid. Widen the centre grid or circle depths.")
+                        else:
+                            fig_s, (ax_g, ax_m) = plt.subplots(1, 2, figsize=(11, 4.5), gridspec_kw={'width_ratios': [1.3, 1]})
+
+                            ax_g.plot(ground_x_s, ground_y_s, 'k-', linewidth=2.5)
+                            thetas = np.linspace(np.pi, 2 * np.pi, 200)
+                            arc_x = best["xc"] + best["R"] * np.cos(thetas)
+                            arc_y = best["yc"] + best["R"] * np.sin(thetas)
+                            below = arc_y <= np.interp(arc_x, ground_x_s, ground_y_s)
+                            ax_g.plot(arc_x[below], arc_y[below], 'r-', linewidth=2, label=f"Critical (FS={best['fs']:.2f})")
+                            ax_g.plot(best["xc"], best["yc"], 'ro')
+                            ax_g.add_patch(patches.Rectangle((xc_min, yc_min), xc_max - xc_min, yc_max - yc_min,
+                                                             fill=False, edgecolor='blue', linestyle='--', label="Centre Grid"))
+                            ax_g.set_aspect('equal')
+                            ax_g.set_xlim(min(ground_x_s[0], xc_min) - 1, max(ground_x_s[-1], xc_max) + 1)
+                            ax_g.legend(loc='lower right', fontsize=8)
+                            ax_g.axis('off')
+
+                            XX, YY = np.meshgrid(res["xc"], res["yc"])
+                            fs_map = np.ma.masked_invalid(res["fs_map"])
+                            cf = ax_m.contourf(XX, YY, fs_map, levels=20, cmap='RdYlGn')
+                            ax_m.contour(XX, YY, fs_map, levels=[1.0, 1.5], colors='black', linewidths=1)
+                            ax_m.plot(best["xc"], best["yc"], 'k*', markersize=12)
+                            fig_s.colorbar(cf, ax=ax_m, label="Min FS over radii")
+                            ax_m.set_xlabel("Centre x [m]")
+                            ax_m.set_ylabel("Centre y [m]")
+                            ax_m.set_title("FS Contours (Centre Grid)")
+                            st.pyplot(fig_s)
+
+                            st.markdown("### Results")
+                            st.latex(r"FS = \frac{C_u \cdot L_{arc} \cdot R}{W \cdot d}")
+                            st.write(f"**Centre O:** ({best['xc']:.2f}, {best['yc']:.2f}) m, **R:** {best['R']:.2f} m")
+                            st.write(f"**Area:** {best['area']:.2f} m², **W:** {best['W']:.1f} kN/m, **d:** {best['d']:.2f} m, **L_arc:** {best['L_arc']:.2f} m")
+                            st.caption(f"{res['fs'].size:,} trial circles, {np.count_nonzero(~np.isnan(res['fs'])):,} admissible.")
+                            if best["fs"] < 1.0: st.error(f"**FS_min = {best['fs']:.2f} (Unstable)**")
+                            else: st.success(f"**FS_min = {best['fs']:.2f} (Stable)**")
 
         # --- B. METHOD OF SLICES ---
         else:
             col_s1, col_s2 = st.columns([0.4, 0.6], gap="medium")
             with col_s1:
-                st.subheader("Global Parameters")
-                c_sl = st.number_input("Cohesion (c') [kPa]", 0.0, 100.0, 5.0, key="slice_c")
-                phi_sl = st.number_input("Friction Angle (ϕ') [deg]", 0.0, 45.0, 30.0, key="slice_phi")
-                
-                default_data = pd.DataFrame([
-                    {"Slice": 1, "Weight (kN)": 150, "Base Angle α (deg)": -10, "Base Length l (m)": 2.5, "u (kPa)": 0},
-                    {"Slice": 2, "Weight (kN)": 250, "Base Angle α (deg)": 10, "Base Length l (m)": 2.5, "u (kPa)": 15},
-                    {"Slice": 3, "Weight (kN)": 200, "Base Angle α (deg)": 35, "Base Length l (m)": 2.8, "u (kPa)": 10},
-                ])
-                edited_df = st.data_editor(default_data, num_rows="dynamic", key="slice_editor")
-                calc_slices = st.button("Calculate FS (Ordinary Method)", type="primary", key="btn_calc_slices")
+                slice_source = st.radio("Slice Data:", ["Manual Table", "Generate from Geometry"],
+                                        horizontal=True, key="slice_source")
+                geo_slices = None
+                calc_search_sl = calc_noncirc = False
+
+                if slice_source == "Manual Table":
+                    st.subheader("Global Parameters")
+                    c_sl = st.number_input("Cohesion (c') [kPa]", 0.0, 100.0, 5.0, key="slice_c")
+                    phi_sl = st.number_input("Friction Angle (ϕ') [deg]", 0.0, 45.0, 30.0, key="slice_phi")
+
+                    default_data = pd.DataFrame([
+                        {"Slice": 1, "Weight (kN)": 150, "Base Angle α (deg)": -10, "Base Length l (m)": 2.5, "u (kPa)": 0},
+                        {"Slice": 2, "Weight (kN)": 250, "Base Angle α (deg)": 10, "Base Length l (m)": 2.5, "u (kPa)": 15},
+                        {"Slice": 3, "Weight (kN)": 200, "Base Angle α (deg)": 35, "Base Length l (m)": 2.8, "u (kPa)": 10},
+                    ])
+                    edited_df = st.data_editor(default_data, num_rows="dynamic", key="slice_editor")
+                else:
+                    st.markdown("**Slope & Circle**")
+                    g1, g2 = st.columns(2)
+                    H_g = g1.number_input("Slope Height (H) [m]", 1.0, 50.0, 8.5, key="geo_H")
+                    beta_g = g2.number_input("Slope Angle [deg]", 1.0, 90.0, 45.0, key="geo_beta")
+                    xc_g = g1.number_input("Centre x [m]", -50.0, 100.0, 2.0, key="geo_xc")
+                    yc_g = g2.number_input("Centre y [m]", -20.0, 100.0, 12.0, key="geo_yc")
+                    R_g = g1.number_input("Radius (R) [m]", 0.5, 150.0, 13.0, key="geo_R")
+                    n_sl = g2.number_input("Number of Slices", 3, 1000, 20, key="geo_n")
+
+                    ground_x, ground_y = slope_engine.build_ground_profile(H_g, beta_g, max(10.0, 3 * H_g))
+
+                    st.markdown("**Stratigraphy**")
+                    st.caption("Layers top-down. Layer 1 starts at the ground surface; each lower layer's top boundary "
+                               "runs linearly from the left to the right end of the section.")
+                    default_layers = pd.DataFrame([
+                        {"Layer": 1, "Top Left (m)": None, "Top Right (m)": None, "c' (kPa)": 5.0, "ϕ' (deg)": 30.0, "γ (kN/m³)": 19.0, "γ_sat (kN/m³)": 20.0},
+                        {"Layer": 2, "Top Left (m)": -0.5, "Top Right (m)": -0.5, "c' (kPa)": 10.0, "ϕ' (deg)": 20.0, "γ (kN/m³)": 18.0, "γ_sat (kN/m³)": 19.0},
+                    ])
+                    layer_df = st.data_editor(default_layers, num_rows="dynamic", key="geo_layers")
+                    layer_df = layer_df.dropna(subset=["c' (kPa)", "ϕ' (deg)", "γ (kN/m³)"]).reset_index(drop=True)
+                    layers_sl = []
+                    for k, row in enumerate(layer_df.to_dict("records")):
+                        lay = {"c": row["c' (kPa)"], "phi": row["ϕ' (deg)"], "gamma": row["γ (kN/m³)"],
+                               "gamma_sat": row["γ_sat (kN/m³)"] if pd.notna(row["γ_sat (kN/m³)"]) else row["γ (kN/m³)"]}
+                        if k > 0:
+                            y_l = row["Top Left (m)"] if pd.notna(row["Top Left (m)"]) else 0.0
+                            y_r = row["Top Right (m)"] if pd.notna(row["Top Right (m)"]) else y_l
+                            lay.update({"top_x": [ground_x[0], ground_x[-1]], "top_y": [y_l, y_r]})
+                        layers_sl.append(lay)
+
+                    water_x = water_y = None
+                    if st.checkbox("Include Piezometric Line", key="geo_water"):
+                        w1, w2 = st.columns(2)
+                        wt_toe = w1.number_input("Piezometric Elev. at Toe [m]", -20.0, 50.0, 1.0, key="geo_wt_toe")
+                        wt_crest = w2.number_input("Piezometric Elev. at Crest [m]", -20.0, 50.0, 5.0, key="geo_wt_crest")
+                        water_x = [ground_x[0], ground_x[1], ground_x[2], ground_x[3]]
+                        water_y = [wt_toe, wt_toe, wt_crest, wt_crest]
+
+                    if not layers_sl:
+                        st.error("Define at least one soil layer.")
+                        st.stop()
+
+                    geo_slices = slope_engine.layered_circle_slices(ground_x, ground_y, layers_sl, xc_g, yc_g, R_g,
+                                                                    int(n_sl), water_x, water_y)
+                    edited_df = pd.DataFrame({
+                        "Slice": np.arange(1, int(n_sl) + 1),
+                        "Weight (kN)": geo_slices["W"],
+                        "Base Angle α (deg)": geo_slices["alpha"],
+                        "Base Length l (m)": geo_slices["l"],
+                        "u (kPa)": geo_slices["u"],
+                        "Base Layer": geo_slices["layer"] + 1,
+                        "c' (kPa)": geo_slices["c"],
+                        "ϕ' (deg)": geo_slices["phi"],
+                    })
+                    if geo_slices["valid"]:
+                        with st.expander("Generated Slices"):
+                            st.dataframe(edited_df.round(2))
+                    else:
+                        st.error("Circle does not intersect the ground surface.")
+
+                    with st.expander("Critical Circle Search (Layered Section)"):
+                        h1, h2 = st.columns(2)
+                        X_crest_g = ground_x[2]
+                        sx_min = h1.number_input("Centre x min [m]", value=round(-0.5 * H_g, 1), key="geo_s_xmin")
+                        sx_max = h2.number_input("Centre x max [m]", value=round(X_crest_g + 0.5 * H_g, 1), key="geo_s_xmax")
+                        sy_min = h1.number_input("Centre y min [m]", value=round(1.0 * H_g, 1), key="geo_s_ymin")
+                        sy_max = h2.number_input("Centre y max [m]", value=round(3.0 * H_g, 1), key="geo_s_ymax")
+                        st_min = h1.number_input("Circle bottom min [m]", value=round(-0.5 * H_g, 1), key="geo_s_tmin")
+                        st_max = h2.number_input("Circle bottom max [m]", value=round(0.5 * H_g, 1), key="geo_s_tmax")
+                        s_nxy = h1.number_input("Centres per Axis", 5, 100, 20, key="geo_s_n")
+                        s_nr = h2.number_input("Radii per Centre", 1, 50, 10, key="geo_s_nr")
+                        calc_search_sl = st.button("Search Critical Circle", key="btn_search_slices")
+
+                    with st.expander("Non-Circular Search (Parallel Restarts)"):
+                        st.caption("Polyline surfaces (Janbu) optimised by simulated annealing and Nelder-Mead. "
+                                   "Independent restarts run on separate processes and share the best FS found so far.")
+                        h1, h2 = st.columns(2)
+                        nc_in_min = h1.number_input("Entry x min [m]", value=round(-1.0 * H_g, 1), key="nc_in_min")
+                        nc_in_max = h2.number_input("Entry x max [m]", value=0.0, key="nc_in_max")
+                        nc_out_min = h1.number_input("Exit x min [m]", value=round(X_crest_g, 1), key="nc_out_min")
+                        nc_out_max = h2.number_input("Exit x max [m]", value=round(X_crest_g + 1.5 * H_g, 1), key="nc_out_max")
+                        nc_vert = h1.number_input("Surface Vertices", 3, 12, 6, key="nc_vertices")
+                        nc_restarts = h2.number_input("Restarts", 1, 256, 8, key="nc_restarts")
+                        nc_iter = h1.number_input("Iterations per Restart", 50, 5000, 300, key="nc_iter")
+                        nc_workers = h2.number_input("Worker Processes", 1, 256, os.cpu_count() or 1, key="nc_workers")
+                        nc_f0 = st.checkbox("Apply Janbu f0 Correction", key="nc_f0")
+                        calc_noncirc = st.button("Search Non-Circular Surface", key="btn_search_noncirc")
+                st.subheader("Solver")
+                slice_method = st.selectbox("Method", ["Ordinary (Fellenius)", "Simplified Bishop", "Janbu Simplified", "Spencer"],
+                                            key="slice_solver")
+                s_c1, s_c2 = st.columns(2)
+                tol_sl = s_c1.number_input("Tolerance (ΔFS)", 1e-8, 1e-1, 1e-4, format="%.1e", key="slice_tol")
+                iter_sl = s_c2.number_input("Max Iterations", 1, 500, 100, key="slice_max_iter")
+                kh_sl, kv_sl = seismic_input("slice")
+                calc_slices = st.button(f"Calculate FS ({slice_method.split(' ')[0]})", type="primary", key="btn_calc_slices")
 
             with col_s2:
+                if geo_slices is not None and geo_slices["valid"]:
+                    fig_sl, ax_sl = plt.subplots(figsize=(8, 5))
+                    ax_sl.plot(ground_x, ground_y, 'k-', linewidth=2.5, label="Ground Surface")
+                    for xl, xr, yb in zip(geo_slices["x_left"], geo_slices["x_right"], geo_slices["y_base"]):
+                        x_pts = [xl, xl, xr, xr]
+                        y_top = np.interp([xl, xr], ground_x, ground_y)
+                        y_bot = yc_g - np.sqrt(np.clip(R_g**2 - (np.array([xl, xr]) - xc_g)**2, 0, None))
+                        ax_sl.add_patch(patches.Polygon(list(zip(x_pts, [y_bot[0], y_top[0], y_top[1], y_bot[1]])),
+                                                        facecolor='#E6D690', edgecolor='black', linewidth=0.5, alpha=0.7))
+                    for lay in layers_sl[1:]:
+                        ax_sl.plot(lay["top_x"], lay["top_y"], color='saddlebrown', linestyle='-.', linewidth=1)
+                    if water_x is not None:
+                        ax_sl.plot(water_x, water_y, 'b--', linewidth=1.5, label="Piezometric Line")
+                    ax_sl.plot(xc_g, yc_g, 'bo', label="O")
+                    ax_sl.set_aspect('equal')
+                    ax_sl.legend(loc='upper left', fontsize=8)
+                    ax_sl.axis('off')
+                    st.pyplot(fig_sl)
+
+                if calc_noncirc:
+                    if nc_in_max <= nc_in_min or nc_out_max <= nc_out_min:
+                        st.error("Entry and exit ranges need max > min.")
+                    else:
+                        t0 = time.perf_counter()
+                        with st.spinner("Running restarts..."):
+                            res_nc = slope_engine.noncircular_search(
+                                ground_x, ground_y, layers_sl, (nc_in_min, nc_in_max), (nc_out_min, nc_out_max),
+                                int(nc_vert), int(nc_restarts), int(nc_iter), int(nc_workers), int(n_sl),
+                                water_x, water_y, kh=kh_sl, kv=kv_sl, f0_correction=nc_f0
+                            )
+                        elapsed = time.perf_counter() - t0
+                        best_nc = res_nc["best"]
+                        if best_nc is None:
+                            st.error("No admissible non-circular surface found. Widen the entry/exit ranges.")
+                        else:
+                            fig_nc, ax_nc = plt.subplots(figsize=(8, 4.5))
+                            ax_nc.plot(ground_x, ground_y, 'k-', linewidth=2.5, label="Ground Surface")
+                            for lay in layers_sl[1:]:
+                                ax_nc.plot(lay["top_x"], lay["top_y"], color='saddlebrown', linestyle='-.', linewidth=1)
+                            if water_x is not None:
+                                ax_nc.plot(water_x, water_y, 'b--', linewidth=1.5, label="Piezometric Line")
+                            mass_x = np.linspace(best_nc["surf_x"][0], best_nc["surf_x"][-1], 100)
+                            ax_nc.fill_between(mass_x, np.interp(mass_x, best_nc["surf_x"], best_nc["surf_y"]),
+                                               np.interp(mass_x, ground_x, ground_y), color='#E6D690', alpha=0.7)
+                            ax_nc.plot(best_nc["surf_x"], best_nc["surf_y"], 'ro-', linewidth=2,
+                                       label=f"Critical Surface (FS={best_nc['fs']:.3f})")
+                            ax_nc.set_aspect('equal')
+                            ax_nc.legend(loc='upper left', fontsize=8)
+                            ax_nc.axis('off')
+                            st.pyplot(fig_nc)
+                            st.metric("Critical FS (Janbu, Non-Circular)", f"{best_nc['fs']:.3f}")
+                            st.caption(f"{res_nc['n_completed']} of {int(nc_restarts)} restarts finished on {int(nc_workers)} "
+                                       f"process(es) in {elapsed:.1f} s"
+                                       + (" (stopped early: converged)." if res_nc["converged"] else "."))
+                            with st.expander("Restart Summary"):
+                                st.dataframe(pd.DataFrame(res_nc["history"]), hide_index=True)
+
+                if calc_search_sl:
+                    search_method = "Ordinary" if "Ordinary" in slice_method else ("Janbu" if "Janbu" in slice_method else "Bishop")
+                    res_s = slope_engine.search_circle_slices(
+                        ground_x, ground_y, layers_sl, (sx_min, sx_max), (sy_min, sy_max), (st_min, st_max),
+                        int(s_nxy), int(s_nxy), int(s_nr), int(n_sl), search_method, water_x, water_y,
+                        kh=kh_sl, kv=kv_sl
+                    )
+                    best_s = res_s["best"]
+                    if best_s is None:
+                        st.error("No admissible circle in the search grid.")
+                    else:
+                        fig_ss, ax_ss = plt.subplots(figsize=(7, 4))
+                        XX, YY = np.meshgrid(res_s["xc"], res_s["yc"])
+                        cf = ax_ss.contourf(XX, YY, np.ma.masked_invalid(res_s["fs_map"]), levels=20, cmap='RdYlGn')
+                        ax_ss.plot(best_s["xc"], best_s["yc"], 'k*', markersize=12)
+                        fig_ss.colorbar(cf, ax=ax_ss, label=f"Min FS ({search_method})")
+                        ax_ss.set_xlabel("Centre x [m]")
+                        ax_ss.set_ylabel("Centre y [m]")
+                        st.pyplot(fig_ss)
+                        st.success(f"**Critical circle ({search_method}):** O = ({best_s['xc']:.2f}, {best_s['yc']:.2f}) m, "
+                                   f"R = {best_s['R']:.2f} m, **FS = {best_s['fs']:.3f}**")
+                        st.caption("Enter this centre and radius above to inspect its slices.")
+
                 if calc_slices:
-                    sum_resisting = 0.0
-                    sum_driving = 0.0
-                    phi_rad = math.radians(phi_sl)
-                    details = []
-                    
-                    for index, row in edited_df.iterrows():
-                        W = row["Weight (kN)"]
-                        alpha = math.radians(row["Base Angle α (deg)"])
-                        l = row["Base Length l (m)"]
-                        u = row["u (kPa)"]
-                        
-                        N_prime = (W * math.cos(alpha)) - (u * l)
-                        T_f = (c_sl * l) + (N_prime * math.tan(phi_rad))
-                        T_d = W * math.sin(alpha)
-                        
-                        sum_resisting += T_f
-                        sum_driving += T_d
-                        details.append({"Slice": row["Slice"], "Driving": round(T_d, 1), "Resisting": round(T_f, 1)})
-                    
-                    if sum_driving != 0:
-                        FS_slices = sum_resisting / sum_driving
-                        st.metric("Factor of Safety", f"{FS_slices:.3f}")
-                        st.dataframe(pd.DataFrame(details))
+                    slices = edited_df.dropna(subset=["Weight (kN)", "Base Angle α (deg)", "Base Length l (m)", "u (kPa)"])
+                    W_arr = slices["Weight (kN)"].to_numpy(dtype=float)
+                    a_arr = slices["Base Angle α (deg)"].to_numpy(dtype=float)
+                    l_arr = slices["Base Length l (m)"].to_numpy(dtype=float)
+                    u_arr = slices["u (kPa)"].to_numpy(dtype=float)
+                    if "c' (kPa)" in slices:
+                        c_sl = slices["c' (kPa)"].to_numpy(dtype=float)
+                        phi_sl = slices["ϕ' (deg)"].to_numpy(dtype=float)
+
+                    if slices.empty:
+                        st.error("No valid slices to analyse.")
+                    else:
+                        if "Ordinary" in slice_method:
+                            res = slope_engine.ordinary_fs(W_arr, a_arr, l_arr, u_arr, c_sl, phi_sl, kh_sl, kv_sl)
+                            st.latex(r"FS = \frac{\sum [c'l + (W\cos\alpha - ul)\tan\phi']}{\sum W\sin\alpha}")
+                        elif "Bishop" in slice_method:
+                            res = slope_engine.bishop_fs(W_arr, a_arr, l_arr, u_arr, c_sl, phi_sl, tol_sl, int(iter_sl), kh=kh_sl, kv=kv_sl)
+                            st.latex(r"FS = \frac{\sum [c'b + (W - ub)\tan\phi'] / m_\alpha}{\sum W\sin\alpha}, \quad m_\alpha = \cos\alpha + \frac{\sin\alpha\tan\phi'}{FS}")
+                        elif "Janbu" in slice_method:
+                            res = slope_engine.janbu_fs(W_arr, a_arr, l_arr, u_arr, c_sl, phi_sl, tol_sl, int(iter_sl), kh=kh_sl, kv=kv_sl)
+                            st.latex(r"FS = \frac{\sum [c'b + (W - ub)\tan\phi'] / (\cos\alpha \, m_\alpha)}{\sum W\tan\alpha}")
+                        else:
+                            res = slope_engine.spencer_fs(W_arr, a_arr, l_arr, u_arr, c_sl, phi_sl, tol_sl, int(iter_sl), kh=kh_sl, kv=kv_sl)
+                            st.latex(r"Q = \frac{\frac{c'l}{F} + \frac{(W\cos\alpha - ul)\tan\phi'}{F} - W\sin\alpha}{\cos(\alpha-\theta)\left[1 + \frac{\tan\phi'\tan(\alpha-\theta)}{F}\right]}, \quad \sum Q = \sum Q\cos(\alpha-\theta) = 0")
+
+                        if kh_sl or kv_sl:
+                            st.caption(f"Pseudo-static: W → (1 - k_v)W vertically plus k_h W horizontally at each slice base "
+                                       f"(k_h = {kh_sl:.2f}, k_v = {kv_sl:.2f}).")
+
+                        FS_slices = float(res["fs"])
+                        if np.isfinite(FS_slices):
+                            st.metric("Factor of Safety", f"{FS_slices:.3f}")
+                            if "theta" in res:
+                                st.write(f"**Interslice Force Inclination (θ):** {res['theta']:.2f}°")
+                            if not res["converged"]:
+                                st.warning(f"Did not converge to ΔFS < {tol_sl:.1e} within {int(iter_sl)} iterations.")
+
+                            details = pd.DataFrame({"Slice": slices["Slice"].to_numpy()})
+                            if "Q" in res:
+                                details["Q (kN)"] = np.round(res["Q"], 1)
+                            else:
+                                details["Driving"] = np.round(res["driving"], 1)
+                                details["Resisting"] = np.round(res["resisting"], 1)
+                            st.dataframe(details)
+
+                            if res["history"]:
+                                with st.expander("Iteration Diagnostics"):
+                                    st.dataframe(pd.DataFrame(res["history"]))
+                        else:
+                            st.error("Driving force is zero or the solver diverged. Check the slice data.")
 
     # ---------------------------------------------------------
     # TAB 3: COMPOUND (BLOCK & WEDGE)
     # ---------------------------------------------------------
     with tab_comp:
 
-        col_c1, col_c2 = st.columns([0.4, 0.6], gap="medium")
+        block_mode = st.radio("Mechanism:", ["Manual (Given Forces)", "Automatic Block Search"],
+                              horizontal=True, key="block_mode")
+
+        if block_mode == "Manual (Given Forces)":
+            col_c1, col_c2 = st.columns([0.4, 0.6], gap="medium")
         
-        with col_c1:
-            st.subheader("Inputs")
+            with col_c1:
+                st.subheader("Inputs")
             
-            st.markdown("**Geometry**")
-            H_left = st.number_input("Passive Wedge Height (H_p) [m]", 1.0, 10.0, 3.0, key="blk_Hp")
-            H_right = st.number_input("Active Wedge Height (H_a) [m]", 1.0, 20.0, 8.0, key="blk_Ha")
-            L_block = st.number_input("Block Length (L) [m]", 1.0, 50.0, 12.0, key="blk_L")
+                st.markdown("**Geometry**")
+                H_left = st.number_input("Passive Wedge Height (H_p) [m]", 1.0, 10.0, 3.0, key="blk_Hp")
+                H_right = st.number_input("Active Wedge Height (H_a) [m]", 1.0, 20.0, 8.0, key="blk_Ha")
+                L_block = st.number_input("Block Length (L) [m]", 1.0, 50.0, 12.0, key="blk_L")
             
-            st.markdown("**Forces**")
-            Pa = st.number_input("Active Thrust (Driving) Pa [kN]", 0.0, 5000.0, 500.0, key="block_Pa")
-            Pp = st.number_input("Passive Resistance (Resisting) Pp [kN]", 0.0, 5000.0, 200.0, key="block_Pp")
-            W_block = st.number_input("Weight of Central Block [kN]", 0.0, 10000.0, 2000.0, key="block_W")
+                st.markdown("**Forces**")
+                Pa = st.number_input("Active Thrust (Driving) Pa [kN]", 0.0, 5000.0, 500.0, key="block_Pa")
+                Pp = st.number_input("Passive Resistance (Resisting) Pp [kN]", 0.0, 5000.0, 200.0, key="block_Pp")
+                W_block = st.number_input("Weight of Central Block [kN]", 0.0, 10000.0, 2000.0, key="block_W")
             
-            st.markdown("**Weak Layer**")
-            c_base = st.number_input("Base Cohesion (c') [kPa]", 0.0, 100.0, 5.0, key="block_c")
-            phi_base = st.number_input("Base Friction (ϕ') [deg]", 0.0, 45.0, 20.0, key="block_phi")
+                st.markdown("**Weak Layer**")
+                c_base = st.number_input("Base Cohesion (c') [kPa]", 0.0, 100.0, 5.0, key="block_c")
+                phi_base = st.number_input("Base Friction (ϕ') [deg]", 0.0, 45.0, 20.0, key="block_phi")
             
-            calc_blk = st.button("Calculate FS", type="primary", key="btn_calc_block")
+                kh_b, kv_b = seismic_input("blk")
+                calc_blk = st.button("Calculate FS", type="primary", key="btn_calc_block")
 
-        with col_c2:
-            st.subheader("Block & Wedge Diagram")
-            fig_b, ax_b = plt.subplots(figsize=(8, 4))
+            with col_c2:
+                st.subheader("Block & Wedge Diagram")
+                fig_b, ax_b = plt.subplots(figsize=(8, 4))
             
-            # Draw Geometry matching User Image
-            wedge_L_width = H_left 
-            wedge_R_width = H_right
+                # Draw Geometry matching User Image
+                wedge_L_width = H_left 
+                wedge_R_width = H_right
             
-            # 1. Passive Wedge (Left)
-            passive_poly = [[0, 0], [wedge_L_width, H_left], [wedge_L_width, 0]]
-            ax_b.add_patch(patches.Polygon(passive_poly, facecolor='#A5D6A7', edgecolor='black', alpha=0.5))
-            ax_b.text(wedge_L_width/2, H_left/3, "Passive\nWedge", ha='center', fontsize=8)
-            ax_b.text(wedge_L_width/2, 0.2, "45-ϕ/2", fontsize=7)
+                # 1. Passive Wedge (Left)
+                passive_poly = [[0, 0], [wedge_L_width, H_left], [wedge_L_width, 0]]
+                ax_b.add_patch(patches.Polygon(passive_poly, facecolor='#A5D6A7', edgecolor='black', alpha=0.5))
+                ax_b.text(wedge_L_width/2, H_left/3, "Passive\nWedge", ha='center', fontsize=8)
+                ax_b.text(wedge_L_width/2, 0.2, "45-ϕ/2", fontsize=7)
             
-            # 2. Central Block
-            block_x_start = wedge_L_width
-            block_x_end = wedge_L_width + L_block
-            block_poly = [
-                [block_x_start, 0], [block_x_start, H_left], 
-                [block_x_end, H_right], [block_x_end, 0]
-            ]
-            ax_b.add_patch(patches.Polygon(block_poly, facecolor='lightgrey', edgecolor='black', hatch='//', alpha=0.5))
-            ax_b.text((block_x_start+block_x_end)/2, (H_left+H_right)/4, "BLOCK", ha='center', fontweight='bold')
+                # 2. Central Block
+                block_x_start = wedge_L_width
+                block_x_end = wedge_L_width + L_block
+                block_poly = [
+                    [block_x_start, 0], [block_x_start, H_left], 
+                    [block_x_end, H_right], [block_x_end, 0]
+                ]
+                ax_b.add_patch(patches.Polygon(block_poly, facecolor='lightgrey', edgecolor='black', hatch='//', alpha=0.5))
+                ax_b.text((block_x_start+block_x_end)/2, (H_left+H_right)/4, "BLOCK", ha='center', fontweight='bold')
             
-            # 3. Active Wedge (Right)
-            active_poly = [[block_x_end, 0], [block_x_end, H_right], [block_x_end + wedge_R_width, H_right]]
-            ax_b.add_patch(patches.Polygon(active_poly, facecolor='#FFCCBC', edgecolor='black', alpha=0.5))
-            ax_b.text(block_x_end + wedge_R_width/3, H_right*0.8, "Active\nWedge", ha='center', fontsize=8)
-            ax_b.text(block_x_end + wedge_R_width/2, 0.2, "45+ϕ/2", fontsize=7)
+                # 3. Active Wedge (Right)
+                active_poly = [[block_x_end, 0], [block_x_end, H_right], [block_x_end + wedge_R_width, H_right]]
+                ax_b.add_patch(patches.Polygon(active_poly, facecolor='#FFCCBC', edgecolor='black', alpha=0.5))
+                ax_b.text(block_x_end + wedge_R_width/3, H_right*0.8, "Active\nWedge", ha='center', fontsize=8)
+                ax_b.text(block_x_end + wedge_R_width/2, 0.2, "45+ϕ/2", fontsize=7)
             
-            # 4. Forces
-            ax_b.arrow(block_x_end + 1.5, H_right/3, -1.5, 0, head_width=0.3, color='red', width=0.05)
-            ax_b.text(block_x_end + 1.6, H_right/3, "Pa", color='red', fontweight='bold', va='center')
+                # 4. Forces
+                ax_b.arrow(block_x_end + 1.5, H_right/3, -1.5, 0, head_width=0.3, color='red', width=0.05)
+                ax_b.text(block_x_end + 1.6, H_right/3, "Pa", color='red', fontweight='bold', va='center')
             
-            ax_b.arrow(block_x_start - 1.5, H_left/3, 1.5, 0, head_width=0.3, color='green', width=0.05)
-            ax_b.text(block_x_start - 2.0, H_left/3, "Pp", color='green', fontweight='bold', va='center')
+                ax_b.arrow(block_x_start - 1.5, H_left/3, 1.5, 0, head_width=0.3, color='green', width=0.05)
+                ax_b.text(block_x_start - 2.0, H_left/3, "Pp", color='green', fontweight='bold', va='center')
             
-            ax_b.text((block_x_start+block_x_end)/2, -0.5, r"$\tau_f$ (Weak Layer)", ha='center')
-            ax_b.arrow((block_x_start+block_x_end)/2, 0, -2, 0, head_width=0.2, color='black') # Resisting shear
+                ax_b.text((block_x_start+block_x_end)/2, -0.5, r"$\tau_f$ (Weak Layer)", ha='center')
+                ax_b.arrow((block_x_start+block_x_end)/2, 0, -2, 0, head_width=0.2, color='black') # Resisting shear
             
-            ax_b.annotate(f"L={L_block}m", xy=(block_x_start, -1), xytext=(block_x_end, -1), arrowprops=dict(arrowstyle='<->'))
+                ax_b.annotate(f"L={L_block}m", xy=(block_x_start, -1), xytext=(block_x_end, -1), arrowprops=dict(arrowstyle='<->'))
 
-            ax_b.set_xlim(-2, block_x_end + wedge_R_width + 2)
-            ax_b.set_ylim(-2, H_right + 2)
-            ax_b.axis('off')
-            st.pyplot(fig_b)
+                ax_b.set_xlim(-2, block_x_end + wedge_R_width + 2)
+                ax_b.set_ylim(-2, H_right + 2)
+                ax_b.axis('off')
+                st.pyplot(fig_b)
             
-            if calc_blk:
-                resisting_base = (c_base * L_block) + (W_block * math.tan(math.radians(phi_base)))
-                total_resisting = Pp + resisting_base
-                total_driving = Pa
+                if calc_blk:
+                    resisting_base = (c_base * L_block) + ((1 - kv_b) * W_block * math.tan(math.radians(phi_base)))
+                    total_resisting = Pp + resisting_base
+                    total_driving = Pa + kh_b * W_block
                 
-                if total_driving > 0:
-                    FS_block = total_resisting / total_driving
-                    st.markdown("### Results")
-                    st.latex(r"FS = \frac{P_p + (c'L + W_{block}\tan\phi')}{P_a}")
-                    st.write(f"**Base Resistance:** {resisting_base:.1f} kN")
-                    st.write(f"**Total Resisting:** {total_resisting:.1f} kN")
+                    if total_driving > 0:
+                        FS_block = total_resisting / total_driving
+                        st.markdown("### Results")
+                        if kh_b or kv_b:
+                            st.latex(r"FS = \frac{P_p + (c'L + (1-k_v)W_{block}\tan\phi')}{P_a + k_h W_{block}}")
+                        else:
+                            st.latex(r"FS = \frac{P_p + (c'L + W_{block}\tan\phi')}{P_a}")
+                        st.write(f"**Base Resistance:** {resisting_base:.1f} kN")
+                        st.write(f"**Total Resisting:** {total_resisting:.1f} kN")
                     
-                    if FS_block < 1: st.error(f"**FS = {FS_block:.2f} (Unstable)**")
-                    else: st.success(f"**FS = {FS_block:.2f} (Stable)**")
+                        if FS_block < 1: st.error(f"**FS = {FS_block:.2f} (Unstable)**")
+                        else: st.success(f"**FS = {FS_block:.2f} (Stable)**")
+                    else:
+                        st.error("Driving force (Pa + k_h W) must be > 0")
+
+        else:
+            col_c1, col_c2 = st.columns([0.4, 0.6], gap="medium")
+
+            with col_c1:
+                st.subheader("Inputs")
+                st.markdown("**Slope Geometry**")
+                b1, b2 = st.columns(2)
+                H_bs = b1.number_input("Slope Height (H) [m]", 1.0, 50.0, 10.0, key="bs_H")
+                beta_bs = b2.number_input("Slope Angle [deg]", 1.0, 90.0, 30.0, key="bs_beta")
+
+                st.markdown("**Soil Above Weak Layer**")
+                b1, b2, b3 = st.columns(3)
+                c_bs = b1.number_input("c' [kPa]", 0.0, 200.0, 5.0, key="bs_c")
+                phi_bs = b2.number_input("ϕ' [deg]", 0.0, 45.0, 30.0, key="bs_phi")
+                gamma_bs = b3.number_input("γ [kN/m³]", 10.0, 25.0, 19.0, key="bs_gamma")
+
+                st.markdown("**Weak Layer**")
+                b1, b2 = st.columns(2)
+                cb_bs = b1.number_input("Base Cohesion (c') [kPa]", 0.0, 100.0, 2.0, key="bs_cb")
+                phib_bs = b2.number_input("Base Friction (ϕ') [deg]", 0.0, 45.0, 12.0, key="bs_phib")
+
+                ground_x, ground_y = slope_engine.build_ground_profile(H_bs, beta_bs, max(10.0, 3 * H_bs))
+                X_crest_bs = ground_x[2]
+
+                with st.expander("Search Ranges", expanded=False):
+                    b1, b2 = st.columns(2)
+                    yw_min = b1.number_input("Weak Layer Elev. min [m]", value=round(-0.3 * H_bs, 1), key="bs_yw_min")
+                    yw_max = b2.number_input("Weak Layer Elev. max [m]", value=round(0.3 * H_bs, 1), key="bs_yw_max")
+                    xp_min = b1.number_input("Passive End x min [m]", value=round(-0.5 * H_bs, 1), key="bs_xp_min")
+                    xp_max = b2.number_input("Passive End x max [m]", value=round(X_crest_bs, 1), key="bs_xp_max")
+                    L_min = b1.number_input("Block Length min [m]", 0.5, 500.0, round(0.2 * H_bs, 1), key="bs_L_min")
+                    L_max = b2.number_input("Block Length max [m]", 0.5, 500.0, round(2.0 * H_bs, 1), key="bs_L_max")
+                    n_bs = b1.number_input("Grid Points per Axis", 5, 60, 25, key="bs_n")
+                    n_th = b2.number_input("Wedge Angles", 5, 90, 30, key="bs_ntheta")
+
+                kh_bs, kv_bs = seismic_input("bs")
+                calc_bs = st.button("Search Critical Block", type="primary", key="btn_search_block")
+
+            with col_c2:
+                st.subheader("Critical Block Mechanism")
+                if calc_bs:
+                    if yw_max <= yw_min or xp_max <= xp_min or L_max <= L_min:
+                        st.error("Each search range needs max > min.")
+                    else:
+                        res_b = slope_engine.block_search(
+                            ground_x, ground_y, c_bs, phi_bs, gamma_bs, cb_bs, phib_bs,
+                            (yw_min, yw_max), (xp_min, xp_max), (L_min, L_max),
+                            int(n_bs), int(n_bs), int(n_bs), int(n_th), kh=kh_bs, kv=kv_bs
+                        )
+                        best_b = res_b["best"]
+                        if best_b is None:
+                            st.error("No admissible block mechanism in the search ranges.")
+                        else:
+                            x_p, y_w, x_a = best_b["x_p"], best_b["y_w"], best_b["x_p"] + best_b["L"]
+                            x_pt, x_at = best_b["x_passive"], best_b["x_active"]
+                            ground_at = lambda x: float(np.interp(x, ground_x, ground_y))
+
+                            fig_bs, ax_bs = plt.subplots(figsize=(8, 4))
+                            ax_bs.plot(ground_x, ground_y, 'k-', linewidth=2)
+                            ax_bs.fill_between(ground_x, ground_y, min(ground_y) - H_bs, color='#D7CCC8', alpha=0.3)
+                            ax_bs.add_patch(patches.Polygon(
+                                [[x_pt, ground_at(x_pt)], [x_p, y_w], [x_p, ground_at(x_p)]],
+                                facecolor='#A5D6A7', edgecolor='black', alpha=0.6, label="Passive Wedge"))
+                            block_xs = np.linspace(x_p, x_a, 50)
+                            ax_bs.add_patch(patches.Polygon(
+                                [[x_p, y_w], *zip(block_xs, np.interp(block_xs, ground_x, ground_y)), [x_a, y_w]],
+                                facecolor='lightgrey', edgecolor='black', hatch='//', alpha=0.6, label="Block"))
+                            active_xs = np.linspace(x_a, x_at, 50)
+                            ax_bs.add_patch(patches.Polygon(
+                                [[x_a, y_w], *zip(active_xs, np.interp(active_xs, ground_x, ground_y))],
+                                facecolor='#FFCCBC', edgecolor='black', alpha=0.6, label="Active Wedge"))
+                            ax_bs.axhline(y_w, color='brown', linestyle='--', linewidth=1, label="Weak Layer")
+                            ax_bs.set_xlim(min(x_pt, 0) - 2, max(x_at, X_crest_bs) + 2)
+                            ax_bs.set_ylim(min(y_w, 0) - 2, H_bs + 2)
+                            ax_bs.set_aspect('equal')
+                            ax_bs.legend(loc='lower right', fontsize=8)
+                            st.pyplot(fig_bs)
+
+                            st.latex(r"FS = \frac{P_p + c_b'L + (1-k_v)W_{block}\tan\phi_b'}{P_a + k_h W_{block}}")
+                            if best_b["fs"] < 1.0:
+                                st.error(f"**FS_min = {best_b['fs']:.3f} (Unstable)**")
+                            else:
+                                st.success(f"**FS_min = {best_b['fs']:.3f} (Stable)**")
+                            st.caption(f"Grid minimum {best_b['fs_grid']:.3f}, refined with Nelder-Mead.")
+
+                            st.table(pd.DataFrame({
+                                "Quantity": ["Weak Layer Elev. (m)", "Block Passive End x (m)", "Block Length L (m)",
+                                             "Passive Wedge θ_p (deg)", "Active Wedge θ_a (deg)",
+                                             "Active Thrust Pa (kN/m)", "Passive Resistance Pp (kN/m)",
+                                             "Block Weight (kN/m)", "Total Resisting (kN/m)"],
+                                "Value": [best_b["y_w"], best_b["x_p"], best_b["L"], best_b["theta_p"], best_b["theta_a"],
+                                          best_b["Pa"], best_b["Pp"], best_b["W_block"], best_b["resisting"]],
+                            }).round(2))
+
+                            with st.expander("FS Map (minimum over block length)"):
+                                fig_bm, ax_bm = plt.subplots(figsize=(7, 3.5))
+                                XX, YY = np.meshgrid(res_b["xp"], res_b["yw"])
+                                cf = ax_bm.contourf(XX, YY, np.ma.masked_invalid(res_b["fs_map"]), levels=20, cmap='RdYlGn')
+                                ax_bm.plot(best_b["x_p"], best_b["y_w"], 'k*', markersize=12)
+                                fig_bm.colorbar(cf, ax=ax_bm, label="Min FS")
+                                ax_bm.set_xlabel("Passive End x [m]")
+                                ax_bm.set_ylabel("Weak Layer Elevation [m]")
+                                st.pyplot(fig_bm)
+                else:
+                    st.info("Set the ranges and run the search to find the minimum-FS block mechanism.")
+
+
+    # ---------------------------------------------------------
+    # TAB 4: SEISMIC (YIELD ACCELERATION & NEWMARK)
+    # ---------------------------------------------------------
+    with tab_seis:
+
+        st.subheader("A. Yield Acceleration (Batch)")
+        st.caption("Infinite-slope sections (c-ϕ with pore pressure u). The yield coefficient k_y is the "
+                   "horizontal coefficient giving FS = 1; all sections are solved together by bisection.")
+        default_sections = pd.DataFrame({
+            "Section": ["S1", "S2", "S3"],
+            "β (deg)": [20.0, 25.0, 30.0],
+            "ϕ' (deg)": [32.0, 30.0, 34.0],
+            "c' (kPa)": [5.0, 10.0, 0.0],
+            "γ (kN/m³)": [19.0, 19.0, 18.0],
+            "z (m)": [3.0, 5.0, 2.0],
+            "u (kPa)": [0.0, 10.0, 0.0],
+        })
+        sections = st.data_editor(default_sections, num_rows="dynamic", key="seis_sections")
+        sections = sections.dropna(subset=["β (deg)", "ϕ' (deg)", "c' (kPa)", "γ (kN/m³)", "z (m)", "u (kPa)"]).reset_index(drop=True)
+        kv_y = st.number_input("k_v (upward) [-]", -0.5, 0.5, 0.0, step=0.01, key="seis_kv")
+
+        ky_table = None
+        if not sections.empty:
+            sec = {k: sections[k].to_numpy(dtype=float) for k in ["β (deg)", "ϕ' (deg)", "c' (kPa)", "γ (kN/m³)", "z (m)", "u (kPa)"]}
+
+            def fs_sections(kh):
+                return calculate_infinite_slope(sec["β (deg)"], sec["ϕ' (deg)"], sec["c' (kPa)"], sec["γ (kN/m³)"],
+                                                sec["γ (kN/m³)"], sec["z (m)"], sec["u (kPa)"], "Cohesive Soil (c-ϕ)",
+                                                kh, kv_y)[0]
+
+            ky_vals = slope_engine.yield_acceleration(fs_sections)
+            ky_table = pd.DataFrame({
+                "Section": sections["Section"].astype(str),
+                "Static FS": np.asarray(fs_sections(0.0), dtype=float),
+                "k_y (g)": ky_vals,
+            })
+            st.dataframe(ky_table.round(3), hide_index=True)
+            st.caption("k_y = 0: statically unstable. Blank: FS > 1 even at k_h = 1.")
+
+        st.markdown("---")
+        st.subheader("B. Newmark Sliding-Block Displacement")
+        col_n1, col_n2 = st.columns([0.4, 0.6], gap="medium")
+
+        with col_n1:
+            ky_options = ["Manual"]
+            if ky_table is not None:
+                ky_options += [s_ for s_, k_ in zip(ky_table["Section"], ky_table["k_y (g)"]) if np.isfinite(k_)]
+            ky_src = st.selectbox("Yield Coefficient From", ky_options, key="seis_ky_src")
+            if ky_src == "Manual":
+                ky_nm = st.number_input("k_y [g]", 0.0, 2.0, 0.1, step=0.01, key="seis_ky")
+            else:
+                ky_nm = float(ky_table.loc[ky_table["Section"] == ky_src, "k_y (g)"].iloc[0])
+                st.write(f"**k_y = {ky_nm:.3f} g**")
+
+            th_src = st.radio("Acceleration Record:", ["Synthetic Pulse", "Upload File"], horizontal=True, key="seis_th_src")
+            acc_th, dt_th = None, None
+            if th_src == "Upload File":
+                th_file = st.file_uploader("Time History (.AT2, .txt, .csv)", type=["at2", "txt", "csv", "dat"], key="seis_file")
+                dt_in = st.number_input("Time Step dt [s] (single-column files)", 0.0001, 1.0, 0.01, format="%.4f", key="seis_dt")
+                if th_file is not None:
+                    try:
+                        acc_th, dt_th = slope_engine.load_time_history(th_file, dt_in)
+                    except ValueError as e:
+                        st.error(str(e))
+            else:
+                p1, p2 = st.columns(2)
+                pga_syn = p1.number_input("Peak Acceleration [g]", 0.01, 2.0, 0.3, key="seis_pga")
+                f_syn = p2.number_input("Frequency [Hz]", 0.1, 20.0, 2.0, key="seis_freq")
+                dur_syn = p1.number_input("Duration [s]", 1.0, 600.0, 20.0, key="seis_dur")
+                dt_syn = p2.number_input("dt [s]", 0.0005, 0.1, 0.005, format="%.4f", key="seis_dt_syn")
+                t_syn = np.arange(0.0, dur_syn, dt_syn)
+                envelope = np.sin(np.pi * t_syn / dur_syn) ** 2
+                acc_th, dt_th = pga_syn * envelope * np.sin(2 * np.pi * f_syn * t_syn), dt_syn
+
+            scale_th = st.number_input("Scale Factor", 0.01, 10.0, 1.0, key="seis_scale")
+            calc_nm = st.button("Compute Displacement", type="primary", key="btn_calc_newmark")
+
+        with col_n2:
+            if calc_nm:
+                if acc_th is None or len(acc_th) < 2:
+                    st.error("Load an acceleration record first.")
                 else:
-                    st.error("Active Thrust (Pa) must be > 0")
+                    acc = scale_th * np.asarray(acc_th, dtype=float)
+                    t0 = time.perf_counter()
+                    # Both polarities: the record's sign relative to the downslope direction is unknown
+                    res_nm = slope_engine.newmark_displacement(np.stack([acc, -acc]), dt_th, ky_nm)
+                    elapsed_ms = (time.perf_counter() - t0) * 1e3
+                    k_crit = int(np.argmax(res_nm["total"]))
+
+                    m1, m2, m3 = st.columns(3)
+                    m1.metric("Displacement", f"{100 * res_nm['total'][k_crit]:.2f} cm")
+                    m2.metric("PGA", f"{np.max(np.abs(acc)):.3f} g")
+                    m3.metric("k_y / PGA", f"{ky_nm / np.max(np.abs(acc)):.2f}")
+                    st.caption(f"{acc.size:,} samples x 2 polarities in {elapsed_ms:.1f} ms. "
+                               f"Critical polarity: {'as recorded' if k_crit == 0 else 'reversed'}; "
+                               f"sliding time {res_nm['sliding_time'][k_crit]:.2f} s.")
+
+                    t = res_nm["time"]
+                    sign = 1 if k_crit == 0 else -1
+                    fig_nm, axes = plt.subplots(3, 1, figsize=(8, 6.5), sharex=True)
+                    axes[0].plot(t, sign * acc, 'k-', linewidth=0.6)
+                    axes[0].axhline(ky_nm, color='r', linestyle='--', label="k_y")
+                    axes[0].set_ylabel("a [g]")
+                    axes[0].legend(loc='upper right', fontsize=8)
+                    axes[1].plot(t, res_nm["velocity"][k_crit], 'b-', linewidth=0.8)
+                    axes[1].set_ylabel("v_rel [m/s]")
+                    axes[2].plot(t, 100 * res_nm["displacement"][k_crit], 'g-', linewidth=1.2)
+                    axes[2].set_ylabel("d [cm]")
+                    axes[2].set_xlabel("Time [s]")
+                    for ax in axes:
+                        ax.grid(True, alpha=0.3)
+                    st.pyplot(fig_nm)
+            else:
+                st.info("Choose a record and k_y, then compute the permanent downslope displacement.")
+
 
 if __name__ == "__main__":
     app()
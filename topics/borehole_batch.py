@@ -0,0 +1,336 @@
+"""
+Batch effective-stress profiles for many boreholes.
+
+Reads boreholes from a long-format CSV (one row per layer) or an AGS4 file,
+computes the Initial / Long Term / Short Term profiles of every borehole with
+`topics.stress_profile` (no Streamlit import) on a process pool, and writes
+one long-format table plus, optionally, a plot per borehole. A borehole that
+fails produces an error row instead of stopping the batch.
+
+Usage:
+    python -m topics.borehole_batch boreholes.csv -o profiles.csv --summary summary.csv --plots plots/ --workers 8
+
+CSV columns (one row per layer, top-down within each borehole):
+    borehole, type, thickness (or top, bottom), g_sat, g_dry,
+    water_depth, hc, surcharge, artesian_layer, artesian_head
+Borehole-level columns are read from the first row of each borehole; blanks
+fall back to the defaults (command-line options).
+
+AGS4: layers from the GEOL group (LOCA_ID, GEOL_TOP, GEOL_BASE; the soil type
+is taken from keywords in GEOL_DESC), the water depth from the shallowest
+WSTG_DPTH of the hole. Unit weights default to the page defaults unless the
+GEOL group carries GEOL_GSAT / GEOL_GDRY columns.
+"""
+import argparse
+import csv
+import io
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from topics import stress_profile
+from topics.parallel import process_pool_context
+
+SOIL_TYPES = ("Sand", "Clay", "Gravel", "Rock")
+DEFAULTS = {"water_depth": 3.0, "hc": 0.0, "surcharge": 0.0, "artesian_layer": 0, "artesian_head": 0.0,
+            "g_sat": 20.0, "g_dry": 17.0, "gamma_w": 9.81, "resolution": 0.0}
+SUMMARY_FIELDS = ["borehole", "status", "n_layers", "depth", "water_depth", "points",
+                  "sig_eff_base_initial", "sig_eff_base_long", "sig_eff_min", "seconds", "message"]
+# Description keywords, checked in order (a "sandy CLAY" is a clay)
+_KEYWORDS = (("Rock", ("ROCK", "MUDSTONE", "SANDSTONE", "SILTSTONE", "LIMESTONE", "CHALK", "GRANITE", "SHALE")),
+             ("Clay", ("CLAY", "SILT", "PEAT")),
+             ("Gravel", ("GRAVEL", "COBBLE", "BOULDER")),
+             ("Sand", ("SAND",)))
+
+
+# =========================================================
+# INPUT
+# =========================================================
+def _number(value, default=None):
+    """Parse a CSV/AGS field as float; blanks give `default`."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return default
+    return float(value)
+
+
+def soil_type(text):
+    """Page soil type from a type name or a soil description (main constituent in capitals first)."""
+    text = str(text or "").strip()
+    for name in SOIL_TYPES:
+        if text.lower() == name.lower():
+            return name
+    # BS 5930 descriptions write the principal soil type in capitals
+    for words in (" ".join(w for w in text.split() if w.isupper()), text.upper()):
+        for name, keys in _KEYWORDS:
+            if any(k in words for k in keys):
+                return name
+    return "Sand"
+
+
+def read_ags(text):
+    """AGS4 text -> {group: list of row dicts keyed by heading}."""
+    groups, heading, name = {}, None, None
+    for rec in csv.reader(io.StringIO(text)):
+        if not rec:
+            continue
+        kind = rec[0].strip().upper()
+        if kind == "GROUP":
+            name, heading = rec[1].strip().upper(), None
+            groups.setdefault(name, [])
+        elif kind == "HEADING":
+            heading = [h.strip().upper() for h in rec[1:]]
+        elif kind == "DATA" and name and heading:
+            groups[name].append(dict(zip(heading, rec[1:])))
+    return groups
+
+
+def boreholes_from_ags(groups):
+    """Raw borehole records from parsed AGS groups."""
+    water = {}
+    for row in groups.get("WSTG", []):
+        d = _number(row.get("WSTG_DPTH"))
+        if d is not None:
+            water[row["LOCA_ID"]] = min(d, water.get(row["LOCA_ID"], math.inf))
+    holes = {}
+    for row in groups.get("GEOL", []):
+        holes.setdefault(row["LOCA_ID"], []).append({
+            "type": soil_type(row.get("GEOL_DESC") or row.get("GEOL_GEOL")),
+            "top": row.get("GEOL_TOP"), "bottom": row.get("GEOL_BASE"),
+            "g_sat": row.get("GEOL_GSAT"), "g_dry": row.get("GEOL_GDRY"),
+        })
+    return [{"borehole": hole, "layers": layers, "water_depth": water.get(hole)} for hole, layers in holes.items()]
+
+
+def boreholes_from_rows(rows):
+    """Raw borehole records from long-format CSV rows (one per layer)."""
+    holes = {}
+    for row in rows:
+        row = {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+        name = str(row.get("borehole") or row.get("hole") or row.get("loca_id") or "").strip() or "BH1"
+        if name not in holes:
+            holes[name] = {"borehole": name, "layers": [],
+                           **{k: row.get(k) for k in ("water_depth", "hc", "surcharge", "artesian_layer",
+                                                     "artesian_head")}}
+        holes[name]["layers"].append({"type": soil_type(row.get("type")), "thickness": row.get("thickness"),
+                                      "top": row.get("top"), "bottom": row.get("bottom"),
+                                      "g_sat": row.get("g_sat"), "g_dry": row.get("g_dry")})
+    return list(holes.values())
+
+
+def load_boreholes(source):
+    """Read raw borehole records from a path or file-like object (CSV or AGS4, detected from the content)."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8-sig") as f:
+            text = f.read()
+    else:
+        text = source.read()
+        text = text.decode("utf-8-sig") if isinstance(text, bytes) else text
+    if text.lstrip().upper().startswith(('"GROUP"', "GROUP")):
+        return boreholes_from_ags(read_ags(text))
+    return boreholes_from_rows(csv.DictReader(io.StringIO(text)))
+
+
+def example_boreholes(n=300, seed=0):
+    """Synthetic site of n boreholes (sand / clay / gravel, 2-11 layers) for demonstration."""
+    rng = np.random.default_rng(seed)
+    holes = []
+    for b in range(n):
+        n_lay = int(rng.integers(2, 12))
+        holes.append({
+            "borehole": f"BH{b + 1:03d}", "water_depth": round(float(rng.uniform(0.5, 6.0)), 2),
+            "layers": [{"type": str(rng.choice(["Sand", "Clay", "Gravel"])),
+                        "thickness": round(float(rng.uniform(0.5, 4.0)), 2),
+                        "g_sat": round(float(rng.uniform(18.0, 21.0)), 1),
+                        "g_dry": round(float(rng.uniform(15.0, 18.0)), 1)} for _ in range(n_lay)],
+        })
+    return holes
+
+
+def normalize_borehole(raw, index=0, defaults=None):
+    """Turn one raw record into stress_profile inputs (raises ValueError on bad input)."""
+    opt = {**DEFAULTS, **(defaults or {})}
+    bh = {"borehole": str(raw.get("borehole") or f"BH{index + 1}")}
+    for key in ("water_depth", "hc", "surcharge", "artesian_head", "gamma_w", "resolution"):
+        bh[key] = _number(raw.get(key), opt[key])
+    bh["artesian_layer"] = int(_number(raw.get("artesian_layer"), opt["artesian_layer"]))
+
+    layers, depth = [], 0.0
+    for i, lay in enumerate(raw.get("layers") or []):
+        top = _number(lay.get("top"), depth)
+        bot = _number(lay.get("bottom"))
+        if bot is None:
+            bot = top + _number(lay.get("thickness"), math.nan)
+        if not abs(top - depth) < 1e-6:
+            raise ValueError(f"layer {i + 1} starts at {top:g} m, expected {depth:g} m (layers must be contiguous from 0)")
+        if not bot > top:
+            raise ValueError(f"layer {i + 1} needs a positive thickness")
+        layers.append({"id": i + 1, "type": lay.get("type") or "Sand", "top": top, "bot": bot, "H": bot - top,
+                       "g_sat": _number(lay.get("g_sat"), opt["g_sat"]),
+                       "g_dry": _number(lay.get("g_dry"), opt["g_dry"])})
+        depth = bot
+    if not layers:
+        raise ValueError("no layers")
+    if not 0 <= bh["artesian_layer"] <= len(layers):
+        raise ValueError(f"artesian_layer must be between 0 and {len(layers)}")
+    bh["layers"] = layers
+    return bh
+
+
+# =========================================================
+# SOLVING
+# =========================================================
+def solve_borehole(bh):
+    """All three profiles of one normalised borehole -> (summary row, long-format columns, profiles)."""
+    prof = stress_profile.effective_stress_profiles(
+        bh["layers"], bh["water_depth"], bh["hc"], bh["surcharge"], bh["artesian_layer"], bh["artesian_head"],
+        bh["gamma_w"], bh["resolution"])
+    n_modes, n = len(stress_profile.MODES), prof["z"].size
+    types = np.array([lay["type"] for lay in bh["layers"]])[prof["layer"]]
+    long = {
+        "borehole": np.full(n_modes * n, bh["borehole"], dtype=object),
+        "state": np.repeat(stress_profile.MODES, n),
+        "z": np.tile(prof["z"], n_modes),
+        "layer": np.tile(prof["layer"] + 1, n_modes),
+        "type": np.tile(types, n_modes),
+        "sigma": prof["sigma"].ravel(),
+        "u": prof["u"].ravel(),
+        "sigma_eff": prof["sig_eff"].ravel(),
+    }
+    row = {"borehole": bh["borehole"], "n_layers": len(bh["layers"]), "depth": bh["layers"][-1]["bot"],
+           "water_depth": bh["water_depth"], "points": n,
+           "sig_eff_base_initial": float(prof["sig_eff"][0, -1]), "sig_eff_base_long": float(prof["sig_eff"][1, -1]),
+           "sig_eff_min": float(prof["sig_eff"].min())}
+    return row, long, prof
+
+
+def plot_borehole(prof, name):
+    """PNG bytes of the three stress states of one borehole (no pyplot, safe in worker processes)."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(12, 5))
+    axes = fig.subplots(1, len(stress_profile.MODES), sharey=True)
+    for m, (ax, title) in enumerate(zip(axes, stress_profile.MODES)):
+        ax.plot(prof["sigma"][m], prof["z"], 'b-', label="Total σ")
+        ax.plot(prof["u"][m], prof["z"], 'r--', label="Pore u")
+        ax.plot(prof["sig_eff"][m], prof["z"], 'k-', linewidth=2, label="Effective σ'")
+        ax.set_title(title)
+        ax.set_xlabel("Stress (kPa)")
+        ax.grid(True)
+    axes[0].invert_yaxis()
+    axes[0].set_ylabel("Depth (m)")
+    axes[0].legend()
+    fig.suptitle(name)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=80)
+    return buf.getvalue()
+
+
+def plot_filename(name):
+    """File name for a borehole's plot."""
+    return "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in name) + ".png"
+
+
+def run_borehole(index, raw, defaults=None, plot=False):
+    """Worker entry point: never raises, returns (index, summary row, long columns or None, PNG or None)."""
+    t0 = time.perf_counter()
+    name = str(raw.get("borehole") or f"BH{index + 1}") if isinstance(raw, dict) else f"BH{index + 1}"
+    long = png = None
+    try:
+        bh = normalize_borehole(raw, index, defaults)
+        row, long, prof = solve_borehole(bh)
+        if plot:
+            png = plot_borehole(prof, bh["borehole"])
+        row.update({"status": "ok", "message": ""})
+    except Exception as e:  # one bad borehole must not stop the batch
+        row = {"borehole": name, "status": "error", "message": f"{type(e).__name__}: {e}"}
+    row["seconds"] = round(time.perf_counter() - t0, 4)
+    return index, row, long, png
+
+
+def _run_chunk(items, defaults, plot):
+    return [run_borehole(i, raw, defaults, plot) for i, raw in items]
+
+
+def run_batch(boreholes, defaults=None, max_workers=None, plot=False, chunk_size=None):
+    """
+    Compute raw borehole records in parallel, yielding (index, row, long, png)
+    as each finishes. A single profile takes about a millisecond, so boreholes
+    go to the `ProcessPoolExecutor` in chunks (default: four per worker) to
+    keep the task overhead small; a crashed worker is reported as error rows.
+    """
+    items = list(enumerate(boreholes))
+    if max_workers == 1 or len(items) < 2:
+        yield from _run_chunk(items, defaults, plot)
+        return
+
+    workers = max_workers or os.cpu_count() or 1
+    size = chunk_size or max(1, math.ceil(len(items) / (4 * workers)))
+    chunks = [items[k:k + size] for k in range(0, len(items), size)]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context()) as pool:
+        futures = {pool.submit(_run_chunk, chunk, defaults, plot): chunk for chunk in chunks}
+        for fut in as_completed(futures):
+            try:
+                yield from fut.result()
+            except Exception as e:
+                for i, raw in futures[fut]:
+                    name = str(raw.get("borehole") or f"BH{i + 1}") if isinstance(raw, dict) else f"BH{i + 1}"
+                    yield i, {"borehole": name, "status": "error", "message": f"{type(e).__name__}: {e}"}, None, None
+
+
+def collect(results):
+    """Ordered (summary DataFrame, long-format DataFrame, {borehole: png}) from `run_batch` output."""
+    results = sorted(results, key=lambda r: r[0])
+    summary = pd.DataFrame([r[1] for r in results], columns=SUMMARY_FIELDS)
+    longs = [pd.DataFrame(r[2]) for r in results if r[2] is not None]
+    table = pd.concat(longs, ignore_index=True) if longs else pd.DataFrame(
+        columns=["borehole", "state", "z", "layer", "type", "sigma", "u", "sigma_eff"])
+    plots = {r[1]["borehole"]: r[3] for r in results if r[3] is not None}
+    return summary, table, plots
+
+
+# =========================================================
+# OUTPUT / CLI
+# =========================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch effective-stress profiles for many boreholes.")
+    parser.add_argument("boreholes", help="Input .csv (one row per layer) or AGS4 file")
+    parser.add_argument("-o", "--output", default="stress_profiles.csv", help="Long-format profile table (.csv)")
+    parser.add_argument("--summary", default=None, help="One row per borehole (.csv)")
+    parser.add_argument("--plots", default=None, help="Directory for one PNG per borehole")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    for key in ("water_depth", "hc", "surcharge", "artesian_head", "g_sat", "g_dry", "gamma_w", "resolution"):
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, type=float, default=DEFAULTS[key],
+                            help=f"Default {key} (default: {DEFAULTS[key]})")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Do not print progress")
+    args = parser.parse_args(argv)
+
+    defaults = {k: getattr(args, k) for k in DEFAULTS if hasattr(args, k)}
+    boreholes = load_boreholes(args.boreholes)
+    t0 = time.perf_counter()
+    summary, table, plots = collect(run_batch(boreholes, defaults, args.workers, plot=bool(args.plots)))
+
+    table.to_csv(args.output, index=False, float_format="%.4f")
+    if args.summary:
+        summary.to_csv(args.summary, index=False, float_format="%.4f")
+    if args.plots:
+        os.makedirs(args.plots, exist_ok=True)
+        for name, png in plots.items():
+            with open(os.path.join(args.plots, plot_filename(name)), "wb") as f:
+                f.write(png)
+
+    n_fail = int((summary["status"] != "ok").sum())
+    if not args.quiet:
+        for row in summary[summary["status"] != "ok"].itertuples():
+            print(f"{row.borehole}: ERROR {row.message}", file=sys.stderr)
+        print(f"{len(summary) - n_fail}/{len(summary)} boreholes in {time.perf_counter() - t0:.1f} s "
+              f"on {args.workers or os.cpu_count()} worker(s) -> {args.output}", file=sys.stderr)
+    return 1 if n_fail else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,13 @@ import streamlit as st
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import numpy as np
+import pandas as pd
+import time
+
+from topics import consolidation_engine
+from topics import stress_distribution
+from topics import settlement_monitoring
+from topics import oedometer
 
 def app():
     # =================================================================
@@ -24,6 +31,37 @@ def app():
     with col_g2:
         surcharge_q = st.number_input("Surface Surcharge $\Delta\sigma$ [kPa]", value=50.0, step=10.0)
 
+    load_extent = st.radio("Load Extent:", ["Uniform Surcharge (Infinite)", "Finite Loaded Areas"], horizontal=True, key="load_extent")
+    loads = []
+    if load_extent.startswith("Finite"):
+        with st.expander("Loaded Areas & Stress Distribution", expanded=True):
+            st.caption("Footings, rafts and embankments on the surface, superposed. B is the width (diameter for a "
+                       "circle, crest width for an embankment), L the length of a rectangle and a the horizontal "
+                       "length of each embankment side slope. Strips and embankments run along y.")
+            loads_df = st.data_editor(
+                pd.DataFrame([{"Type": "Rectangle", "q (kPa)": surcharge_q, "B (m)": 3.0, "L (m)": 3.0,
+                               "a (m)": 0.0, "x (m)": 0.0, "y (m)": 0.0}]),
+                column_config={"Type": st.column_config.SelectboxColumn("Type", options=stress_distribution.LOAD_TYPES, required=True)},
+                num_rows="dynamic", hide_index=True, key="loads_table")
+            sd1, sd2, sd3 = st.columns(3)
+            stress_method = sd1.selectbox("Stress Distribution", stress_distribution.METHODS, key="stress_method")
+            pt_x = sd2.number_input("Point of Interest x [m]", value=0.0, key="load_px")
+            pt_y = sd3.number_input("Point of Interest y [m]", value=0.0, key="load_py")
+            loads = [{"type": r["Type"], "q": r["q (kPa)"], "B": r["B (m)"], "L": r["L (m)"], "a": r["a (m)"],
+                      "x": r["x (m)"], "y": r["y (m)"]}
+                     for r in loads_df.dropna(subset=["Type", "q (kPa)", "B (m)"]).fillna(0.0).to_dict("records")
+                     if r["B (m)"] > 0 or (r["Type"] == "Embankment" and r["a (m)"] > 0)]
+            if not loads:
+                st.warning("No valid loaded area defined; no stress increment is applied.")
+
+    if load_extent.startswith("Finite"):
+        def delta_sigma(z):
+            return stress_distribution.stress_increment(loads, z, pt_x, pt_y, stress_method)
+        q_ref = max((ld["q"] for ld in loads), default=0.0)
+    else:
+        delta_sigma = surcharge_q
+        q_ref = surcharge_q
+
     # =================================================================
     # 3. LAYOUT: INPUTS (Left) - VISUALIZATION (Right)
     # =================================================================
@@ -35,6 +73,10 @@ def app():
     with col_input:
         st.subheader("Soil Stratigraphy")
         num_layers = st.number_input("Number of Layers", 1, 6, 2)
+        s1, s2 = st.columns([1.2, 1])
+        use_sub = s1.checkbox("Split Clay Layers into Sublayers", key="use_sublayers",
+                              help="Evaluates stresses and settlement at the mid-depth of each sublayer instead of once per layer.")
+        n_sub = int(s2.number_input("Sublayers per Clay Layer", 2, 500, 50, key="n_sublayers", disabled=not use_sub)) if use_sub else 1
         
         current_depth = 0.0
 
@@ -59,10 +101,10 @@ def app():
                     
                     if "Method A" in method:
                         rc1, rc2, rc3 = st.columns(3)
-                        e0 = rc1.number_input("Initial $e_0$", 0.85, key=f"e0_{i}")
-                        Cc = rc2.number_input("Index $C_c$", 0.32, key=f"cc_{i}")
-                        Cr = rc3.number_input("Index $C_r$", 0.05, key=f"cr_{i}")
-                        sig_p = st.number_input("Precons. $\sigma'_p$ [kPa]", 100.0, key=f"sp_{i}")
+                        e0 = rc1.number_input("Initial $e_0$", min_value=0.0, value=0.85, key=f"e0_{i}")
+                        Cc = rc2.number_input("Index $C_c$", min_value=0.0, value=0.32, key=f"cc_{i}")
+                        Cr = rc3.number_input("Index $C_r$", min_value=0.0, value=0.05, key=f"cr_{i}")
+                        sig_p = st.number_input("Precons. $\sigma'_p$ [kPa]", min_value=0.0, value=100.0, key=f"sp_{i}")
                         params = {"e0": e0, "Cc": Cc, "Cr": Cr, "sigma_p": sig_p}
                     elif "Method B" in method:
                         mv = st.number_input("Coeff. $m_v$ [1/kPa]", 0.0005, format="%.5f", key=f"mv_{i}")
@@ -96,7 +138,13 @@ def app():
         ax.axhline(water_depth, color='blue', linestyle='--', linewidth=2)
         ax.text(5.1, water_depth, "▽ WT", color='blue', va='center')
         
-        if surcharge_q > 0:
+        if load_extent.startswith("Finite"):
+            z_plot = np.linspace(0.0, max(current_depth, 1.0), 200)
+            ds_plot = delta_sigma(z_plot)
+            if ds_plot.max() > 0:
+                ax.plot(0.5 + 4.0 * ds_plot / ds_plot.max(), z_plot, 'r-', linewidth=1.5)
+                ax.text(2.5, -0.8, f"Δσ(z): {len(loads)} area(s), {stress_method}", color='red', ha='center')
+        elif surcharge_q > 0:
             for x in np.linspace(0.5, 4.5, 6):
                 ax.arrow(x, -0.6, 0, 0.5, head_width=0.15, head_length=0.1, fc='red', ec='red')
             ax.text(2.5, -0.8, f"q = {surcharge_q} kPa", color='red', ha='center')
@@ -107,82 +155,185 @@ def app():
         ax.axis('off')
         st.pyplot(fig)
 
+    # =================================================================
+    # LAB DATA: OEDOMETER TEST PROCESSING
+    # =================================================================
+    def apply_oedometer(layer_idx, params, cv_lab):
+        # Runs as a button callback, before the layer widgets are rebuilt
+        # Values the layer inputs cannot hold (below their 0 minimum) are reported, not clamped
+        st.session_state[f"m_{layer_idx}"] = "Method A: Cc/Cr"
+        skipped = []
+        for key, name, digits in (("e0", "e0", 3), ("cc", "Cc", 3), ("cr", "Cr", 3), ("sp", "sigma_p", 1)):
+            value = params[name]
+            if np.isfinite(value) and value >= 0:
+                st.session_state[f"{key}_{layer_idx}"] = round(value, digits)
+            else:
+                skipped.append(f"{name} = {value:.3g}")
+        if skipped:
+            st.session_state["oed_apply_warning"] = (f"Not applied to Layer {layer_idx + 1} (outside the valid "
+                                                     f"range, check the test data): {', '.join(skipped)}")
+        if np.isfinite(cv_lab):
+            st.session_state["tr_cv"] = round(cv_lab, 3)
+
+    with st.expander("Oedometer Test Processing (Lab Data → Layer Parameters)"):
+        st.caption("CSV with columns Stress (kPa), Time (min) and Dial (mm), one row per reading and optionally an "
+                   "Increment column. $c_v$ is fitted for every increment by Casagrande (log-time) and Taylor "
+                   "(root-time); $C_c$, $C_r$ and $\sigma'_p$ come from the e–log σ' curve.")
+        oed_file = st.file_uploader("Oedometer Readings (.csv)", type=["csv", "txt"], key="oed_file")
+        o1, o2, o3, o4 = st.columns(4)
+        oed_H0 = o1.number_input("Initial Height $H_0$ [mm]", 1.0, 200.0, 20.0, key="oed_H0")
+        oed_e0 = o2.number_input("Initial $e_0$", 0.1, 10.0, 0.9, key="oed_e0")
+        oed_t1 = o3.number_input("Casagrande $t_1$ [min]", 0.01, 60.0, 0.25, key="oed_t1")
+        oed_nv = o4.number_input("Points on Virgin Line", 2, 10, 3, key="oed_nv")
+        oed_flip = st.checkbox("Dial reading decreases on compression", key="oed_flip")
+
+        if oed_file is not None:
+            oed_test = oedometer.load_test(oed_file, oed_flip)
+        else:
+            st.info("No file uploaded: showing a synthetic 12-increment test.")
+            oed_test = oedometer.example_test(e0=oed_e0, H0=oed_H0)
+        oed_tab, comp, tay, cas = oedometer.process_test(oed_test, oed_H0, oed_e0, oed_t1, int(oed_nv))
+
+        n1, n2, n3, n4 = st.columns(4)
+        n1.metric("$C_c$", f"{comp['Cc']:.3f}")
+        n2.metric("$C_r$", f"{comp['Cr']:.3f}")
+        n3.metric("$\sigma'_p$", f"{comp['sigma_p']:.1f} kPa")
+        cv_choice = n4.selectbox("$c_v$ Construction", ["Casagrande", "Taylor"], key="oed_cv_method")
+        st.dataframe(oed_tab.round(4), hide_index=True)
+
+        g1, g2 = st.columns(2)
+        with g1:
+            fig_e, ax_e = plt.subplots(figsize=(5, 4))
+            e_end = oed_tab["e (end)"].to_numpy()
+            ax_e.semilogx(oed_test["stress"], e_end, 'ko-', markersize=4)
+            a_v, m_v = comp["virgin"]
+            x_line = np.log10([oed_test["stress"].min(), oed_test["stress"].max()])
+            ax_e.plot(10**x_line, a_v + m_v * x_line, 'r--', linewidth=1, label="Virgin line")
+            if np.isfinite(comp["sigma_p"]):
+                xc, ec = comp["x_curvature"], comp["e_curvature"]
+                xr = np.array([xc, xc + 0.6])
+                ax_e.plot(10**xr, [ec, ec], 'g:', linewidth=1)
+                ax_e.plot(10**xr, ec + comp["tangent_slope"] * (xr - xc), 'g:', linewidth=1)
+                xb = np.array([xc, np.log10(comp["sigma_p"])])
+                ax_e.plot(10**xb, ec + comp["bisector_slope"] * (xb - xc), 'b-', linewidth=1, label="Bisector")
+                ax_e.axvline(comp["sigma_p"], color='b', linestyle='--', linewidth=0.8)
+            ax_e.set_xlabel("σ' [kPa]")
+            ax_e.set_ylabel("Void Ratio e")
+            ax_e.legend(fontsize=7)
+            ax_e.grid(True, which="both", alpha=0.2)
+            st.pyplot(fig_e)
+        with g2:
+            inc = st.selectbox("Increment", list(oed_tab["Increment"]), index=min(4, len(oed_tab) - 1), key="oed_inc") - 1
+            t_i, d_i = oed_test["T"][inc], oed_test["D"][inc]
+            fig_t, (ax_lt, ax_rt) = plt.subplots(2, 1, figsize=(5, 5))
+            sgn = -1.0 if oed_tab["ΔH (mm)"][inc] < 0 else 1.0
+            ax_lt.semilogx(t_i[t_i > 0], d_i[t_i > 0], 'k.-', markersize=3)
+            for lvl, col in ((cas["d0"][inc], 'g'), (cas["d50"][inc], 'b'), (cas["d100"][inc], 'r')):
+                ax_lt.axhline(sgn * lvl, color=col, linestyle=':', linewidth=0.8)
+            ax_lt.axvline(oed_tab["t50 (min)"][inc], color='b', linewidth=0.8)
+            ax_lt.invert_yaxis()
+            ax_lt.set_ylabel("Dial [mm]")
+            ax_lt.set_title("Casagrande (log t) / Taylor (√t)", fontsize=9)
+            ax_rt.plot(np.sqrt(t_i), d_i, 'k.-', markersize=3)
+            rt = np.sqrt(np.nanmax(t_i)) * np.array([0.0, 0.5])
+            slope = (tay["d90"][inc] - tay["d0"][inc]) * 1.15 / np.sqrt(oed_tab["t90 (min)"][inc])
+            ax_rt.plot(rt, sgn * (tay["d0"][inc] + slope * rt), 'g--', linewidth=0.8)
+            ax_rt.plot(rt, sgn * (tay["d0"][inc] + slope * rt / 1.15), 'r--', linewidth=0.8)
+            ax_rt.axvline(np.sqrt(oed_tab["t90 (min)"][inc]), color='r', linewidth=0.8)
+            ax_rt.invert_yaxis()
+            ax_rt.set_xlabel("Time [min] (top: log scale, bottom: √t)")
+            ax_rt.set_ylabel("Dial [mm]")
+            fig_t.tight_layout()
+            st.pyplot(fig_t)
+
+        loading = np.r_[True, np.diff(oed_test["stress"]) > 0]
+        cv_col = oed_tab[f"cv {cv_choice} (m²/yr)"].to_numpy()
+        cv_lab = float(np.nanmedian(cv_col[loading])) if np.isfinite(cv_col[loading]).any() else np.nan
+        clay_idx = [l['id'] - 1 for l in layers_data if l['type'] == "Clay"]
+        if clay_idx:
+            a1, a2 = st.columns([1, 1])
+            target = a1.selectbox("Apply to Layer", clay_idx, format_func=lambda i: f"Layer {i+1}", key="oed_target")
+            a2.button("Apply Parameters to Layer", key="btn_oed_apply", on_click=apply_oedometer,
+                      args=(target, {"e0": oed_e0, **comp}, cv_lab), disabled=not np.isfinite(comp["sigma_p"]))
+            st.caption(f"Applies $e_0$, $C_c$, $C_r$, $\sigma'_p$ (Method A) and the median loading-branch "
+                       f"$c_v$ = {cv_lab:.3f} m²/yr to the time-rate inputs.")
+            if "oed_apply_warning" in st.session_state:
+                st.warning(st.session_state.pop("oed_apply_warning"))
+
     # =================================================================
     # HELPER: CALCULATION ENGINE
     # =================================================================
-    def calculate_layer(l, all_layers, w_depth, q_surf):
+    def calculate_layer(l, all_layers, w_depth, prof):
+        # Numbers come from the vectorized sublayer profile (prefix sums + masks);
+        # this function only assembles the explanation for one layer.
+        rows = np.flatnonzero(prof['layer'] == l['id'] - 1)
+        settlement = float(prof['layer_settlement'][l['id'] - 1])
+        statuses = list(dict.fromkeys(prof['status'][rows]))
+        status = " / ".join(statuses)
+        sig_0 = float(np.interp(l['mid'], prof['mid'][rows], prof['sig_0'][rows]))
+        sig_f = float(np.interp(l['mid'], prof['mid'][rows], prof['sig_f'][rows]))
+        params = l['params'] if l['type'] == "Clay" else {}
+
+        if len(rows) > 1:
+            math_log = [
+                f"**1. Effective Stress ({len(rows)} sublayers of {l['thickness']/len(rows):.3f} m):**",
+                f"$\sigma'_0 = {prof['sig_0'][rows].min():.2f}$ to ${prof['sig_0'][rows].max():.2f}$ kPa, "
+                f"$\Delta\sigma = {prof['d_sigma'][rows].min():.2f}$ to ${prof['d_sigma'][rows].max():.2f}$ kPa, "
+                f"$\sigma'_f = \sigma'_0 + \Delta\sigma$",
+                "**2. Settlement:** $S = \sum_i S_i$ over the sublayers",
+                pd.DataFrame({
+                    "Mid-Depth (m)": prof['mid'][rows], "σ'0 (kPa)": prof['sig_0'][rows], "Δσ (kPa)": prof['d_sigma'][rows],
+                    "σ'f (kPa)": prof['sig_f'][rows], "Case": prof['status'][rows],
+                    "S_i (mm)": prof['settlement'][rows] * 1000,
+                }).round(3),
+                f"**Result: $S = {settlement:.4f}$ m**",
+            ]
+            return {"settlement": settlement, "status": status, "sig_0": sig_0, "sig_f": sig_f, "log": math_log, "params": params}
+
         # 1. Stress Calculation
-        sigma_str = []
-        sigma_val = 0.0
-        
-        for above in all_layers:
-            if above['id'] < l['id']:
-                sigma_str.append(f"({above['thickness']}m × {above['gamma']})")
-                sigma_val += above['thickness'] * above['gamma']
-        
+        k = rows[0]
+        sigma_str = [f"({above['thickness']}m × {above['gamma']})" for above in all_layers if above['id'] < l['id']]
         sigma_str.append(f"({l['thickness']/2}m × {l['gamma']})")
-        sigma_val += (l['thickness']/2) * l['gamma']
-        
-        u_val = (l['mid'] - w_depth) * 9.81 if l['mid'] > w_depth else 0.0
+        sigma_val = float(prof['sigma'][k])
+        u_val = float(prof['u'][k])
+        d_sig = float(prof['d_sigma'][k])
         u_str = f"({l['mid']} - {w_depth}) × 9.81 = {u_val:.2f}" if l['mid'] > w_depth else "0"
-            
-        sig_0 = sigma_val - u_val
-        sig_f = sig_0 + q_surf
         
         math_log = [
             "**1. Effective Stress:**",
             f"$\sigma_{{total}} = {sigma_val:.2f}$ kPa",
             f"$u = {u_str}$ kPa",
             f"$\sigma'_0 = {sigma_val:.2f} - {u_val:.2f} = \\mathbf{{{sig_0:.2f} \\text{{ kPa}}}}$",
-            f"$\sigma'_f = {sig_0:.2f} + {q_surf} = \\mathbf{{{sig_f:.2f} \\text{{ kPa}}}}$"
+            f"$\sigma'_f = {sig_0:.2f} + {d_sig:g} = \\mathbf{{{sig_f:.2f} \\text{{ kPa}}}}$"
         ]
 
-        # 2. Settlement Calculation
-        settlement = 0.0
-        status = "Skipped"
-        
+        # 2. Settlement Formula
         if l['type'] == "Clay":
             H = l['thickness']
+            p = l['params']
             math_log.append("**2. Settlement Formula:**")
             
             if "Method A" in l['method']:
-                p = l['params']
                 math_log.append(f"Params: $C_c={p['Cc']}, C_r={p['Cr']}, e_0={p['e0']}, \sigma'_p={p['sigma_p']}$")
-                
-                if sig_0 >= p['sigma_p']: 
-                    status = "NC"
-                    settlement = (p['Cc']*H/(1+p['e0'])) * np.log10(sig_f/sig_0)
+                if status == "NC":
                     math_log.append(f"Case: NC ($\sigma'_0 \ge \sigma'_p$)")
                     math_log.append(f"$S = \\frac{{{p['Cc']} \cdot {H}}}{{1+{p['e0']}}} \log\\left(\\frac{{{sig_f:.1f}}}{{{sig_0:.1f}}}\\right)$")
-                
-                elif sig_f <= p['sigma_p']:
-                    status = "OC (Recomp)"
-                    settlement = (p['Cr']*H/(1+p['e0'])) * np.log10(sig_f/sig_0)
+                elif status == "OC (Recomp)":
                     math_log.append(f"Case: OC Recomp ($\sigma'_f \le \sigma'_p$)")
                     math_log.append(f"$S = \\frac{{{p['Cr']} \cdot {H}}}{{1+{p['e0']}}} \log\\left(\\frac{{{sig_f:.1f}}}{{{sig_0:.1f}}}\\right)$")
-                
                 else:
-                    status = "OC (Mixed)"
-                    s1 = (p['Cr']*H/(1+p['e0'])) * np.log10(p['sigma_p']/sig_0)
-                    s2 = (p['Cc']*H/(1+p['e0'])) * np.log10(sig_f/p['sigma_p'])
-                    settlement = s1 + s2
                     math_log.append(f"Case: OC Mixed ($\sigma'_0 < \sigma'_p < \sigma'_f$)")
                     math_log.append(f"$S = S_{{recomp}} + S_{{virgin}}$")
             
             elif "Method B" in l['method']:
-                status = "mv"
-                settlement = l['params']['mv'] * q_surf * H
                 math_log.append(f"$S = m_v \cdot \Delta\sigma \cdot H$")
             
             elif "Method C" in l['method']:
-                status = "Δe"
-                de = l['params']['e0'] - l['params']['e_final']
-                settlement = (de/(1+l['params']['e0'])) * H
                 math_log.append(f"$S = \\frac{{\Delta e}}{{1+e_0}} \cdot H$")
         
         math_log.append(f"**Result: $S = {settlement:.4f}$ m**")
         
-        return {"settlement": settlement, "status": status, "sig_0": sig_0, "sig_f": sig_f, "log": math_log, "params": params if l['type']=="Clay" else {}}
+        return {"settlement": settlement, "status": status, "sig_0": sig_0, "sig_f": sig_f, "log": math_log, "params": params}
 
     # =================================================================
     # 4. RESULTS SECTION
@@ -202,8 +353,9 @@ def app():
             c_res, c_path = st.columns([1.1, 0.9])
 
             with c_res:
+                prof = consolidation_engine.sublayer_profile(layers_data, water_depth, delta_sigma, n_sub)
                 for l in layers_data:
-                    res = calculate_layer(l, layers_data, water_depth, surcharge_q)
+                    res = calculate_layer(l, layers_data, water_depth, prof)
                     l.update(res) # Store results in layer dict
                     calculated_layers.append(l)
 
@@ -282,17 +434,35 @@ def app():
             crit_choice = st.selectbox("Select Critical Clay Layer", clay_opts)
             crit_layer = next(l for l in clay_layers if f"Layer {l['id']}" == crit_choice)
             
-            c_t1, c_t2 = st.columns(2)
-            cv = c_t1.number_input("Coeff. of Consolidation ($c_v$) [m²/year]", value=2.0)
-            dr_path = c_t2.number_input("Drainage Path ($d$ or $H_{dr}$) [m]", value=crit_layer['thickness']/2)
+            c_t1, c_t2, c_t3 = st.columns(3)
+            cv = c_t1.number_input("Coeff. of Consolidation ($c_v$) [m²/year]", value=2.0, key="tr_cv")
+            drainage = c_t2.selectbox("Drainage Boundaries", ["Double (Top & Bottom)", "Single (One Face)"], key="drainage_type")
+            dr_default = crit_layer['thickness'] / 2 if drainage.startswith("Double") else crit_layer['thickness']
+            dr_path = c_t3.number_input("Drainage Path ($d$ or $H_{dr}$) [m]", value=dr_default)
             
             time_goal = st.radio("Goal:", ["Find Time ($t$) for specific $U_{av}$", "Find Settlement ($S_t$) at specific Time ($t$)"])
+            if "Find Time" in time_goal:
+                U_target = st.slider("Target $U_{av}$ (%)", 0, 100, 90)
+            else:
+                t_val = st.number_input("Time (years)", 1.0)
+
+            include_creep = st.checkbox("Include Secondary Compression (Creep)", key="creep_on")
+            if include_creep:
+                creep_df = st.data_editor(pd.DataFrame([{
+                    "Layer": l['id'], "Thickness (m)": l['thickness'], "Cα": 0.01, "e_p": l['params'].get("e0", 0.9),
+                } for l in clay_layers]), disabled=["Layer", "Thickness (m)"], hide_index=True, key="creep_layers")
+                k1, k2, k3, k4 = st.columns(4)
+                U_eop = k1.slider("End of Primary at $U$ (%)", 90, 99, 95, key="creep_ueop")
+                t_min = k2.number_input("Time Grid From [years]", 1e-4, 1.0, 0.01, format="%.4f", key="creep_tmin")
+                t_max = k3.number_input("Time Grid To [years]", 1.0, 1000.0, 100.0, key="creep_tmax")
+                t_life = k4.number_input("Design Life [years]", 1.0, 1000.0, 50.0, key="creep_life")
             
             if st.button("Calculate Time Rate", type="primary"):
                 total_s_final = 0.0
                 st.markdown("#### 1. Total Settlement Calculation")
+                prof = consolidation_engine.sublayer_profile(layers_data, water_depth, delta_sigma, n_sub)
                 for l in layers_data:
-                    res = calculate_layer(l, layers_data, water_depth, surcharge_q)
+                    res = calculate_layer(l, layers_data, water_depth, prof)
                     total_s_final += res['settlement']
                     if res['settlement'] > 0:
                          with st.expander(f"Layer {l['id']} Calc (S = {res['settlement']*1000:.1f} mm)"):
@@ -301,43 +471,351 @@ def app():
                 st.info(f"**Total Ultimate Settlement ($S_{{final}}$) = {total_s_final*1000:.2f} mm**")
                 
                 st.markdown("#### 2. Time Rate Calculation")
+                st.latex(r"U_{av} = 1 - \sum_{m=0}^{\infty} \frac{2}{M^2} e^{-M^2 T_v}, \quad M = \frac{\pi}{2}(2m+1)")
+                Tv_mark = None
                 if "Find Time" in time_goal:
-                    U_target = st.slider("Target $U_{av}$ (%)", 0, 100, 90)
                     U_dec = U_target / 100.0
-                    
-                    if U_dec <= 0.6: Tv = (np.pi/4) * (U_dec**2)
-                    else: Tv = -0.933 * np.log10(1 - U_dec) - 0.085
+                    Tv = consolidation_engine.time_factor(U_dec)
+                    Tv_approx = float(consolidation_engine.approximate_time_factor(U_dec))
                         
-                    if cv > 0:
+                    if cv > 0 and np.isfinite(Tv):
                         t_req = (Tv * dr_path**2) / cv
+                        Tv_mark = Tv
                         st.success(f"**Time required: {t_req:.2f} years**")
-                        st.latex(rf"T_v = {Tv:.4f} \quad (\text{{from }} U_{{av}}={U_target}\%)")
+                        st.latex(rf"T_v = {Tv:.4f} \quad (\text{{series solution for }} U_{{av}}={U_target}\%)")
                         st.latex(rf"t = \frac{{T_v d^2}}{{c_v}} = \frac{{{Tv:.4f} \cdot ({dr_path})^2}}{{{cv}}} = {t_req:.2f} \text{{ years}}")
+                        st.caption(f"Textbook approximation ($T_v = \\pi/4 \\, U^2$ or $-0.933\\log(1-U) - 0.085$): "
+                                   f"$T_v$ = {Tv_approx:.4f}")
+                    elif cv > 0:
+                        st.warning("U_av = 100% is only reached as t → ∞.")
 
                 else:
-                    t_val = st.number_input("Time (years)", 1.0)
-                    
                     if cv > 0:
                         Tv = (cv * t_val) / (dr_path**2)
+                        Tv_mark = Tv
+                        U_calc = consolidation_engine.average_degree(Tv)
                         if Tv <= 0.28:
-                            U_calc = 2 * np.sqrt(Tv / np.pi)
-                            eq_label = r"U_{av} = 2\sqrt{T_v / \pi}"
-                            condition = r"T_v \le 0.28"
+                            U_approx = 2 * np.sqrt(Tv / np.pi)
                         else:
-                            exponent = -(Tv + 0.085) / 0.933
-                            U_calc = 1 - (10 ** exponent)
-                            eq_label = r"U_{av} = 1 - 10^{-\frac{T_v + 0.085}{0.933}}"
-                            condition = r"T_v > 0.28"
-                        
-                        if U_calc > 1.0: U_calc = 1.0
+                            U_approx = 1 - 10 ** (-(Tv + 0.085) / 0.933)
                         s_t = total_s_final * U_calc
                         
                         st.success(f"**Settlement at {t_val} years: {s_t*1000:.2f} mm**")
                         st.write(f"**Calculation Steps:**")
                         st.latex(rf"T_v = \frac{{c_v t}}{{d^2}} = \frac{{{cv} \cdot {t_val}}}{{{dr_path}^2}} = {Tv:.4f}")
-                        st.write(f"Using equation for ${condition}$:")
-                        st.latex(eq_label)
                         st.metric("Average Degree of Consolidation ($U_{av}$)", f"{U_calc*100:.1f} %")
+                        st.caption(f"Textbook approximation: $U_{{av}}$ = {min(U_approx, 1.0)*100:.1f} %")
+
+                if Tv_mark is not None and cv > 0:
+                    st.markdown("#### 3. Isochrones & Settlement-Time Curve")
+                    drain_key = "double" if drainage.startswith("Double") else "single"
+                    Tv_iso = np.array(sorted({0.05, 0.1, 0.2, 0.3, 0.5, 0.8, round(Tv_mark, 3)}))
+                    z_iso, u_iso = consolidation_engine.isochrones(dr_path, cv, Tv_iso * dr_path**2 / cv, drain_key)
+
+                    # Hundreds of time steps evaluated in one call
+                    t_curve = np.logspace(np.log10(1e-4 * dr_path**2 / cv),
+                                          np.log10(max(consolidation_engine.time_factor(0.999), 2 * Tv_mark) * dr_path**2 / cv), 400)
+                    s_curve = consolidation_engine.settlement_time(total_s_final, dr_path, cv, t_curve)
+
+                    c_iso, c_st = st.columns(2)
+                    with c_iso:
+                        fig_i, ax_i = plt.subplots(figsize=(5, 4.5))
+                        for tv_i, u_col in zip(Tv_iso, u_iso.T):
+                            is_mark = np.isclose(tv_i, round(Tv_mark, 3))
+                            ax_i.plot(u_col, z_iso, 'r-' if is_mark else 'k-', linewidth=2 if is_mark else 0.8)
+                            k_lab = np.argmax(u_col)
+                            ax_i.text(u_col[k_lab], z_iso[k_lab], f"{tv_i:g}", fontsize=7, color='r' if is_mark else 'k')
+                        ax_i.set_ylim(z_iso[-1], 0)
+                        ax_i.set_xlim(0, 1.05)
+                        ax_i.set_xlabel(r"$u / \Delta\sigma$")
+                        ax_i.set_ylabel("Depth in Layer [m]")
+                        ax_i.set_title("Isochrones (labels: $T_v$)")
+                        ax_i.grid(True, alpha=0.3)
+                        st.pyplot(fig_i)
+                    with c_st:
+                        fig_s, ax_s = plt.subplots(figsize=(5, 4.5))
+                        ax_s.plot(t_curve, s_curve * 1000, 'b-')
+                        ax_s.axvline(Tv_mark * dr_path**2 / cv, color='r', linestyle='--', linewidth=1)
+                        ax_s.set_xscale('log')
+                        ax_s.invert_yaxis()
+                        ax_s.set_xlabel("Time [years]")
+                        ax_s.set_ylabel("Settlement [mm]")
+                        ax_s.set_title("Settlement vs. Time")
+                        ax_s.grid(True, which="both", alpha=0.3)
+                        st.pyplot(fig_s)
+
+                if include_creep and cv > 0:
+                    st.markdown("#### 4. Secondary Compression (Creep)")
+                    st.latex(r"S_s = \sum \frac{C_\alpha}{1 + e_p} H \log\frac{t}{t_p}, \quad t > t_p")
+                    creep_rows = creep_df.dropna()
+                    t_grid = np.logspace(np.log10(t_min), np.log10(max(t_max, t_life)), 400)
+                    creep = consolidation_engine.settlement_with_creep(
+                        total_s_final, dr_path, cv, t_grid, creep_rows["Cα"].to_numpy(), creep_rows["e_p"].to_numpy(),
+                        creep_rows["Thickness (m)"].to_numpy(), U_eop / 100.0)
+                    S_life = np.interp(np.log10(t_life), np.log10(t_grid), creep['total'])
+                    Ss_life = np.interp(np.log10(t_life), np.log10(t_grid), creep['secondary'])
+                    k1, k2, k3 = st.columns(3)
+                    k1.metric("End of Primary $t_p$", f"{creep['t_p']:.2f} years")
+                    k2.metric(f"Settlement at {t_life:g} years", f"{S_life*1000:.1f} mm")
+                    k3.metric("Creep Share", f"{Ss_life / S_life * 100:.0f} %" if S_life > 0 else "–")
+
+                    fig_c, ax_c = plt.subplots(figsize=(8, 4))
+                    ax_c.plot(creep['t'], creep['primary'] * 1000, 'b--', label="Primary")
+                    ax_c.plot(creep['t'], creep['secondary'] * 1000, 'g:', label="Secondary")
+                    ax_c.plot(creep['t'], creep['total'] * 1000, 'k-', linewidth=2, label="Total")
+                    ax_c.axvline(creep['t_p'], color='grey', linestyle='--', linewidth=0.8)
+                    ax_c.axvline(t_life, color='r', linestyle=':', linewidth=1)
+                    ax_c.set_xscale('log')
+                    ax_c.invert_yaxis()
+                    ax_c.set_xlabel("Time [years]")
+                    ax_c.set_ylabel("Settlement [mm]")
+                    ax_c.legend(fontsize=8)
+                    ax_c.grid(True, which="both", alpha=0.3)
+                    st.pyplot(fig_c)
+
+            # -------------------------------------------------------------
+            # MULTILAYER FINITE-DIFFERENCE SOLVER
+            # -------------------------------------------------------------
+            st.markdown("---")
+            with st.expander("Multilayer Finite-Difference Solver (Staged / Ramped Loading)"):
+                st.caption("Solves all layers together (Crank-Nicolson, tridiagonal system) with each layer's own "
+                           "$c_v$ and $m_v$. Sand layers are modelled as stiff, highly permeable layers.")
+                if load_extent.startswith("Finite"):
+                    st.caption("With finite loaded areas, the stages give the peak surface pressure and the "
+                               "increment at depth is scaled by the stress-distribution profile Δσ(z) / q.")
+                fd_default = pd.DataFrame([{
+                    "Layer": l['id'], "Type": l['type'], "Thickness (m)": l['thickness'],
+                    "cv (m²/yr)": 2.0 if l['type'] == "Clay" else 1000.0,
+                    "mv (1/kPa)": l['params'].get("mv", 0.0005) if l['type'] == "Clay" else 1e-5,
+                } for l in layers_data])
+                fd_layers = st.data_editor(fd_default, disabled=["Layer", "Type", "Thickness (m)"], hide_index=True, key="fd_layers")
+
+                st.markdown("**Load Stages** (ramp = 0 for an instantaneous step)")
+                fd_stages = st.data_editor(pd.DataFrame([{"Start (yr)": 0.0, "Ramp (yr)": 0.0, "Δq (kPa)": q_ref}]),
+                                           num_rows="dynamic", hide_index=True, key="fd_stages")
+
+                f1, f2, f3 = st.columns(3)
+                fd_top = f1.checkbox("Top Drained", value=True, key="fd_top")
+                fd_bot = f2.checkbox("Bottom Drained", value=True, key="fd_bot")
+                fd_tend = f3.number_input("Duration [years]", 0.01, 1000.0, 10.0, key="fd_tend")
+                fd_nodes = f1.number_input("Nodes", 11, 5000, 201, key="fd_nodes")
+                fd_steps = f2.number_input("Time Steps", 10, 100000, 2000, key="fd_steps")
+                fd_grid = f3.selectbox("Time Grid", ["Uniform", "Logarithmic"], key="fd_grid")
+
+                if st.button("Run FD Solver", key="btn_fd"):
+                    stages = [{"time": r["Start (yr)"], "duration": r["Ramp (yr)"], "dq": r["Δq (kPa)"]}
+                              for r in fd_stages.dropna().to_dict("records")]
+                    lay_fd = [{"thickness": r["Thickness (m)"], "cv": r["cv (m²/yr)"], "mv": r["mv (1/kPa)"]}
+                              for r in fd_layers.to_dict("records")]
+                    if any(lay["cv"] <= 0 or lay["mv"] <= 0 for lay in lay_fd):
+                        st.error("cv and mv must be positive in every layer.")
+                    elif not stages:
+                        st.error("Add at least one load stage.")
+                    else:
+                        if fd_grid == "Uniform":
+                            t_fd = np.linspace(0.0, fd_tend, int(fd_steps) + 1)
+                        else:
+                            t_fd = np.concatenate(([0.0], np.logspace(np.log10(fd_tend) - 5, np.log10(fd_tend), int(fd_steps))))
+                        t0 = time.perf_counter()
+                        factor = None
+                        if load_extent.startswith("Finite") and q_ref > 0:
+                            factor = lambda z: delta_sigma(z) / q_ref
+                        res_fd = consolidation_engine.fd_consolidation(lay_fd, t_fd, stages, fd_top, fd_bot, int(fd_nodes),
+                                                                       stress_factor=factor)
+                        elapsed = time.perf_counter() - t0
+
+                        m1, m2, m3 = st.columns(3)
+                        m1.metric("Settlement at End", f"{res_fd['settlement'][-1]*1000:.1f} mm")
+                        m2.metric("Ultimate Settlement", f"{res_fd['S_final']*1000:.1f} mm")
+                        m3.metric("U_av at End", f"{res_fd['U_avg'][-1]*100:.1f} %")
+                        st.caption(f"{len(res_fd['z'])} nodes × {len(t_fd) - 1} steps in {elapsed:.2f} s "
+                                   f"({'factorization reused' if res_fd['constant_dt'] else 'variable time step'}).")
+
+                        c_fd1, c_fd2 = st.columns(2)
+                        with c_fd1:
+                            fig_u, ax_u = plt.subplots(figsize=(5, 4.5))
+                            picks = np.unique(np.linspace(0, len(res_fd['t_saved']) - 1, 8).astype(int))
+                            for k in picks:
+                                ax_u.plot(res_fd['u'][k], res_fd['z'], label=f"t = {res_fd['t_saved'][k]:.3g} yr")
+                            for l in layers_data[:-1]:
+                                ax_u.axhline(l['bottom'], color='grey', linestyle=':', linewidth=0.8)
+                            ax_u.set_ylim(res_fd['z'][-1], 0)
+                            ax_u.set_xlabel("Excess Pore Pressure u [kPa]")
+                            ax_u.set_ylabel("Depth [m]")
+                            ax_u.legend(fontsize=7)
+                            ax_u.grid(True, alpha=0.3)
+                            st.pyplot(fig_u)
+                        with c_fd2:
+                            fig_st, ax_st = plt.subplots(figsize=(5, 4.5))
+                            ax_st.plot(t_fd, res_fd['settlement'] * 1000, 'b-', label="Settlement")
+                            ax_st.set_xlabel("Time [years]")
+                            ax_st.set_ylabel("Settlement [mm]")
+                            ax_st.invert_yaxis()
+                            ax_q = ax_st.twinx()
+                            ax_q.plot(t_fd, res_fd['load'], 'r--', linewidth=1, label="Surcharge")
+                            ax_q.set_ylabel("Surcharge [kPa]", color='r')
+                            if fd_grid == "Logarithmic":
+                                ax_st.set_xscale('log')
+                            ax_st.grid(True, alpha=0.3)
+                            st.pyplot(fig_st)
+
+            # -------------------------------------------------------------
+            # VERTICAL DRAINS (RADIAL CONSOLIDATION)
+            # -------------------------------------------------------------
+            with st.expander("Vertical Drains (Radial Consolidation) – Layout Optimizer"):
+                st.caption("Hansbo radial consolidation with smear and well resistance, combined with vertical "
+                           "drainage of the critical layer by Carrillo's rule.")
+                st.latex(r"U_h = 1 - e^{-8T_h/F},\; F = \ln\frac{n}{s} + \frac{k_h}{k_s}\ln s - 0.75 + \frac{2}{3}\pi l^2 \frac{k_h}{q_w},"
+                         r"\quad 1 - U = (1 - U_v)(1 - U_h)")
+                H_vd = crit_layer['thickness']
+                v1, v2, v3 = st.columns(3)
+                ch = v1.number_input("$c_h$ [m²/year]", 0.01, 1000.0, float(2 * cv) if cv > 0 else 4.0, key="vd_ch")
+                vd_t = v2.number_input("Target Time [years]", 0.01, 100.0, 0.5, key="vd_t")
+                vd_U = v3.slider("Target $U$ (%)", 10, 99, 90, key="vd_U")
+                vd_a = v1.number_input("Drain Width $a$ [mm]", 1.0, 500.0, 100.0, key="vd_a")
+                vd_b = v2.number_input("Drain Thickness $b$ [mm]", 1.0, 500.0, 4.0, key="vd_b")
+                vd_bot = v3.checkbox("Layer Base Drained", value=drainage.startswith("Double"), key="vd_bot")
+                vd_s = v1.number_input("Smear Ratio $d_s/d_w$", 1.0, 20.0, 2.0, key="vd_s")
+                vd_khks = v2.number_input("$k_h / k_s$", 1.0, 20.0, 2.0, key="vd_khks")
+                vd_kh = v3.number_input("$k_h$ [m/year]", 0.0, 100.0, 0.03, format="%.4f", key="vd_kh")
+                vd_qw = v1.number_input("Discharge Capacity $q_w$ [m³/year]", 0.1, 10000.0, 100.0, key="vd_qw")
+                vd_cost_m = v2.number_input("Cost per m of Drain", 0.0, 1e4, 1.5, key="vd_cost_m")
+                vd_cost_d = v3.number_input("Cost per Drain (Mobilisation)", 0.0, 1e4, 2.0, key="vd_cost_d")
+
+                g1, g2, g3 = st.columns(3)
+                sp_min, sp_max = g1.slider("Spacing Range [m]", 0.5, 6.0, (0.8, 3.5), 0.1, key="vd_sp")
+                ln_min, ln_max = g2.slider("Drain Length Range [m]", 0.5, float(max(H_vd, 1.0)), (min(2.0, H_vd), H_vd), 0.5, key="vd_len")
+                vd_area = g3.number_input("Treated Area [m²]", 1.0, 1e7, 1000.0, key="vd_area")
+
+                if st.button("Optimize Drain Layout", key="btn_drains"):
+                    dw = consolidation_engine.equivalent_drain_diameter(vd_a, vd_b) / 1000.0
+                    spacings = np.arange(sp_min, sp_max + 1e-9, 0.05)
+                    lengths = np.linspace(ln_min, ln_max, 41)
+                    res_vd = consolidation_engine.drain_layout_search(
+                        H_vd, cv, ch, vd_t, vd_U / 100.0, spacings, lengths, dw=dw, smear_ratio=vd_s,
+                        kh_ks=vd_khks, kh_qw=vd_kh / vd_qw, bottom_drained=vd_bot,
+                        cost_per_m=vd_cost_m, cost_per_drain=vd_cost_d, area=vd_area)
+                    U_none = float(consolidation_engine.average_degree(cv * vd_t / (H_vd / 2 if vd_bot else H_vd) ** 2))
+                    best = res_vd['best']
+                    st.caption(f"{res_vd['U'].size} layouts evaluated; without drains $U$ = {U_none*100:.1f} % at {vd_t} years.")
+                    if best is None:
+                        st.error(f"No layout in the search range reaches {vd_U} % in {vd_t} years. "
+                                 "Reduce the spacing or extend the drains.")
+                    else:
+                        st.success(f"**Cheapest layout: {best['pattern']} grid at {best['spacing']:.2f} m, "
+                                   f"drains {best['length']:.1f} m long**")
+                        m1, m2, m3 = st.columns(3)
+                        m1.metric("U at Target Time", f"{best['U']*100:.1f} %")
+                        m2.metric("Number of Drains", f"{best['n_drains']:.0f}")
+                        m3.metric("Total Cost", f"{best['cost']:,.0f}")
+
+                    c_vd1, c_vd2 = st.columns(2)
+                    with c_vd1:
+                        fig_v, ax_v = plt.subplots(figsize=(5, 4.5))
+                        for i, pat in enumerate(res_vd['patterns']):
+                            ax_v.plot(res_vd['spacings'], res_vd['U'][i, :, -1] * 100, label=f"{pat} (L = {lengths[-1]:.1f} m)")
+                        ax_v.axhline(vd_U, color='r', linestyle='--', linewidth=1)
+                        ax_v.set_xlabel("Drain Spacing [m]")
+                        ax_v.set_ylabel(f"U at {vd_t} years [%]")
+                        ax_v.legend(fontsize=8)
+                        ax_v.grid(True, alpha=0.3)
+                        st.pyplot(fig_v)
+                    if best is not None:
+                        with c_vd2:
+                            t_vd = np.linspace(0.0, 3 * vd_t, 300)
+                            U_vd = consolidation_engine.drain_degree(
+                                t_vd, H_vd, cv, ch, best['spacing'], best['pattern'], best['length'], dw,
+                                vd_s, vd_khks, vd_kh / vd_qw, vd_bot)
+                            U_v = consolidation_engine.average_degree(cv * t_vd / (H_vd / 2 if vd_bot else H_vd) ** 2)
+                            fig_c, ax_c = plt.subplots(figsize=(5, 4.5))
+                            ax_c.plot(t_vd, U_vd * 100, 'b-', label="With drains")
+                            ax_c.plot(t_vd, U_v * 100, 'k--', label="Vertical only")
+                            ax_c.axvline(vd_t, color='r', linestyle=':', linewidth=1)
+                            ax_c.set_xlabel("Time [years]")
+                            ax_c.set_ylabel("Average Degree U [%]")
+                            ax_c.legend(fontsize=8)
+                            ax_c.grid(True, alpha=0.3)
+                            st.pyplot(fig_c)
+
+            # -------------------------------------------------------------
+            # SETTLEMENT MONITORING BACK-ANALYSIS
+            # -------------------------------------------------------------
+            with st.expander("Settlement-Plate Back-Analysis (Asaoka / Hyperbolic)"):
+                st.caption("Upload plate readings either in long format (columns Plate, Time, Settlement) or wide "
+                           "format (first column Time, one column per plate). All plates are fitted in one batch.")
+                mon_file = st.file_uploader("Settlement-Plate Readings (.csv)", type=["csv", "txt"], key="mon_file")
+                m1, m2, m3 = st.columns(3)
+                mon_tunit = m1.selectbox("Time Unit in File", ["days", "weeks", "years"], key="mon_tunit")
+                mon_sunit = m2.selectbox("Settlement Unit in File", ["mm", "m"], key="mon_sunit")
+                mon_hdr = m3.number_input("Drainage Path $H_{dr}$ [m]", 0.1, 100.0, float(dr_path), key="mon_hdr")
+                mon_tstart = m1.number_input("Fit From (End of Fill) [years]", 0.0, 100.0, 0.1, key="mon_tstart")
+                mon_dt = m2.number_input("Asaoka Interval $\Delta t$ [years]", 0.001, 5.0, 0.02, format="%.3f", key="mon_dt")
+
+                if st.button("Run Back-Analysis", key="btn_monitor"):
+                    t_scale = {"days": 1 / 365.25, "weeks": 7 / 365.25, "years": 1.0}[mon_tunit]
+                    s_scale = 1e-3 if mon_sunit == "mm" else 1.0
+                    if mon_file is not None:
+                        ids, T_mon, S_mon = settlement_monitoring.load_readings(mon_file, t_scale, s_scale)
+                    else:
+                        # Example: 24 plates scattered around the current cv and drainage path
+                        st.info("No file uploaded: running on 24 synthetic plates generated from the current $c_v$.")
+                        rng = np.random.default_rng(0)
+                        series = []
+                        for _ in range(24):
+                            t_ex = np.sort(rng.uniform(0.0, 1.5 * consolidation_engine.time_factor(0.9) * mon_hdr**2 / max(cv, 1e-6), 40))
+                            s_ex = rng.uniform(0.1, 0.4) * consolidation_engine.average_degree(cv * rng.uniform(0.6, 1.4) * t_ex / mon_hdr**2)
+                            series.append((t_ex, s_ex + rng.normal(0.0, 5e-4, t_ex.size)))
+                        ids = [f"SP-{i+1:02d}" for i in range(len(series))]
+                        T_mon, S_mon = settlement_monitoring.pad_series(series)
+
+                    if not np.isfinite(T_mon).any():
+                        st.error("No valid readings found.")
+                    else:
+                        t0 = time.perf_counter()
+                        summary = settlement_monitoring.back_analysis(ids, T_mon, S_mon, mon_dt, mon_tstart, mon_hdr)
+                        elapsed = time.perf_counter() - t0
+                        st.session_state["mon_result"] = (ids, T_mon, S_mon, summary, elapsed)
+
+                if "mon_result" in st.session_state:
+                    ids, T_mon, S_mon, summary, elapsed = st.session_state["mon_result"]
+                    r1, r2, r3 = st.columns(3)
+                    r1.metric("Median S_ult (Asaoka)", f"{np.nanmedian(summary['Asaoka S_ult (mm)']):.1f} mm")
+                    r2.metric("Median Field $c_v$ (Asaoka)", f"{np.nanmedian(summary['Asaoka cv (m²/yr)']):.2f} m²/yr",
+                              delta=f"{np.nanmedian(summary['Asaoka cv (m²/yr)']) - cv:+.2f} vs. design")
+                    r3.metric("Median t90 (Asaoka)", f"{np.nanmedian(summary['Asaoka t90 (yr)']):.2f} yr")
+                    st.caption(f"{len(ids)} plates fitted in {elapsed*1000:.0f} ms.")
+                    st.dataframe(summary.round(3), hide_index=True)
+                    st.download_button("Download Summary (.csv)", summary.to_csv(index=False), "back_analysis.csv",
+                                       "text/csv", key="mon_download")
+
+                    plate = st.selectbox("Plate to Plot", ids, key="mon_plate")
+                    i = ids.index(plate)
+                    row = summary.iloc[i]
+                    fig_m, (ax_m1, ax_m2) = plt.subplots(1, 2, figsize=(10, 4))
+                    ax_m1.plot(T_mon[i], S_mon[i] * 1000, 'ko', markersize=3, label="Readings")
+                    for col, style in (("Asaoka S_ult (mm)", 'b--'), ("Hyperbolic S_ult (mm)", 'g:')):
+                        if np.isfinite(row[col]):
+                            ax_m1.axhline(row[col], color=style[0], linestyle=style[1:], label=col.replace(" (mm)", ""))
+                    ax_m1.axvline(mon_tstart, color='grey', linewidth=0.8)
+                    ax_m1.invert_yaxis()
+                    ax_m1.set_xlabel("Time [years]")
+                    ax_m1.set_ylabel("Settlement [mm]")
+                    ax_m1.legend(fontsize=7)
+                    ax_m1.grid(True, alpha=0.3)
+
+                    s_grid = settlement_monitoring.resample(T_mon[i:i+1], S_mon[i:i+1],
+                                                            np.arange(mon_tstart, np.nanmax(T_mon[i]) + 0.5 * mon_dt, mon_dt))[0] * 1000
+                    ax_m2.plot(s_grid[:-1], s_grid[1:], 'ko', markersize=3)
+                    if np.isfinite(row["Asaoka S_ult (mm)"]):
+                        lim = np.array([np.nanmin(s_grid), row["Asaoka S_ult (mm)"]])
+                        b1 = row["Asaoka β1"]
+                        ax_m2.plot(lim, row["Asaoka S_ult (mm)"] * (1 - b1) + b1 * lim, 'b-', linewidth=1)
+                        ax_m2.plot(lim, lim, 'k:', linewidth=0.8)
+                    ax_m2.set_xlabel("$S_{i-1}$ [mm]")
+                    ax_m2.set_ylabel("$S_i$ [mm]")
+                    ax_m2.set_title("Asaoka Plot")
+                    ax_m2.grid(True, alpha=0.3)
+                    st.pyplot(fig_m)
 
 if __name__ == "__main__":
     app()
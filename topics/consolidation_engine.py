@@ -0,0 +1,432 @@
+import numpy as np
+from functools import lru_cache
+
+from topics.stress_profile import StressProfile
+
+# =========================================================
+# CONSOLIDATION ENGINE (no Streamlit imports)
+# =========================================================
+GAMMA_W = 9.81
+
+
+# =========================================================
+# SUBLAYER STRESSES & FINAL SETTLEMENT
+# =========================================================
+# `layers` follows the app's layer dicts: "thickness", "gamma" (saturated
+# unit weight), "type" ("Clay"/"Sand"), "method" ("Method A: Cc/Cr",
+# "Method B: mv", "Method C: Δe" or "None") and "params".
+
+def sublayer_profile(layers, water_depth, q, n_sub=1, gamma_w=GAMMA_W):
+    """
+    Split clay layers into `n_sub` sublayers and compute stresses and final
+    settlement for all of them in one vectorized pass.
+
+    Overburden and pore pressure at each sublayer mid-depth are read from a
+    `StressProfile` of the initial state; the NC / OC recompression / OC
+    mixed branches of Method A and Methods B/C are applied with boolean
+    masks. Returns a dict of per-sublayer arrays plus per-layer settlement
+    totals. `q` is the stress increment: a constant (infinite surcharge), one
+    value per sublayer, or a callable of depth (e.g. from
+    `stress_distribution.stress_increment`).
+    """
+    n = np.array([n_sub if l["type"] == "Clay" else 1 for l in layers], dtype=int)
+    idx = np.repeat(np.arange(len(layers)), n)
+    H = np.array([l["thickness"] for l in layers], dtype=float)
+    dz = (H / n)[idx]
+
+    bottom = np.cumsum(dz)
+    top = bottom - dz
+    mid = top + 0.5 * dz
+    bounds = np.concatenate([[0.0], np.cumsum(H)])
+    initial = StressProfile.from_layers(
+        [{"id": i + 1, "type": l["type"], "top": bounds[i], "bot": bounds[i + 1], "g_sat": l["gamma"],
+          "g_dry": l["gamma"]} for i, l in enumerate(layers)], water_depth, gamma_w=gamma_w, mode=0)
+    sigma, u = initial.sigma(mid), initial.u(mid)
+    sig_0 = sigma - u
+    d_sigma = np.asarray(q(mid) if callable(q) else np.broadcast_to(q, mid.shape), dtype=float)
+    sig_f = sig_0 + d_sigma
+
+    def param(name, default=np.nan):
+        return np.array([l["params"].get(name, default) if l["type"] == "Clay" else default
+                         for l in layers], dtype=float)[idx]
+
+    method = np.array([l["method"].split(":")[0] if l["type"] == "Clay" else "None" for l in layers])[idx]
+    e0, Cc, Cr, sp = param("e0"), param("Cc"), param("Cr"), param("sigma_p")
+    mv, e_f = param("mv"), param("e_final")
+
+    is_a, is_b, is_c = method == "Method A", method == "Method B", method == "Method C"
+    nc = is_a & (sig_0 >= sp)
+    oc = is_a & ~nc & (sig_f <= sp)
+    mixed = is_a & ~nc & ~oc
+
+    S = np.zeros(mid.shape)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fac = dz / (1 + e0)
+        S = np.where(nc, Cc * fac * np.log10(sig_f / sig_0), S)
+        S = np.where(oc, Cr * fac * np.log10(sig_f / sig_0), S)
+        S = np.where(mixed, fac * (Cr * np.log10(sp / sig_0) + Cc * np.log10(sig_f / sp)), S)
+        S = np.where(is_b, mv * d_sigma * dz, S)
+        S = np.where(is_c, (e0 - e_f) / (1 + e0) * dz, S)
+
+    status = np.select([nc, oc, mixed, is_b, is_c], ["NC", "OC (Recomp)", "OC (Mixed)", "mv", "Δe"], "Skipped")
+    return {
+        "layer": idx, "top": top, "bottom": bottom, "mid": mid, "dz": dz,
+        "sigma": sigma, "u": u, "sig_0": sig_0, "sig_f": sig_f, "d_sigma": d_sigma,
+        "settlement": S, "status": status,
+        "layer_settlement": np.bincount(idx, weights=S, minlength=len(layers)),
+    }
+
+
+# =========================================================
+# TERZAGHI 1D SERIES SOLUTION
+# =========================================================
+# With M = pi (2m + 1) / 2 and Z = z / H_dr:
+#   Uz(Z, Tv) = 1 - sum 2/M sin(M Z) exp(-M^2 Tv)
+#   U_av(Tv)  = 1 - sum 2/M^2 exp(-M^2 Tv)
+
+def series_terms(tv_min, tol=1e-8, max_terms=5000):
+    """Number of series terms so the first neglected term is below `tol` for every Tv >= tv_min."""
+    if tv_min <= 0:
+        return max_terms
+    M_max = np.sqrt(np.log(1.0 / tol) / tv_min)
+    return int(np.clip(np.ceil(M_max / np.pi - 0.5) + 1, 1, max_terms))
+
+
+def _eigenvalues(n_terms):
+    return np.pi * (2 * np.arange(n_terms) + 1) / 2
+
+
+def degree_of_consolidation(z_ratio, Tv, tol=1e-8, max_terms=5000):
+    """
+    Local degree of consolidation Uz on a depth x time grid, shape (len(z_ratio), len(Tv)).
+
+    `z_ratio` = z / H_dr (0 to 2 for double drainage, 0 to 1 for single).
+    The series is one matrix product: sin(M Z) of shape (nz, n) times
+    2/M exp(-M^2 Tv) of shape (n, nt), with n set by the smallest positive Tv.
+    At Tv = 0 the exact initial condition (Uz = 0 away from drained faces)
+    is used instead of the slowly converging series.
+    """
+    Z = np.atleast_1d(np.asarray(z_ratio, dtype=float))
+    Tv = np.atleast_1d(np.asarray(Tv, dtype=float))
+    positive = Tv > 0
+    n = series_terms(Tv[positive].min() if positive.any() else 0.0, tol, max_terms)
+    M = _eigenvalues(n)
+
+    space = np.sin(np.outer(Z, M))
+    time = (2.0 / M)[:, None] * np.exp(-np.outer(M**2, np.where(positive, Tv, 0.0)))
+    Uz = 1.0 - space @ time
+
+    drained = np.isclose(np.sin(np.pi * Z / 2), 0.0)  # Z = 0, 2: drainage faces
+    Uz[:, ~positive] = np.where(drained, 1.0, 0.0)[:, None]
+    return np.clip(Uz, 0.0, 1.0)
+
+
+def average_degree(Tv, tol=1e-10, max_terms=5000):
+    """Average degree of consolidation U_av(Tv) from the series (broadcasts over Tv)."""
+    Tv = np.asarray(Tv, dtype=float)
+    flat = np.atleast_1d(Tv).ravel()
+    positive = flat > 0
+    # Terms decay as 2/M^2, so far fewer are needed than for Uz
+    n = series_terms(flat[positive].min() if positive.any() else 0.0, tol, max_terms)
+    M = _eigenvalues(n)
+    U = 1.0 - (2.0 / M**2) @ np.exp(-np.outer(M**2, np.where(positive, flat, 0.0)))
+    U = np.where(positive, np.clip(U, 0.0, 1.0), 0.0)
+    return U.reshape(Tv.shape) if Tv.ndim else float(U[0])
+
+
+@lru_cache(maxsize=4)
+def _tv_table(n_points=4001):
+    """Cached (U_av, Tv) table for inverse interpolation."""
+    tv = np.logspace(-8, 1, n_points)
+    return average_degree(tv), tv
+
+
+def time_factor(U):
+    """
+    Tv for a target average degree U (0-1), by interpolating the cached
+    U_av(Tv) table in log Tv; beyond the table the one-term solution
+    Tv = -4/pi^2 ln(pi^2 (1 - U) / 8) is exact to machine precision.
+    """
+    U = np.asarray(U, dtype=float)
+    u_tab, tv_tab = _tv_table()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tv = np.exp(np.interp(U, u_tab, np.log(tv_tab)))
+        one_term = -4.0 / np.pi**2 * np.log(np.pi**2 * (1.0 - U) / 8.0)
+    tv = np.where(U > u_tab[-1], one_term, tv)
+    tv = np.where(U <= 0, 0.0, np.where(U >= 1, np.inf, tv))
+    return float(tv) if tv.ndim == 0 else tv
+
+
+def approximate_time_factor(U):
+    """Textbook approximation: Tv = pi/4 U^2 (U <= 0.6), else -0.933 log10(1 - U) - 0.085."""
+    U = np.asarray(U, dtype=float)
+    with np.errstate(divide="ignore"):
+        return np.where(U <= 0.6, np.pi / 4 * U**2, -0.933 * np.log10(1 - U) - 0.085)
+
+
+def isochrones(H_dr, cv, times, drainage="double", n_z=101, u0=1.0):
+    """
+    Excess pore pressure u(z, t) = u0 (1 - Uz) over the layer depth for every
+    time in `times` (one column per time). Returns (z, u).
+    """
+    thickness = 2 * H_dr if drainage == "double" else H_dr
+    z = np.linspace(0.0, thickness, n_z)
+    Tv = cv * np.asarray(times, dtype=float) / H_dr**2
+    return z, u0 * (1.0 - degree_of_consolidation(z / H_dr, Tv))
+
+
+def settlement_time(S_final, H_dr, cv, times):
+    """Settlement S(t) = S_final U_av(cv t / H_dr^2) for an array of times."""
+    return S_final * average_degree(cv * np.asarray(times, dtype=float) / H_dr**2)
+
+
+# =========================================================
+# SECONDARY COMPRESSION (CREEP)
+# =========================================================
+# Ss(t) = Ca / (1 + e_p) H log10(t / t_p) for t > t_p (Mesri), summed over
+# the clay layers; t_p is the end of primary consolidation.
+
+def secondary_compression(times, t_p, C_alpha, e_p, H):
+    """Secondary settlement at `times`, one value per time; C_alpha, e_p, H are per-layer arrays."""
+    t = np.asarray(times, dtype=float)
+    ratio = (np.atleast_1d(np.asarray(C_alpha, dtype=float)) / (1.0 + np.atleast_1d(np.asarray(e_p, dtype=float)))
+             * np.atleast_1d(np.asarray(H, dtype=float)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_t = np.where(t > t_p, np.log10(np.maximum(t, t_p) / t_p), 0.0)
+    return ratio.sum() * log_t
+
+
+def settlement_with_creep(S_primary, H_dr, cv, times, C_alpha, e_p, H, U_eop=0.95):
+    """
+    Primary settlement S_primary U(t) plus secondary compression starting at
+    the end of primary, t_p = Tv(U_eop) H_dr^2 / cv. `times` is typically a
+    log-spaced grid; all series are evaluated in one pass.
+    """
+    t = np.asarray(times, dtype=float)
+    t_p = time_factor(U_eop) * H_dr**2 / cv
+    primary = settlement_time(S_primary, H_dr, cv, t)
+    secondary = secondary_compression(t, t_p, C_alpha, e_p, H)
+    return {"t": t, "primary": primary, "secondary": secondary, "total": primary + secondary, "t_p": t_p}
+
+
+# =========================================================
+# FINITE-DIFFERENCE MULTILAYER CONSOLIDATION
+# =========================================================
+# Finite-volume form of mv du/dt = d/dz(cv mv du/dz) + mv dsigma/dt on a
+# node grid whose layer boundaries fall on nodes. Units: cv [m^2/year],
+# mv [1/kPa], time [years], stress [kPa], settlement [m].
+
+def surcharge_history(t, stages):
+    """
+    Total surcharge at times `t` from load stages, each a dict with "time"
+    (start), "duration" (ramp length; 0 for an instantaneous step) and "dq".
+    """
+    t = np.asarray(t, dtype=float)
+    q = np.zeros_like(t)
+    for s in stages:
+        t0, dur, dq = float(s["time"]), float(s.get("duration", 0.0)), float(s["dq"])
+        q += dq * (np.clip((t - t0) / dur, 0.0, 1.0) if dur > 0 else (t >= t0))
+    return q
+
+
+def layer_grid(layers, n_nodes=201):
+    """Node depths and per-element cv, mv; each layer gets nodes in proportion to its thickness."""
+    H = np.array([lay["thickness"] for lay in layers], dtype=float)
+    n_el = np.maximum(2, np.round((n_nodes - 1) * H / H.sum()).astype(int))
+    z = np.concatenate([[0.0]] + [top + np.linspace(0, h, n + 1)[1:] for top, h, n in
+                                  zip(np.concatenate(([0.0], np.cumsum(H)[:-1])), H, n_el)])
+    cv = np.repeat([lay["cv"] for lay in layers], n_el).astype(float)
+    mv = np.repeat([lay["mv"] for lay in layers], n_el).astype(float)
+    return z, cv, mv
+
+
+def fd_consolidation(layers, times, stages, top_drained=True, bottom_drained=True, n_nodes=201,
+                     stress_factor=None, n_save=50, theta=0.5, n_startup=2):
+    """
+    Crank-Nicolson consolidation of stacked layers under a staged/ramped surcharge.
+
+    `layers` is a top-down list of dicts with "thickness", "cv" and "mv";
+    `times` the output time grid (t[0] is the start; steps may vary);
+    `stress_factor` optionally scales the surcharge with depth (one value per
+    node, or a callable of node depth, e.g. from a stress distribution). The
+    tridiagonal system is SPD: with a constant time step its banded Cholesky
+    factor is computed once and reused for every step (`cho_solve_banded`);
+    variable steps use `solve_banded`. The first `n_startup` steps are fully
+    implicit to damp Crank-Nicolson oscillations after a sudden load.
+
+    Returns the node depths, the saved excess pore-pressure fields, the
+    settlement and average degree of consolidation at every time, and the
+    surcharge history.
+    """
+    from scipy.linalg import cholesky_banded, cho_solve_banded, solve_banded
+
+    z, cv, mv = layer_grid(layers, n_nodes)
+    h = np.diff(z)
+    t = np.asarray(times, dtype=float)
+    if stress_factor is None:
+        f = np.ones_like(z)
+    else:
+        f = np.asarray(stress_factor(z) if callable(stress_factor) else stress_factor, dtype=float)
+    q = surcharge_history(t, stages)
+
+    # Node storage (C) and element conductance (K)
+    K = cv * mv / h
+    C = np.zeros_like(z)
+    C[:-1] += 0.5 * mv * h
+    C[1:] += 0.5 * mv * h
+    diag_A = np.zeros_like(z)
+    diag_A[:-1] += K
+    diag_A[1:] += K
+
+    free = np.ones(z.size, dtype=bool)
+    free[0] = not top_drained
+    free[-1] = not bottom_drained
+    lo, hi = int(np.argmax(free)), z.size - int(np.argmax(free[::-1]))  # free nodes are contiguous
+    Cf, dAf, Kf, ff = C[lo:hi], diag_A[lo:hi], K[lo:hi - 1], f[lo:hi]
+
+    def A_dot(u):
+        out = dAf * u
+        out[:-1] -= Kf * u[1:]
+        out[1:] -= Kf * u[:-1]
+        return out
+
+    factor_cache = {}
+
+    def solve(rhs, dt, th):
+        diag = Cf + th * dt * dAf
+        off = -th * dt * Kf
+        if constant_dt:
+            key = th
+            if key not in factor_cache:
+                ab = np.zeros((2, diag.size))
+                ab[0, 1:], ab[1] = off, diag
+                factor_cache[key] = cholesky_banded(ab, lower=False)
+            return cho_solve_banded((factor_cache[key], False), rhs, check_finite=False)
+        ab = np.zeros((3, diag.size))
+        ab[0, 1:], ab[1], ab[2, :-1] = off, diag, off
+        return solve_banded((1, 1), ab, rhs, check_finite=False)
+
+    dts = np.diff(t)
+    constant_dt = dts.size > 0 and np.allclose(dts, dts[0], rtol=1e-9, atol=0.0)
+    save_idx = np.unique(np.linspace(0, t.size - 1, min(n_save, t.size)).astype(int))
+    saved = np.zeros((save_idx.size, z.size))
+    settlement = np.zeros(t.size)
+
+    u = q[0] * ff  # undrained response to the load present at t[0]
+    uf_full = np.zeros(z.size)
+    k_save = 0
+    for n in range(t.size):
+        if n > 0:
+            dt = dts[n - 1]
+            th = 1.0 if n <= n_startup else theta
+            rhs = Cf * u - (1 - th) * dt * A_dot(u) + Cf * ff * (q[n] - q[n - 1])
+            u = solve(rhs, dt, th)
+        uf_full[lo:hi] = u
+        settlement[n] = np.dot(C, q[n] * f - uf_full)
+        if k_save < save_idx.size and save_idx[k_save] == n:
+            saved[k_save] = uf_full
+            k_save += 1
+
+    S_final = np.dot(C, q[-1] * f)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        U_avg = np.where(S_final > 0, settlement / S_final, np.nan)
+    return {"z": z, "t": t, "t_saved": t[save_idx], "u": saved, "settlement": settlement,
+            "U_avg": U_avg, "S_final": S_final, "load": q, "constant_dt": bool(constant_dt)}
+
+
+# =========================================================
+# VERTICAL DRAINS (RADIAL CONSOLIDATION)
+# =========================================================
+# Hansbo (1981) with smear and well resistance, combined with vertical
+# drainage by Carrillo: 1 - U = (1 - Uv)(1 - Uh). Lengths [m], ch/cv
+# [m^2/year], kh/qw in consistent units (qw/kh [m^2]), time [years].
+
+PATTERN_FACTOR = {"Square": 1.128, "Triangular": 1.050}  # De = factor * spacing
+
+
+def equivalent_drain_diameter(width, thickness):
+    """Hansbo equivalent diameter of a band drain, dw = (a + b) / 2."""
+    return (width + thickness) / 2.0
+
+
+def hansbo_factor(De, dw, smear_ratio=2.0, kh_ks=2.0, drain_length=10.0, kh_qw=0.0):
+    """
+    Drain geometry factor F = ln(n/s) + (kh/ks) ln(s) - 0.75 + (2/3) pi l^2 kh/qw,
+    with n = De/dw, s = ds/dw and l the drain discharge length. The well
+    resistance term is averaged over the drain length. Broadcasts over De and l.
+    """
+    n = np.asarray(De, dtype=float) / dw
+    l = np.asarray(drain_length, dtype=float)
+    return np.log(n / smear_ratio) + kh_ks * np.log(smear_ratio) - 0.75 + 2.0 / 3.0 * np.pi * l**2 * kh_qw
+
+
+def radial_degree(ch, t, De, F):
+    """Uh = 1 - exp(-8 Th / F), Th = ch t / De^2 (broadcasts)."""
+    Th = ch * np.asarray(t, dtype=float) / np.asarray(De, dtype=float) ** 2
+    return 1.0 - np.exp(-8.0 * Th / F)
+
+
+def drain_degree(t, H, cv, ch, spacing, pattern="Square", drain_length=None, dw=0.05,
+                 smear_ratio=2.0, kh_ks=2.0, kh_qw=0.0, bottom_drained=True):
+    """
+    Average degree of consolidation of a clay layer of thickness H with drains
+    at `spacing` penetrating `drain_length` (defaults to H). Broadcasts over
+    t, spacing, pattern factor and drain_length.
+
+    The treated zone (0..L) combines Uv and Uh by Carrillo; an untreated zone
+    below a partially penetrating drain consolidates vertically only, drained
+    by the drain tips above (and the base if `bottom_drained`). The layer
+    average is the thickness-weighted mean of both zones.
+    """
+    L = np.minimum(np.asarray(H if drain_length is None else drain_length, dtype=float), H)
+    factor = np.asarray([PATTERN_FACTOR[p] for p in np.ravel(pattern)]).reshape(np.shape(pattern))
+    De = factor * np.asarray(spacing, dtype=float)
+    full = np.isclose(L, H)
+    # Drains discharge at the top; fully penetrating drains also at a drained base
+    l_w = np.where(full & bottom_drained, L / 2.0, L)
+    F = hansbo_factor(De, dw, smear_ratio, kh_ks, l_w, kh_qw)
+
+    t = np.asarray(t, dtype=float)
+    Hdr = H / 2.0 if bottom_drained else H
+    Uv = average_degree(cv * t / Hdr**2)
+    U_treated = 1.0 - (1.0 - Uv) * (1.0 - radial_degree(ch, t, De, F))
+
+    H_low = np.maximum(H - L, 1e-9)
+    Hdr_low = H_low / 2.0 if bottom_drained else H_low
+    U_low = average_degree(cv * t / Hdr_low**2)
+    return (L * U_treated + (H - L) * U_low) / H
+
+
+def drain_layout_search(H, cv, ch, t_target, U_target, spacings, lengths, patterns=("Square", "Triangular"),
+                        dw=0.05, smear_ratio=2.0, kh_ks=2.0, kh_qw=0.0, bottom_drained=True,
+                        cost_per_m=1.0, cost_per_drain=0.0, area=1.0):
+    """
+    Cheapest drain layout reaching U_target at t_target. The spacing x pattern
+    x length grid is evaluated in one broadcast; cost = area x drains per m^2
+    x (cost_per_drain + cost_per_m L). Returns the best layout (None if no
+    layout is feasible) and the full U and cost grids, indexed
+    [pattern, spacing, length].
+    """
+    patterns = list(patterns)
+    s = np.asarray(spacings, dtype=float)
+    L = np.asarray(lengths, dtype=float)
+    P = np.array(patterns)[:, None, None]
+    S, LL = s[None, :, None], L[None, None, :]
+
+    U = drain_degree(t_target, H, cv, ch, S, P, LL, dw, smear_ratio, kh_ks, kh_qw, bottom_drained)
+    U = np.broadcast_to(U, (len(patterns), s.size, L.size))
+    # Drains per unit area: 1/s^2 (square), 2/(sqrt(3) s^2) (triangular)
+    density = np.where(P == "Triangular", 2.0 / np.sqrt(3.0), 1.0) / S**2
+    cost = np.broadcast_to(area * density * (cost_per_drain + cost_per_m * np.minimum(LL, H)), U.shape)
+
+    feasible = U >= U_target
+    best = None
+    if feasible.any():
+        # Cheapest first, ties broken by the higher U
+        order = np.lexsort((-U.ravel(), np.where(feasible, cost, np.inf).ravel()))
+        i, j, k = np.unravel_index(order[0], U.shape)
+        best = {"pattern": patterns[i], "spacing": float(s[j]), "length": float(L[k]),
+                "De": float(PATTERN_FACTOR[patterns[i]] * s[j]), "U": float(U[i, j, k]),
+                "cost": float(cost[i, j, k]), "n_drains": float(area * density[i, j, 0])}
+    return {"best": best, "U": np.array(U), "cost": np.array(cost), "feasible": feasible,
+            "patterns": patterns, "spacings": s, "lengths": L}
@@ -3,6 +3,13 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import numpy as np
+import io
+import os
+import time
+import zipfile
+
+from topics import stress_profile
+from topics import borehole_batch
 
 # =========================================================
 # APP CONFIG
@@ -52,7 +59,10 @@ def app():
                 surcharge = st.number_input("Surcharge q (kPa)", value=50.0, step=5.0)
 
             st.markdown("### B. Soil Properties & Artesian Conditions")
-            num_layers = st.number_input("Number of Layers", 1, 5, 3)
+            c_n1, c_n2 = st.columns(2)
+            num_layers = c_n1.number_input("Number of Layers", 1, 40, 3)
+            resolution = c_n2.number_input("Output Resolution (m)", 0.0, 5.0, 0.0, step=0.1, key="es_resolution",
+                                           help="Spacing of extra output points. 0 = layer boundaries, whole metres and water levels only.")
             
             # --- NEW ARTESIAN INPUTS ---
             c_a1, c_a2 = st.columns(2)
@@ -77,7 +87,7 @@ def app():
                 if (i + 1) == artesian_layer_id:
                     layer_title += " - **[ARTESIAN]**"
 
-                with st.expander(layer_title, expanded=True):
+                with st.expander(layer_title, expanded=num_layers <= 5):
                     cols = st.columns(4)
                     soil_type = cols[0].selectbox("Type", ["Sand", "Clay", "Gravel", "Rock"], key=f"t{i}")
                     thickness = cols[1].number_input("Height (m)", 0.1, 20.0, 4.0, step=0.5, key=f"h{i}")
@@ -169,157 +179,26 @@ def app():
         # CALCULATIONS
         # -------------------------------------------------
         st.markdown("---")
+        # All three states in one vectorized pass; kept in session state so
+        # that opening the log expander (a rerun) does not need another click.
+        profile_inputs = (tuple((lay['type'], lay['H'], lay['g_sat'], lay['g_dry']) for lay in layers),
+                          water_depth, hc, surcharge, artesian_layer_id, artesian_head, GAMMA_W, resolution)
         if st.button("Calculate Stress Profiles", type="primary"):
+            st.session_state["es_profile"] = (profile_inputs, stress_profile.effective_stress_profiles(
+                layers, water_depth, hc, surcharge, artesian_layer_id, artesian_head, GAMMA_W, resolution))
 
-            # ===============================
-            # CORE FUNCTION: LAYER-BY-LAYER LOGIC
-            # ===============================
-            def calculate_profile(mode_name, load_q):
-                results = []
-                math_logs = []
-                
-                # Start at surface
-                sigma_prev = load_q
-                
-                # Iterate through each layer explicitly
-                for layer in layers:
-                    
-                    # 1. Define key points WITHIN this layer only
-                    z_in_layer = {layer['top'], layer['bot']}
-                    
-                    # Integers
-                    for d in range(int(layer['top']), int(layer['bot']) + 1):
-                        if layer['top'] < d < layer['bot']:
-                            z_in_layer.add(float(d))
-                            
-                    # Water Table
-                    if layer['top'] < water_depth < layer['bot']:
-                        z_in_layer.add(water_depth)
-                        
-                    # Capillary Top
-                    cap_top = water_depth - hc
-                    if layer['top'] < cap_top < layer['bot']:
-                        z_in_layer.add(cap_top)
-                        
-                    # Sort points for calculation
-                    sorted_z = sorted(list(z_in_layer))
-                    
-                    # --- CALCULATION LOOP FOR THIS LAYER ---
-                    z_internal_prev = layer['top']
-                    
-                    for i, z in enumerate(sorted_z):
-                        
-                        dz = z - z_internal_prev
-                        z_mid = (z + z_internal_prev) / 2
-                        
-                        # Determine Unit Weight
-                        eff_wt_boundary = water_depth - hc
-                        
-                        if z_mid > eff_wt_boundary:
-                            gam = layer['g_sat']
-                            g_sym = "\\gamma_{sat}"
-                        else:
-                            gam = layer['g_dry']
-                            g_sym = "\\gamma_{dry}"
-                            
-                        # Calculate Total Stress Increment
-                        sigma = sigma_prev + (gam * dz)
-                        
-                        # Logging
-                        if dz > 0.0001:
-                            math_logs.append(f"**Layer {layer['id']} ({layer['type']}): {z_internal_prev:.2f}m to {z:.2f}m** (${g_sym}={gam}$)")
-                            math_logs.append(f"$\\sigma = {sigma_prev:.2f} + ({gam} \\times {dz:.2f}) = {sigma:.2f}$")
-
-                        # --- PORE PRESSURE (u) - CORRECTED LOGIC ---
-                        u_h = 0.0
-                        u_calc_text = "0"
-
-                        # 1. Capillary Zone (Negative Pressure)
-                        if z < water_depth and z >= (water_depth - hc):
-                            u_h = -(water_depth - z) * GAMMA_W
-                            u_calc_text = f"-({water_depth} - {z:.2f}) \\times {GAMMA_W}"
-                        
-                        # 2. Artesian Transition Zone (Linear interpolation in the confining layer)
-                        # Applies only if an artesian layer is defined (>0) and we are in the layer directly above it.
-                        elif artesian_layer_id > 1 and layer['id'] == artesian_layer_id - 1 and z >= water_depth:
-                            z_top = layer['top']
-                            z_bot = layer['bot']
-                            # Hydrostatic pressure at the top of the confining layer
-                            u_top = max(0.0, (z_top - water_depth) * GAMMA_W)
-                            # Artesian pressure at the bottom of the confining layer (interface)
-                            u_bot = (z_bot - water_depth + artesian_head) * GAMMA_W
-                            
-                            if z_bot > z_top: # Prevent division by zero
-                                # Linear interpolation formula: u(z) = u_top + (z - z_top) * slope
-                                u_h = u_top + (z - z_top) * (u_bot - u_top) / (z_bot - z_top)
-                                u_calc_text = f"Linear: {u_top:.1f} + ({z:.1f}-{z_top:.1f}) \\times \\frac{{{u_bot:.1f}-{u_top:.1f}}}{{{z_bot:.1f}-{z_top:.1f}}}"
-                            else:
-                                u_h = u_bot # Should not be reached, but a safe fallback
-                                u_calc_text = f"{u_h:.2f}"
-
-                        # 3. Artesian Zone (In the artesian layer or below it)
-                        elif artesian_layer_id > 0 and layer['id'] >= artesian_layer_id and z >= water_depth:
-                            # Pressure is hydrostatic from the elevated piezometric line
-                            # u = (z - water_depth + artesian_head) * gamma_w
-                            u_h = (z - water_depth + artesian_head) * GAMMA_W
-                            u_calc_text = f"(({z:.2f} - {water_depth}) + {artesian_head}) \\times {GAMMA_W}"
-
-                        # 4. Standard Hydrostatic Zone (Below WT, no artesian influence)
-                        elif z >= water_depth:
-                            u_h = (z - water_depth) * GAMMA_W
-                            u_calc_text = f"({z:.2f} - {water_depth}) \\times {GAMMA_W}"
-                            
-                        # 5. Dry Zone (Above capillary zone)
-                        else:
-                            u_h = 0.0
-                            u_calc_text = "0"
-                            
-                        # Excess Pore Pressure (Short Term for Clay)
-                        u_excess = 0.0
-                        u_calc_add = ""
-                        
-                        if mode_name == "Short Term" and load_q > 0 and layer['type'] == 'Clay':
-                            u_excess = load_q
-                            u_calc_add = f" + {load_q} (Excess)"
-                            
-                        u_tot = u_h + u_excess
-                        sig_eff = sigma - u_tot
-                        
-                        # Log Output for key points
-                        math_logs.append(f"**@ z={z:.2f}m ({layer['type']}):**")
-                        math_logs.append(f"$u = {u_calc_text}{u_calc_add} = {u_tot:.2f}$")
-                        math_logs.append(f"$\\sigma' = {sigma:.2f} - {u_tot:.2f} = \\mathbf{{{sig_eff:.2f}}}$")
-                        math_logs.append("---")
-                        
-                        # Determine position tag
-                        pos_tag = ""
-                        if abs(z - layer['top']) < 0.001: pos_tag = " (Top)"
-                        elif abs(z - layer['bot']) < 0.001: pos_tag = " (Bottom)"
-                        
-                        results.append({
-                            "Depth (z)": z,
-                            "Soil Type": f"{layer['type']}{pos_tag}",
-                            "Total Stress (σ)": sigma,
-                            "Pore Pressure (u)": u_tot,
-                            "Eff. Stress (σ')": sig_eff
-                        })
-                        
-                        # Update for next step
-                        sigma_prev = sigma
-                        z_internal_prev = z
-
-                return pd.DataFrame(results), math_logs
-
-            # Run profiles
-            df_init, log_init = calculate_profile("Initial", 0.0)
-            df_long, log_long = calculate_profile("Long Term", surcharge)
-            df_short, log_short = calculate_profile("Short Term", surcharge)
+        if "es_profile" in st.session_state:
+            calc_inputs, prof = st.session_state["es_profile"]
+            if calc_inputs != profile_inputs:
+                st.info("Inputs have changed since the last calculation. Press 'Calculate Stress Profiles' to update.")
+            dfs = [stress_profile.profile_frame(prof, m) for m in range(len(stress_profile.MODES))]
+            marker = len(prof['z']) <= 60
 
             # Plot function
             def plot_results(df, title, ax):
-                ax.plot(df["Total Stress (σ)"], df["Depth (z)"], 'b-o', label="Total σ")
-                ax.plot(df["Pore Pressure (u)"], df["Depth (z)"], 'r--x', label="Pore u")
-                ax.plot(df["Eff. Stress (σ')"], df["Depth (z)"], 'k-s', linewidth=2, label="Effective σ'")
+                ax.plot(df["Total Stress (σ)"], df["Depth (z)"], 'b-o' if marker else 'b-', label="Total σ")
+                ax.plot(df["Pore Pressure (u)"], df["Depth (z)"], 'r--x' if marker else 'r--', label="Pore u")
+                ax.plot(df["Eff. Stress (σ')"], df["Depth (z)"], 'k-s' if marker else 'k-', linewidth=2, label="Effective σ'")
                 ax.invert_yaxis()
                 ax.set_xlabel("Stress (kPa)")
                 ax.set_ylabel("Depth (m)")
@@ -330,21 +209,202 @@ def app():
             st.markdown("### Results Comparison")
             c1, c2, c3 = st.columns(3)
 
-            for col, df, title in zip([c1, c2, c3],
-                                      [df_init, df_long, df_short],
-                                      ["Initial", "Long Term", "Short Term"]):
+            for col, df, title in zip([c1, c2, c3], dfs, stress_profile.MODES):
                 with col:
                     st.subheader(title)
                     st.dataframe(df.style.format({"Depth (z)": "{:.2f}", "Total Stress (σ)": "{:.2f}", "Pore Pressure (u)": "{:.2f}", "Eff. Stress (σ')": "{:.2f}"}))
                     fig, ax = plt.subplots(figsize=(5, 6))
                     plot_results(df, title, ax)
                     st.pyplot(fig)
-                    
-            with st.expander("Show Calculation Logs"):
-                st.markdown("### Initial State Logs")
-                for log in log_init: st.markdown(log)
-                st.markdown("### Long Term State Logs")
-                for log in log_long: st.markdown(log)
+
+            # Point values and depth averages from the piecewise-linear profiles (no re-tabulation)
+            st.markdown("### Stresses at Any Depth")
+            z_end = float(prof['z'][-1])
+            qc1, qc2 = st.columns(2)
+            z_q = qc1.number_input("Depth z (m)", 0.0, z_end, min(z_end, 5.0), step=0.1, key="es_q_z")
+            z_q2 = qc2.number_input("Average down to (m)", z_q, z_end, z_end, step=0.1, key="es_q_z2")
+            rows = []
+            for m, title in enumerate(stress_profile.MODES):
+                sp_m = stress_profile.StressProfile.from_profiles(prof, m)
+                rows.append({"State": title, "σ (kPa)": sp_m.sigma(z_q), "u (kPa)": sp_m.u(z_q),
+                             "σ' (kPa)": sp_m.sigma_eff(z_q), "Avg σ' (kPa)": sp_m.average("sigma_eff", z_q, z_q2)})
+            st.dataframe(pd.DataFrame(rows).style.format(precision=2), hide_index=True)
+            st.caption(f"Values at z = {z_q:.2f} m (just below, where stresses jump) and σ' averaged over "
+                       f"{z_q:.2f}–{z_q2:.2f} m.")
+
+            # The LaTeX log is only formatted while the expander is open
+            with st.expander("Show Calculation Logs", key="es_logs", on_change="rerun") as logs_box:
+                if logs_box.open:
+                    st.markdown("### Initial State Logs")
+                    for log in stress_profile.profile_log(prof, 0): st.markdown(log)
+                    st.markdown("### Long Term State Logs")
+                    for log in stress_profile.profile_log(prof, 1): st.markdown(log)
+
+        # -------------------------------------------------
+        # WATER-TABLE TIME SERIES
+        # -------------------------------------------------
+        st.markdown("---")
+        with st.expander("Water-Table Time Series (σ' Envelopes & Reversals)"):
+            st.caption("Effective stress over a depth × time grid for a fluctuating water table, using the layers, "
+                       "capillary rise and surcharge (drained) above; the artesian condition is not applied. "
+                       "Every reading is used: no subsampling.")
+            wt_source = st.radio("Water Levels", ["Seasonal / Tidal Function", "Piezometer Log (.csv)"],
+                                 horizontal=True, key="wt_source")
+            w1, w2, w3 = st.columns(3)
+            if wt_source == "Piezometer Log (.csv)":
+                wt_file = w1.file_uploader("Log (time, water depth [m])", type=["csv", "txt"], key="wt_file")
+            else:
+                wt_mean = w1.number_input("Mean Water Depth (m)", 0.0, 100.0, max(0.0, float(water_depth)),
+                                          step=0.5, key="wt_mean")
+                wt_seas = w2.number_input("Seasonal Amplitude (m)", 0.0, 20.0, 1.5, step=0.25, key="wt_seas")
+                wt_tide = w3.number_input("Tidal Amplitude (m)", 0.0, 10.0, 0.3, step=0.1, key="wt_tide")
+                wt_days = w1.number_input("Duration (days)", 1.0, 36500.0, 1095.0, step=30.0, key="wt_days")
+                wt_n = w2.number_input("Readings", 100, 2_000_000, 100_000, step=10_000, key="wt_n")
+            wt_dz = w3.number_input("Depth Spacing (m)", 0.05, 5.0, 0.25, step=0.05, key="wt_dz")
+            wt_tol = w1.number_input("Reversal Dead Band (kPa)", 0.0, 100.0, 1.0, step=0.5, key="wt_tol",
+                                     help="A reversal counts once σ' has moved back more than this from its last extreme.")
+
+            if st.button("Compute σ' Envelopes", key="btn_wt"):
+                if wt_source == "Piezometer Log (.csv)":
+                    wt_t, wt_wd = stress_profile.load_water_levels(wt_file) if wt_file is not None else (None, None)
+                else:
+                    wt_t = np.linspace(0.0, wt_days, int(wt_n))
+                    wt_wd = stress_profile.water_level_function(wt_t, wt_mean, wt_seas, tidal_amp=wt_tide)
+                if wt_t is None or wt_t.size < 2:
+                    st.error("Upload a piezometer log with at least two readings.")
+                else:
+                    wt_z = np.unique(np.concatenate([np.arange(0.0, total_depth, wt_dz), [total_depth],
+                                                     [lay['top'] for lay in layers]]))
+                    t0 = time.perf_counter()
+                    env = stress_profile.stress_envelopes(layers, wt_z, wt_wd, hc, surcharge, GAMMA_W, wt_tol)
+                    st.session_state["wt_result"] = (wt_t, wt_wd, env, (hc, surcharge, GAMMA_W),
+                                                     time.perf_counter() - t0)
+
+            if "wt_result" in st.session_state:
+                wt_t, wt_wd, env, (wt_hc, wt_q, wt_gw), elapsed = st.session_state["wt_result"]
+                st.caption(f"{env['n_readings']:,} readings × {env['z'].size} depths in {elapsed:.2f} s "
+                           f"({env['n_evaluated']:,} readings at water-level turning points evaluated).")
+                fig_w, (ax_w1, ax_w2, ax_w3) = plt.subplots(1, 3, figsize=(13, 4.5),
+                                                            gridspec_kw={'width_ratios': [1.6, 1, 1]})
+                ax_w1.plot(wt_t, wt_wd, 'b-', linewidth=0.5)
+                ax_w1.invert_yaxis()
+                ax_w1.set_xlabel("Time")
+                ax_w1.set_ylabel("Water Depth (m)")
+                ax_w1.set_title("Water Table")
+                ax_w1.grid(True, alpha=0.3)
+                ax_w2.fill_betweenx(env['z'], env['sig_eff_min'], env['sig_eff_max'], color='grey', alpha=0.4,
+                                    label="σ' range")
+                ax_w2.plot(env['sig_eff_min'], env['z'], 'b-', label="Min σ'")
+                ax_w2.plot(env['sig_eff_max'], env['z'], 'r-', label="Max σ'")
+                ax_w2.invert_yaxis()
+                ax_w2.set_xlabel("Stress (kPa)")
+                ax_w2.set_ylabel("Depth (m)")
+                ax_w2.set_title("σ' Envelopes")
+                ax_w2.legend(fontsize=8)
+                ax_w2.grid(True)
+                ax_w3.barh(env['z'], env['cycles'], height=np.gradient(env['z']) * 0.8 if env['z'].size > 1 else 0.2,
+                           color='#8D6E63')
+                ax_w3.invert_yaxis()
+                ax_w3.set_xlabel("Reversal Cycles")
+                ax_w3.set_title("Stress Reversals")
+                ax_w3.grid(True, axis='x')
+                st.pyplot(fig_w)
+
+                st.dataframe(pd.DataFrame({
+                    "Depth (m)": env['z'], "Min σ' (kPa)": env['sig_eff_min'], "Max σ' (kPa)": env['sig_eff_max'],
+                    "Range (kPa)": env['range'], "Time of Min": wt_t[env['i_min']], "Time of Max": wt_t[env['i_max']],
+                    "Reversals": env['reversals'], "Cycles": env['cycles'],
+                }).style.format(precision=2), hide_index=True)
+
+                # Full-resolution history at one depth (one row of the depth x time grid)
+                z_hist = st.select_slider("σ' History at Depth (m)", options=[round(v, 3) for v in env['z']],
+                                          value=round(float(env['z'][len(env['z']) // 2]), 3), key="wt_z_hist")
+                se_hist = stress_profile.stress_history(layers, [z_hist], wt_wd, wt_hc, wt_q, wt_gw)[2][0]
+                fig_h2, ax_h2 = plt.subplots(figsize=(10, 3))
+                ax_h2.plot(wt_t, se_hist, 'k-', linewidth=0.5)
+                ax_h2.set_xlabel("Time")
+                ax_h2.set_ylabel("σ' (kPa)")
+                ax_h2.set_title(f"Effective Stress at z = {z_hist:.2f} m")
+                ax_h2.grid(True, alpha=0.3)
+                st.pyplot(fig_h2)
+
+        # -------------------------------------------------
+        # BATCH BOREHOLES
+        # -------------------------------------------------
+        st.markdown("---")
+        with st.expander("Batch Boreholes (CSV / AGS)"):
+            st.caption("Upload many boreholes at once: a CSV with one row per layer (Borehole, Type, Thickness or "
+                       "Top/Bottom, g_sat, g_dry; Water_Depth, hc, Surcharge, Artesian_Layer, Artesian_Head on the "
+                       "first row of a borehole) or an AGS4 file (GEOL layers, WSTG water strikes). Blanks use the "
+                       "defaults below. All three states are computed in parallel worker processes.")
+            bh_file = st.file_uploader("Borehole File (.csv / .ags)", type=["csv", "ags", "txt"], key="bh_file")
+            b1, b2, b3 = st.columns(3)
+            bh_wd = b1.number_input("Default Water Depth (m)", 0.0, 200.0, max(0.0, float(water_depth)), key="bh_wd")
+            bh_hc = b2.number_input("Default Capillary Rise (m)", 0.0, 50.0, max(0.0, float(hc)), key="bh_hc")
+            bh_q = b3.number_input("Default Surcharge (kPa)", 0.0, 2000.0, max(0.0, float(surcharge)), key="bh_q")
+            bh_res = b1.number_input("Output Resolution (m)", 0.0, 5.0, float(resolution), step=0.1, key="bh_res")
+            n_cpu = os.cpu_count() or 1
+            bh_workers = b2.number_input("Worker Processes", 1, n_cpu, n_cpu, key="bh_workers")
+
+            if st.button("Process Boreholes", key="btn_boreholes"):
+                if bh_file is not None:
+                    raw_holes = borehole_batch.load_boreholes(bh_file)
+                else:
+                    st.info("No file uploaded: running on 300 synthetic boreholes.")
+                    raw_holes = borehole_batch.example_boreholes(300)
+                bh_defaults = {"water_depth": bh_wd, "hc": bh_hc, "surcharge": bh_q, "gamma_w": GAMMA_W,
+                               "resolution": bh_res}
+                t0 = time.perf_counter()
+                bh_summary, bh_table, _ = borehole_batch.collect(
+                    borehole_batch.run_batch(raw_holes, bh_defaults, int(bh_workers)))
+                st.session_state["bh_result"] = (raw_holes, bh_defaults, bh_summary, bh_table,
+                                                 time.perf_counter() - t0)
+                st.session_state.pop("bh_plots_zip", None)
+
+            if "bh_result" in st.session_state:
+                raw_holes, bh_defaults, bh_summary, bh_table, elapsed = st.session_state["bh_result"]
+                ok = bh_summary["status"] == "ok"
+                st.caption(f"{int(ok.sum())}/{len(bh_summary)} boreholes, {len(bh_table):,} profile rows "
+                           f"in {elapsed:.2f} s.")
+                if not ok.all():
+                    st.warning(f"{int((~ok).sum())} borehole(s) failed; see the message column.")
+                st.dataframe(bh_summary.round(3), hide_index=True)
+
+                d1, d2, d3 = st.columns(3)
+                d1.download_button("Download Profiles (.csv)", bh_table.to_csv(index=False), "stress_profiles.csv",
+                                   "text/csv", key="bh_download")
+                d2.download_button("Download Summary (.csv)", bh_summary.to_csv(index=False), "borehole_summary.csv",
+                                   "text/csv", key="bh_download_summary")
+                # Rendering every plot is the slow part: only on request, in the worker pool as well
+                if d3.button("Build Plots (.zip)", key="btn_bh_plots"):
+                    _, _, plots = borehole_batch.collect(
+                        borehole_batch.run_batch(raw_holes, bh_defaults, int(bh_workers), plot=True))
+                    buf = io.BytesIO()
+                    with zipfile.ZipFile(buf, "w") as zf:
+                        for name, png in plots.items():
+                            zf.writestr(borehole_batch.plot_filename(name), png)
+                    st.session_state["bh_plots_zip"] = buf.getvalue()
+                if "bh_plots_zip" in st.session_state:
+                    d3.download_button("Download Plots (.zip)", st.session_state["bh_plots_zip"],
+                                       "borehole_plots.zip", "application/zip", key="bh_download_plots")
+
+                holes_ok = bh_summary.loc[ok, "borehole"].tolist()
+                if holes_ok:
+                    hole = st.selectbox("Borehole to Plot", holes_ok, key="bh_plot")
+                    sub = bh_table[bh_table["borehole"] == hole]
+                    fig_b, axes_b = plt.subplots(1, len(stress_profile.MODES), figsize=(12, 4.5), sharey=True)
+                    for ax, title in zip(axes_b, stress_profile.MODES):
+                        d = sub[sub["state"] == title]
+                        ax.plot(d["sigma"], d["z"], 'b-', label="Total σ")
+                        ax.plot(d["u"], d["z"], 'r--', label="Pore u")
+                        ax.plot(d["sigma_eff"], d["z"], 'k-', linewidth=2, label="Effective σ'")
+                        ax.set_title(title)
+                        ax.set_xlabel("Stress (kPa)")
+                        ax.grid(True)
+                    axes_b[0].invert_yaxis()
+                    axes_b[0].set_ylabel("Depth (m)")
+                    axes_b[0].legend()
+                    st.pyplot(fig_b)
 
     # =====================================================
     # TAB 2 — HEAVE CHECK
@@ -444,9 +504,10 @@ def app():
             if rem_clay <= 0:
                 st.error("Invalid: Excavation deeper than clay layer.")
             else:
-                sigma_val = rem_clay * g_clay
+                overburden = stress_profile.plug_profile(h_clay, g_clay)
+                sigma_val = overburden.sigma(h_clay) - overburden.sigma(d_exc)
                 u_val = (h_clay + h_art_heave) * GAMMA_W
-                fs = sigma_val / u_val
+                fs = stress_profile.heave_fs(overburden, h_clay, d_exc, h_art_heave, GAMMA_W)
                 
                 c_res_l, c_res_r = st.columns([1, 1.5])
                 
@@ -472,5 +533,55 @@ def app():
                         st.markdown("**3. Factor of Safety**")
                         st.latex(rf"FS = \frac{{\sigma_v}}{{u}} = \frac{{{sigma_val:.2f}}}{{{u_val:.2f}}} = \mathbf{{{fs:.3f}}}")
 
+        # -------------------------------------------------
+        # 4. DESIGN CURVES (staged excavation / dewatering)
+        # -------------------------------------------------
+        st.markdown("---")
+        with st.expander("Design Curves: FS vs Excavation Depth", key="heave_design", on_change="rerun") as design_box:
+            if design_box.open:
+                st.caption("Sweeps excavation depth for a range of artesian heads, solves the critical depth for a "
+                           "target FS and the head drawdown (dewatering) needed to excavate to a given depth.")
+                dc1, dc2, dc3, dc4 = st.columns(4)
+                fs_target = dc1.number_input("Target FS", 0.5, 3.0, 1.2, step=0.05, key="heave_fs_target")
+                head_min = dc2.number_input("Min Head (m)", -h_clay, 50.0, 0.0, step=0.5, key="heave_head_min")
+                head_max = dc3.number_input("Max Head (m)", head_min, 50.0, max(head_min, 2 * h_art_heave, 4.0),
+                                            step=0.5, key="heave_head_max")
+                n_heads = dc4.number_input("No. of Heads", 1, 10, 5, key="heave_n_heads")
+                d_design = st.number_input("Design Excavation Depth (m)", 0.0, h_clay, min(d_exc, h_clay),
+                                           step=0.5, key="heave_d_design")
+
+                overburden = stress_profile.plug_profile(h_clay, g_clay)
+                heads = np.linspace(head_min, head_max, int(n_heads))
+                depths = np.linspace(0.0, h_clay, 200)
+                fs_grid = stress_profile.heave_fs(overburden, h_clay, depths[None, :], heads[:, None], GAMMA_W)
+                d_crit = stress_profile.critical_excavation_depth(overburden, h_clay, heads, fs_target, GAMMA_W)
+                drawdown = stress_profile.required_drawdown(overburden, h_clay, d_design, heads, fs_target, GAMMA_W)
+
+                fig_d, ax_d = plt.subplots(figsize=(8, 4.5))
+                for h, fs_row, dc in zip(heads, fs_grid, d_crit):
+                    line, = ax_d.plot(depths, fs_row, label=f"Head {h:+.1f} m")
+                    if np.isfinite(dc):
+                        ax_d.plot(dc, fs_target, 'o', color=line.get_color())
+                ax_d.axhline(fs_target, color='red', linestyle='--', linewidth=1, label=f"Target FS = {fs_target:.2f}")
+                ax_d.axvline(d_design, color='grey', linestyle=':', linewidth=1)
+                ax_d.set_xlabel("Excavation Depth (m)")
+                ax_d.set_ylabel("FS against Heave")
+                finite = np.isfinite(fs_grid)  # none when no swept head gives uplift
+                ax_d.set_ylim(0, min(fs_grid[finite].max() * 1.1, 3 * fs_target) if finite.any() else 3 * fs_target)
+                ax_d.grid(True, linestyle=':')
+                ax_d.legend(fontsize=8)
+                st.pyplot(fig_d)
+
+                st.dataframe(pd.DataFrame({
+                    "Artesian Head (m)": heads,
+                    "Critical Depth (m)": d_crit,
+                    f"FS at {d_design:.1f} m": stress_profile.heave_fs(overburden, h_clay, d_design, heads, GAMMA_W),
+                    "Required Drawdown (m)": drawdown,
+                }).style.format(precision=2, na_rep="—"), hide_index=True)
+                h_allow = stress_profile.allowable_head(overburden, h_clay, d_design, fs_target, GAMMA_W)
+                st.caption(f"Critical Depth is blank where even the unexcavated clay is below the target FS. "
+                           f"Required Drawdown lowers the artesian head until {d_design:.1f} m reaches the target FS "
+                           f"(allowable head: {h_allow:+.2f} m above ground).")
+
 if __name__ == "__main__":
     app()
@@ -2,27 +2,10 @@ import streamlit as st
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import numpy as np
+import pandas as pd
+import time
 
-# ============================================================
-# MAINTENANCE BANNER
-# ============================================================
-def show_maintenance_banner():
-    st.markdown("""
-    <div style="background: linear-gradient(90deg, #ff6b6b 0%, #ffa500 100%); 
-                padding: 15px; 
-                border-radius: 10px; 
-                border: 3px solid #cc0000;
-                margin-bottom: 20px;
-                box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-        <h2 style="color: white; margin: 0; text-align: center;">
-             UNDER MAINTENANCE 
-        </h2>
-        <p style="color: white; margin: 10px 0 0 0; text-align: center; font-size: 16px;">
-            Flow net calculations are currently being calibrated and improved.<br>
-            Results may not be accurate. Please use with caution.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+from topics import seepage_solver
 
 # ============================================================
 # HELPER FUNCTIONS
@@ -37,138 +20,34 @@ def format_scientific(val):
         return f"{val:.4f}"
     return f"{mantissa:.2f} \\times 10^{{{exponent}}}"
 
-def get_complex_potential_sheet_pile(x, y, pile_depth, pile_x, h_up, h_down, soil_depth):
-    """
-    CORRECTED Sheet Pile Flow Net based on soil mechanics principles.
-    
-    Key observations from hand sketch:
-    1. Flow lines (blue) start horizontal upstream, curve DOWN around pile, exit horizontal downstream
-    2. Equipotentials (red dashed) are nearly vertical far away, curve around pile tip
-    3. Flow concentrates at PILE TIP (bottom of pile)
-    4. Pattern is symmetric-ish but biased by head difference
-    """
-    
-    # Pile tip location (critical point)
-    pile_tip_x = pile_x
-    pile_tip_y = -pile_depth
-    
-    # Create complex coordinates
-    z = x + 1j * y
-    z_tip = pile_tip_x + 1j * pile_tip_y
-    
-    # Distance from pile tip
-    z_from_tip = z - z_tip
-    
-    # Avoid singularity
-    epsilon = 0.01
-    z_from_tip = np.where(np.abs(z_from_tip) < epsilon, epsilon * (1 + 1j), z_from_tip)
-    
-    with np.errstate(all="ignore"):
-        # COMPONENT 1: Uniform horizontal flow (baseline seepage)
-        # This creates the horizontal flow from left to right
-        flow_velocity = (h_up - h_down) / 24.0  # Normalized velocity
-        W_uniform = flow_velocity * z
-        
-        # COMPONENT 2: Source at pile tip (creates flow diverging from tip)
-        # Water flows OUT from underneath the pile
-        source_strength = pile_depth * flow_velocity * 8.0
-        W_source = source_strength * np.log(z_from_tip + 0j)
-        
-        # COMPONENT 3: Dipole to create asymmetry and proper flow pattern
-        # This makes flow go AROUND the pile (up and down)
-        dipole_strength = pile_depth**1.5 * flow_velocity * 6.0
-        W_dipole = dipole_strength / z_from_tip
-        
-        # COMPONENT 4: Image system for impervious base
-        # Reflection from bottom boundary
-        z_from_base = z - (pile_tip_x + 1j * (-soil_depth))
-        z_from_base = np.where(np.abs(z_from_base) < epsilon, epsilon * (1 + 1j), z_from_base)
-        W_base = -source_strength * 0.3 * np.log(z_from_base + 0j)
-        
-        # Combine all components
-        W = W_uniform + W_source + W_dipole + W_base
-        
-        return W
-
-def get_complex_potential_dam(x, y, dam_width, h_up, h_down):
-    """
-    Flow under concrete dam - uses conformal mapping.
-    """
-    b = max(dam_width / 2, 0.1)
-    z = x + 1j * y
-    
-    with np.errstate(all="ignore"):
-        # Normalize
-        zeta = z / b
-        
-        # Conformal transformation for flow under rectangular dam
-        # Schwarz-Christoffel approximation
-        w = b * (zeta + np.sqrt(zeta**2 - 1 + 0j))
-        
-        # Scale by head difference
-        flow_scale = (h_up - h_down) / 20.0
-        W = flow_scale * w
-        
-        return W
-
-def get_complex_potential(x, y, mode, pile_depth, pile_x, dam_width, h_up, h_down, soil_depth):
-    """
-    Main function to get complex potential based on mode.
-    Returns W = Phi + i*Psi
-    """
-    
-    if mode == "Sheet Pile Only":
-        return get_complex_potential_sheet_pile(x, y, pile_depth, pile_x, h_up, h_down, soil_depth)
-    
-    elif mode == "Concrete Dam Only":
-        return get_complex_potential_dam(x, y, dam_width, h_up, h_down)
-    
-    elif mode == "Combined (Dam + Pile)":
-        # Superpose both effects
-        W_pile = get_complex_potential_sheet_pile(x, y, pile_depth, pile_x, h_up, h_down, soil_depth)
-        W_dam = get_complex_potential_dam(x, y, dam_width, h_up, h_down)
-        return 0.6 * W_pile + 0.4 * W_dam
-    
-    return 0 + 0j
-
-def calculate_pore_pressure(px, py, mode, pile_d, pile_x, dam_w, h_up, h_down, soil_d):
-    """
-    Calculate pore pressure at point (px, py) based on flow net.
-    """
-    
-    if py > 0:
-        return None  # Above ground surface
-    
-    gamma_w = 9.81  # kN/m³
-    
-    # Get complex potential at point
-    w_pt = get_complex_potential(px, py, mode, pile_d, pile_x, dam_w, h_up, h_down, soil_d)
-    phi_pt = np.real(w_pt)
-    
-    # Get boundary values
-    w_up = get_complex_potential(-15.0, py, mode, pile_d, pile_x, dam_w, h_up, h_down, soil_d)
-    w_down = get_complex_potential(15.0, py, mode, pile_d, pile_x, dam_w, h_up, h_down, soil_d)
-    
-    phi_up = np.real(w_up)
-    phi_down = np.real(w_down)
-    
-    # Handle numerical issues
-    if not np.isfinite(phi_pt) or not np.isfinite(phi_up) or not np.isfinite(phi_down):
-        return None
-    
-    # Interpolate total head
-    if abs(phi_up - phi_down) < 1e-6:
-        h_total = (h_up + h_down) / 2
-    else:
-        ratio = (phi_pt - phi_down) / (phi_up - phi_down)
-        ratio = np.clip(ratio, 0, 1)
-        h_total = h_down + ratio * (h_up - h_down)
-    
-    # Calculate pore pressure
-    pressure_head = h_total - py
-    u = pressure_head * gamma_w
-    
-    return {"u": u, "h_total": h_total, "pressure_head": pressure_head}
+def plot_flow_net(res, h_up, h_down, n_flow=5, n_drops=12):
+    """Equipotentials and flow lines of a seepage_solver result, with the dam and sheet pile drawn."""
+    x, y = res["x"], res["y"]
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.add_patch(patches.Rectangle((x[0], y[0]), x[-1] - x[0], -y[0], facecolor='#E3C195', alpha=0.35, edgecolor='none'))
+    if h_up != h_down:
+        lo, hi = min(h_up, h_down), max(h_up, h_down)
+        ax.contour(x, y, res["h"], levels=np.linspace(lo, hi, n_drops + 1)[1:-1],
+                   colors='red', linestyles='dashed', linewidths=1)
+    if res["q"] != 0:
+        ax.contour(res["x_psi"], res["y_psi"], res["psi"], levels=np.linspace(min(0, res["q"]), max(0, res["q"]), n_flow + 1)[1:-1],
+                   colors='blue', linewidths=1.2)
+
+    dam_l, dam_r = res["dam"]
+    pile_d, pile_x = res["pile"]
+    wl_top = max(h_up, h_down, 0.5)
+    ax.add_patch(patches.Rectangle((x[0], 0), dam_l - x[0] if dam_r > dam_l else pile_x - x[0], h_up, facecolor='#D6EAF8', edgecolor='none'))
+    x_d = dam_r if dam_r > dam_l else pile_x
+    ax.add_patch(patches.Rectangle((x_d, 0), x[-1] - x_d, h_down, facecolor='#D6EAF8', edgecolor='none'))
+    if dam_r > dam_l:
+        ax.add_patch(patches.Rectangle((dam_l, 0), dam_r - dam_l, wl_top + 1.0, facecolor='gray', edgecolor='black', zorder=3))
+    if pile_d > 0:
+        ax.plot([pile_x, pile_x], [-pile_d, wl_top + 0.5], color='black', lw=4, zorder=4)
+    ax.plot([x[0], x[-1]], [y[0], y[0]], 'k-', lw=3)
+    ax.text(x[0] + 0.5, y[0] + 0.3, "Impervious Base", fontsize=9, style='italic')
+    ax.set_xlim(x[0], x[-1]); ax.set_ylim(y[0] - 0.5, wl_top + 1.5)
+    ax.set_aspect('equal'); ax.set_xlabel("x (m)"); ax.set_ylabel("Elevation (m)")
+    return fig
 
 # ============================================================
 # MAIN APP
@@ -177,7 +56,7 @@ def calculate_pore_pressure(px, py, mode, pile_d, pile_x, dam_w, h_up, h_down, s
 def app():
 
     
-    tab1, tab2 = st.tabs(["1D Seepage", "Permeability"])
+    tab1, tab2, tab3 = st.tabs(["1D Seepage", "Permeability", "2D Flow Net"])
     
     # =================================================================
     # TAB 1: 1D SEEPAGE (Effective Stress)
@@ -433,5 +312,100 @@ def app():
 
             st.pyplot(fig2)
 
+    # =================================================================
+    # TAB 3: 2D FLOW NET (finite-difference seepage)
+    # =================================================================
+    with tab3:
+        st.caption("Steady confined seepage below a dam and/or sheet pile, solved on a finite-difference grid. "
+                   "Heads are measured from the ground surface; the soil rests on an impervious base.")
+        col_in, col_out = st.columns([1, 2])
+
+        with col_in:
+            st.markdown("### 1. Geometry")
+            fn_mode = st.selectbox("Structure", seepage_solver.MODES, key="fn_mode")
+            fn_D = st.number_input("Soil Depth to Impervious Base [m]", 1.0, value=10.0, step=1.0, key="fn_depth")
+            fn_B = st.number_input("Dam Base Width [m]", 0.5, value=10.0, step=1.0, key="fn_dam_w",
+                                   disabled=fn_mode == "Sheet Pile Only")
+            fn_pd = st.number_input("Sheet Pile Depth [m]", 0.1, value=5.0, step=0.5, key="fn_pile_d",
+                                    disabled=fn_mode == "Concrete Dam Only")
+            fn_px = st.number_input("Sheet Pile Position x [m]", value=0.0, step=0.5, key="fn_pile_x", disabled=fn_mode == "Concrete Dam Only",
+                                    help="Measured from the dam centre line. For a dam, keep the pile under the base.")
+
+            st.markdown("### 2. Water & Soil")
+            fn_hu = st.slider("Upstream Head h_up [m]", 0.0, 20.0, 6.0, step=0.1, key="fn_h_up")
+            fn_hd = st.slider("Downstream Head h_down [m]", 0.0, 20.0, 1.0, step=0.1, key="fn_h_down")
+            fn_k = st.number_input("Permeability k_h [m/s]", 1e-12, value=1e-5, format="%.2e", key="fn_k")
+            fn_an = st.number_input("Anisotropy k_h / k_v", 0.1, value=1.0, step=0.5, key="fn_aniso")
+            fn_gs = st.number_input("Saturated Unit Weight (γ_sat) [kN/m³]", 10.0, value=20.0, step=0.5, key="fn_gsat")
+
+            with st.expander("Mesh"):
+                fn_nx = st.number_input("Nodes in x", 50, 800, 400, step=50, key="fn_nx")
+                fn_ny = st.number_input("Nodes in y", 20, 400, 200, step=20, key="fn_ny")
+
+            if st.button("Solve Flow Net", type="primary", key="btn_flow_net"):
+                st.session_state["fn_active"] = True
+
+            # Once solved, the net follows the inputs: head and k changes only rescale the cached unit solution
+            if st.session_state.get("fn_active"):
+                try:
+                    t0 = time.perf_counter()
+                    res = seepage_solver.solve_seepage(
+                        fn_mode, fn_hu, fn_hd, fn_D, dam_width=fn_B, pile_depth=fn_pd, pile_x=fn_px,
+                        k=fn_k, anisotropy=fn_an, nx=int(fn_nx), ny=int(fn_ny), gamma_sat=fn_gs)
+                    res["elapsed"] = time.perf_counter() - t0
+                    res["heads"] = (fn_hu, fn_hd)
+                    st.session_state["fn_result"] = res
+                except ValueError as e:
+                    st.session_state.pop("fn_result", None)
+                    st.error(str(e))
+                info = seepage_solver.UNIT_CACHE.info()
+                st.caption(f"Cached geometries: {info['entries']} ({info['nbytes'] / 2**20:.1f} of "
+                           f"{info['max_bytes'] / 2**20:.0f} MB)")
+
+        with col_out:
+            res = st.session_state.get("fn_result")
+            if res is None:
+                st.info("Set the geometry and press **Solve Flow Net**.")
+            else:
+                h_up, h_down = res["heads"]
+                how = ("rescaled from the cached unit-head solution" if res["cached"]
+                       else "solved (sparse 5-point Laplacian, LU factorization)")
+                st.caption(f"{res['x'].size} × {res['y'].size} grid {how} in {res['elapsed'] * 1000:.0f} ms.")
+                if h_down > h_up:
+                    st.warning("h_down > h_up: flow runs from downstream to upstream, so the exit gradient "
+                               "and piping check refer to the upstream surface.")
+                st.pyplot(plot_flow_net(res, h_up, h_down))
+
+                m1, m2, m3, m4 = st.columns(4)
+                m1.metric("Flow Rate q", f"{res['q'] * 86400:.3f} m³/day/m")
+                m2.metric("Shape Factor N_f/N_d", f"{res['shape_factor']:.3f}")
+                m3.metric("Max Exit Gradient", f"{res['i_exit_max']:.3f}")
+                m4.metric("FS Piping", f"{res['fs_piping']:.2f}")
+                st.caption(f"i_crit = (γ_sat − γ_w)/γ_w = {res['i_crit']:.3f}. Exit gradients next to a dam toe "
+                           "or sheet pile are singular and grow with mesh refinement.")
+
+                if res["uplift_x"].size > 1:
+                    st.markdown("#### Uplift Pressure on Dam Base")
+                    fig_u, ax_u = plt.subplots(figsize=(8, 3))
+                    ax_u.fill_between(res["uplift_x"], res["uplift_u"], color='#D6EAF8')
+                    ax_u.plot(res["uplift_x"], res["uplift_u"], 'b-')
+                    ax_u.invert_yaxis()
+                    ax_u.set_xlabel("x (m)"); ax_u.set_ylabel("u (kPa)")
+                    ax_u.grid(True, linestyle='--', alpha=0.5)
+                    st.pyplot(fig_u)
+                    st.metric("Uplift Force", f"{res['uplift_force']:.1f} kN/m")
+
+                st.markdown("#### Pore Pressure at a Point")
+                p1, p2 = st.columns(2)
+                px = p1.number_input("x [m]", float(res["x"][0]), float(res["x"][-1]), 0.0, key="fn_px")
+                py = p2.number_input("Elevation y [m] (≤ 0)", float(res["y"][0]), 0.0, float(res["y"][0]) / 2, key="fn_py")
+                pt = seepage_solver.point_values(res, px, py)
+                if pt is not None:
+                    st.dataframe(pd.DataFrame({
+                        "Total Head (m)": [pt["h_total"]],
+                        "Pressure Head (m)": [pt["pressure_head"]],
+                        "Pore Pressure u (kPa)": [pt["u"]],
+                    }).style.format("{:.3f}"), hide_index=True)
+
 if __name__ == "__main__":
     app()
@@ -4,6 +4,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 
+from topics import stress_profile
+
 # =========================================================
 # APP CONFIG
 # =========================================================
@@ -59,45 +61,38 @@ def render_layers_input(prefix, label, default_layers):
             current_z += h
     return layers
 
-def calculate_stress(z_local, layers, wt_depth, surcharge, mode="Active"):
-    """Calculates lateral stress at a specific depth (Rankine) with Extrapolation Fix."""
+def side_profile(layers, wt_depth, surcharge, z_max=0.0):
+    """Vertical stress profile of one side; the last layer extends down to z_max (extrapolation)."""
+    bottom = max(layers[-1]['bottom'], z_max, wt_depth)
+    prof_layers = [{"id": l['id'], "type": l['type'], "top": l['top'],
+                    "bot": bottom if i == len(layers) - 1 else l['bottom'],
+                    "g_sat": l['gamma'], "g_dry": l['gamma']} for i, l in enumerate(layers)]
+    return stress_profile.StressProfile.from_layers(prof_layers, wt_depth, surcharge=surcharge, gamma_w=GAMMA_W)
+
+def calculate_stress(z_local, layers, wt_depth, surcharge, mode="Active", profile=None):
+    """
+    Calculates lateral stress (Rankine) at a depth or an array of depths.
+    Vertical stresses are read from a `StressProfile` (pass `profile` to reuse one).
+    """
     
     # 1. Safety Check
     if not layers: return 0, 0, 0, "None"
+    z = np.asarray(z_local, dtype=float)
+    if profile is None:
+        profile = side_profile(layers, wt_depth, surcharge, float(np.max(z)))
     
-    # 2. Determine Active Layer Properties
-    active_layer = layers[-1] # Default to last layer (for extrapolation)
-    for l in layers:
-        if z_local <= l['bottom']: 
-            active_layer = l
-            break
-            
-    # 3. Calculate Vertical Total Stress (sig_v)
-    sig_v = surcharge
-    total_defined_depth = layers[-1]['bottom']
-    
-    # Iterate layers to sum up weight
-    for l in layers:
-        if z_local > l['bottom']:
-            # We are deeper than this layer, add full weight
-            sig_v += l['H'] * l['gamma']
-        elif z_local > l['top']:
-            # We are inside this layer, add partial weight
-            sig_v += (z_local - l['top']) * l['gamma']
-            
-    # --- FIX: Extrapolate if depth exceeds defined layers ---
-    if z_local > total_defined_depth:
-        extra_depth = z_local - total_defined_depth
-        sig_v += extra_depth * layers[-1]['gamma']
-
-    # 4. Pore Water Pressure
-    u = (z_local - wt_depth) * GAMMA_W if z_local > wt_depth else 0.0
-    sig_v_eff = sig_v - u
+    # 2. Active Layer Properties (the last layer also covers extrapolated depths)
+    bottoms = np.array([l['bottom'] for l in layers])
+    k = np.minimum(np.searchsorted(bottoms, z, side="left"), len(layers) - 1)
+    phi_r = np.radians(np.array([l['phi'] for l in layers]))[k]
+    c_val = np.array([l['c'] for l in layers])[k]
+    layer_id = np.array([l['id'] for l in layers])[k]
     
-    # 5. Lateral Earth Pressure Coefficient (K) & Stress
-    phi_r = np.radians(active_layer['phi'])
-    c_val = active_layer['c']
+    # 3. Vertical Effective Stress & Pore Water Pressure
+    u = profile.u(z)
+    sig_v_eff = profile.sigma_eff(z)
     
+    # 4. Lateral Earth Pressure Coefficient (K) & Stress
     if mode == "Active":
         K = (1 - np.sin(phi_r)) / (1 + np.sin(phi_r))
         sig_lat_eff = (sig_v_eff * K) - (2 * c_val * np.sqrt(K))
@@ -105,10 +100,11 @@ def calculate_stress(z_local, layers, wt_depth, surcharge, mode="Active"):
         K = (1 + np.sin(phi_r)) / (1 - np.sin(phi_r))
         sig_lat_eff = (sig_v_eff * K) + (2 * c_val * np.sqrt(K))
         
-    if sig_lat_eff < 0: sig_lat_eff = 0
-    sig_lat_tot = sig_lat_eff + u
+    sig_lat_tot = np.maximum(sig_lat_eff, 0) + u
     
-    return sig_lat_tot, u, K, active_layer['id']
+    if z.ndim == 0:
+        return float(sig_lat_tot), float(u), float(K), int(layer_id)
+    return sig_lat_tot, u, K, layer_id
 
 # =========================================================
 # MAIN APP
@@ -150,6 +146,10 @@ def app():
             
             st.markdown("---")
             calc_trigger = st.button("Calculate Pressure Profile", type="primary", use_container_width=True)
+            if calc_trigger:
+                # One profile per side, shared by the graph and the table
+                right_prof = side_profile(right_layers, right_wt, right_q, wall_height)
+                left_prof = side_profile(left_layers, left_wt, 0, wall_height - excavation_depth)
 
         with col_viz:
             st.subheader("Soil Profile Preview")
@@ -229,11 +229,11 @@ def app():
                 
                 # Active (Right) Calculation
                 y_steps = np.linspace(0, wall_height, 100)
-                p_right = [calculate_stress(y, right_layers, right_wt, right_q, "Active")[0] for y in y_steps]
+                p_right = calculate_stress(y_steps, right_layers, right_wt, right_q, "Active", right_prof)[0]
                 
                 # Passive (Left) Calculation
                 y_steps_l = np.linspace(0, wall_height - excavation_depth, 100)
-                p_left = [calculate_stress(y, left_layers, left_wt, 0, "Passive")[0] for y in y_steps_l]
+                p_left = calculate_stress(y_steps_l, left_layers, left_wt, 0, "Passive", left_prof)[0]
                 
                 # Plot Active
                 ax_s.plot(p_right, y_steps, 'r-', label="Active (Right Side)")
@@ -255,31 +255,21 @@ def app():
         if calc_trigger:
             st.markdown("---")
             st.subheader("Stress Calculation Table")
-            table_data = []
+            # Integer depths, both sides in one call each
+            z_tab = np.arange(0, int(wall_height) + 1, dtype=float)
+            r_sig, r_u, r_K, r_L = calculate_stress(z_tab, right_layers, right_wt, right_q, "Active", right_prof)
+            local_z_left = z_tab - excavation_depth
+            has_left = local_z_left >= 0
+            l_sig, l_u, l_K, l_L = calculate_stress(np.maximum(local_z_left, 0), left_layers, left_wt, 0, "Passive",
+                                                    left_prof)
             
-            # Iterate depth integers
-            for z in range(0, int(wall_height) + 1):
-                row = {"Depth (m)": float(z)}
-                
-                # Right Side
-                r_sig, r_u, r_K, r_L = calculate_stress(float(z), right_layers, right_wt, right_q, "Active")
-                row["[R] Layer"] = r_L
-                row["[R] Stress"] = r_sig
-                row["[R] Ka"] = r_K
-                
-                # Left Side
-                local_z_left = z - excavation_depth
-                if local_z_left >= 0:
-                    l_sig, l_u, l_K, l_L = calculate_stress(local_z_left, left_layers, left_wt, 0, "Passive")
-                    row["[L] Layer"] = l_L
-                    row["[L] Stress"] = l_sig
-                    row["[L] Kp"] = l_K
-                else:
-                    row["[L] Layer"] = "-"
-                    row["[L] Stress"] = 0.0
-                    row["[L] Kp"] = 0.0
-                    
-                table_data.append(row)
+            table_data = {
+                "Depth (m)": z_tab,
+                "[R] Layer": r_L, "[R] Stress": r_sig, "[R] Ka": r_K,
+                "[L] Layer": np.where(has_left, l_L.astype(object), "-"),
+                "[L] Stress": np.where(has_left, l_sig, 0.0),
+                "[L] Kp": np.where(has_left, l_K, 0.0),
+            }
             
             df = pd.DataFrame(table_data)
             st.dataframe(df.style.format({
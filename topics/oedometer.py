@@ -0,0 +1,232 @@
+import numpy as np
+import pandas as pd
+
+from topics.consolidation_engine import average_degree, time_factor
+from topics.settlement_monitoring import batch_linear_fit, resample
+
+# =========================================================
+# OEDOMETER TEST PROCESSING (no Streamlit imports)
+# =========================================================
+# Dial readings of every load increment are held as NaN-padded arrays
+# T [min] and D [mm] of shape (n_increments, n_readings). D is the
+# cumulative compression since the start of the test (positive down).
+# Drainage is double, so H_dr is half the current specimen height.
+
+MM2_PER_MIN_TO_M2_PER_YEAR = 1e-6 * 365.25 * 24 * 60
+
+
+# =========================================================
+# READING DATA
+# =========================================================
+def load_test(source, dial_decreasing=False):
+    """
+    Read an oedometer test from a CSV path or file-like object with columns
+    "stress" (kPa), "time" (min) and "dial" (mm), any case; an optional
+    "increment" column labels the increments, otherwise a new increment
+    starts whenever the stress changes. Returns a dict with the increment
+    stresses and the NaN-padded T and D arrays.
+    """
+    df = pd.read_csv(source)
+    cols = {c.strip().lower().split(" ")[0]: c for c in df.columns}
+    stress = df[cols["stress"]].to_numpy(dtype=float)
+    if "increment" in cols:
+        label = df[cols["increment"]].to_numpy()
+        new = np.r_[True, label[1:] != label[:-1]]
+    else:
+        new = np.r_[True, stress[1:] != stress[:-1]]
+    inc = np.cumsum(new) - 1
+    dial = df[cols["dial"]].to_numpy(dtype=float)
+    return pad_increments(inc, stress, df[cols["time"]].to_numpy(dtype=float), -dial if dial_decreasing else dial)
+
+
+def pad_increments(inc, stress, t, d):
+    """Build NaN-padded (increment x reading) arrays from flat columns."""
+    n_inc = int(inc.max()) + 1
+    pos = np.arange(inc.size) - np.searchsorted(inc, inc)  # reading index within the increment
+    T = np.full((n_inc, int(pos.max()) + 1), np.nan)
+    D = np.full_like(T, np.nan)
+    T[inc, pos], D[inc, pos] = t, d
+    return {"stress": stress[np.r_[True, inc[1:] != inc[:-1]]], "T": T, "D": D}
+
+
+def example_test(e0=0.9, H0=20.0, Cc=0.40, Cr=0.06, sigma_p=120.0, cv=1.5,
+                 stresses=(12.5, 25, 50, 100, 200, 400, 800, 1600, 800, 200, 50, 12.5), seed=0):
+    """Synthetic 12-increment x 30-reading test following Terzaghi's solution (for demonstration)."""
+    rng = np.random.default_rng(seed)
+    times = np.r_[0.0, np.logspace(-1, np.log10(1440), 29)]
+    sig = np.asarray(stresses, dtype=float)
+    prev, e_prev, H = 1.0, e0, H0
+    rows = []
+    d_prev = 0.0
+    for k, s in enumerate(sig):
+        if k > 0 and s < sig[k - 1]:
+            e_new = e_prev + Cr * np.log10(prev / s)
+        else:
+            lo, hi = np.log10(max(prev, 1e-9)), np.log10(s)
+            x_p = np.log10(sigma_p)
+            recomp = max(0.0, min(hi, x_p) - lo)
+            virgin = max(0.0, hi - max(lo, x_p))
+            e_new = e_prev - Cr * recomp - Cc * virgin
+        d_end = d_prev + (e_prev - e_new) / (1 + e0) * H0
+        H = H0 - 0.5 * (d_prev + d_end)
+        U = average_degree(cv / MM2_PER_MIN_TO_M2_PER_YEAR * times / (H / 2) ** 2)
+        d = d_prev + (d_end - d_prev) * U + rng.normal(0.0, 2e-4, times.size) * (times > 0)
+        rows += [(k, s, t, x) for t, x in zip(times, d)]
+        prev, e_prev, d_prev = s, e_new, d_end
+    inc, s_col, t_col, d_col = (np.array(c) for c in zip(*rows))
+    return pad_increments(inc.astype(int), s_col, t_col, d_col)
+
+
+# =========================================================
+# TIME-COMPRESSION CURVE FITTING
+# =========================================================
+def _row_count(X):
+    return np.isfinite(X).sum(axis=1)
+
+
+def _first_crossing(x, f):
+    """Interpolated x where f first turns negative in every row (NaN if never)."""
+    neg = np.isfinite(f) & (f < 0)
+    k = np.argmax(neg, axis=1)
+    ok = neg.any(axis=1) & (k > 0)
+    k = np.maximum(k, 1)[:, None]
+    x0, x1 = np.take_along_axis(x, k - 1, axis=1)[:, 0], np.take_along_axis(x, k, axis=1)[:, 0]
+    f0, f1 = np.take_along_axis(f, k - 1, axis=1)[:, 0], np.take_along_axis(f, k, axis=1)[:, 0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(ok, x0 + f0 * (x1 - x0) / (f0 - f1), np.nan)
+
+
+def taylor_t90(T, D, fit_fraction=0.5):
+    """
+    Root-time construction for every increment at once. A line is fitted to
+    the early readings (up to `fit_fraction` of the increment's compression)
+    on d vs sqrt(t); its intercept is the corrected zero d0. t90 is where the
+    curve crosses the line with 1.15x the abscissae. Returns t90 [min], d0, d90, d100.
+    """
+    rt = np.sqrt(T)
+    d_first = D[:, :1]
+    d_last = np.take_along_axis(D, np.maximum(_row_count(D) - 1, 0)[:, None], axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        progress = (D - d_first) / (d_last - d_first)
+    early = (progress <= fit_fraction) & np.isfinite(rt)
+    a, b, _, _ = batch_linear_fit(np.where(early, rt, np.nan), np.where(early, D, np.nan))
+    # Curve starts above the 1.15 line and t90 is where it drops below it
+    gap = D - (a[:, None] + b[:, None] * rt / 1.15)
+    rt90 = _first_crossing(rt, np.where(rt > 0, gap, np.nan))
+    d90 = a + b * rt90 / 1.15
+    return {"t90": rt90**2, "d0": a, "d90": d90, "d100": a + (d90 - a) / 0.9}
+
+
+def casagrande_t50(T, D, t1=0.25, n_tail=3):
+    """
+    Log-time construction for every increment at once. d100 is where the
+    tangent at the inflection (steepest d vs log t) meets the line through
+    the last `n_tail` readings; d0 = 2 d(t1) - d(4 t1). t50 is read at
+    (d0 + d100) / 2. Returns t50 [min], d0, d50, d100.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = np.where(T > 0, np.log10(T), np.nan)
+    # Central-difference slope of d vs log t; the steepest point is the inflection
+    slope = np.full_like(D, np.nan)
+    slope[:, 1:-1] = (D[:, 2:] - D[:, :-2]) / (x[:, 2:] - x[:, :-2])
+    k = np.argmax(np.where(np.isfinite(slope), slope, -np.inf), axis=1)[:, None]
+    s_inf = np.take_along_axis(slope, k, axis=1)[:, 0]
+    x_inf, d_inf = np.take_along_axis(x, k, axis=1)[:, 0], np.take_along_axis(D, k, axis=1)[:, 0]
+
+    idx = np.arange(D.shape[1])[None, :]
+    tail = (idx >= _row_count(D)[:, None] - n_tail) & np.isfinite(x)
+    a_t, b_t, _, _ = batch_linear_fit(np.where(tail, x, np.nan), np.where(tail, D, np.nan))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x100 = (d_inf - s_inf * x_inf - a_t) / (b_t - s_inf)
+    d100 = a_t + b_t * x100
+
+    d_t1, d_t2 = resample(T, D, [t1, 4 * t1]).T
+    d0 = 2 * d_t1 - d_t2
+    d50 = 0.5 * (d0 + d100)
+    x50 = _first_crossing(x, np.where(np.isfinite(x), d50[:, None] - D, np.nan))
+    return {"t50": 10**x50, "d0": d0, "d50": d50, "d100": d100,
+            "x_inflection": x_inf, "d_inflection": d_inf, "slope_inflection": s_inf, "tail": (a_t, b_t)}
+
+
+# =========================================================
+# e - log sigma' CURVE
+# =========================================================
+def compression_parameters(stress, e, n_virgin=3, n_dense=400):
+    """
+    Cc, Cr and sigma'_p from the end-of-increment void ratios.
+
+    Cc is the slope of the line through the last `n_virgin` loading points.
+    sigma'_p follows Casagrande: at the point of maximum curvature (on a PCHIP
+    interpolant of e vs log sigma', left of the virgin line) the angle between
+    the horizontal and the tangent is bisected, and the bisector meets the
+    virgin line. Cr is the mean slope of the unloading branch, or of the first
+    loading step if the test has no unloading.
+    """
+    from scipy.interpolate import PchipInterpolator
+
+    stress, e = np.asarray(stress, dtype=float), np.asarray(e, dtype=float)
+    k_max = int(np.argmax(stress))
+    x_load, e_load = np.log10(stress[:k_max + 1]), e[:k_max + 1]
+    n_v = min(n_virgin, x_load.size)
+    m_v, a_v = np.polyfit(x_load[-n_v:], e_load[-n_v:], 1)
+    Cc = -m_v
+
+    if k_max + 1 < stress.size:
+        x_un, e_un = np.log10(stress[k_max:]), e[k_max:]
+        Cr = -np.polyfit(x_un, e_un, 1)[0]
+    else:
+        Cr = -(e_load[1] - e_load[0]) / (x_load[1] - x_load[0]) if x_load.size > 1 else np.nan
+
+    result = {"Cc": Cc, "Cr": Cr, "sigma_p": np.nan, "virgin": (a_v, m_v)}
+    if x_load.size - n_v < 2:
+        return result
+
+    curve = PchipInterpolator(x_load, e_load)
+    xs = np.linspace(x_load[0], x_load[-n_v], n_dense)
+    d1, d2 = curve.derivative(1)(xs), curve.derivative(2)(xs)
+    kappa = np.abs(d2) / (1 + d1**2) ** 1.5
+    j = int(np.argmax(kappa))
+    x_c, e_c, m_t = xs[j], float(curve(xs[j])), d1[j]
+    m_b = np.tan(0.5 * np.arctan(m_t))  # bisector of horizontal and tangent
+    x_p = (e_c - m_b * x_c - a_v) / (m_v - m_b)
+    result.update({"sigma_p": 10**x_p, "x_curvature": x_c, "e_curvature": e_c,
+                   "tangent_slope": m_t, "bisector_slope": m_b})
+    return result
+
+
+# =========================================================
+# FULL TEST
+# =========================================================
+def process_test(test, H0, e0, t1=0.25, n_virgin=3):
+    """
+    Process every increment: void ratio at the end of the increment and cv by
+    both constructions (m^2/year). Returns (table, compression parameters,
+    Taylor results, Casagrande results).
+    """
+    T, D = test["T"], test["D"]
+    count = _row_count(D)
+    d_start = D[:, 0]
+    d_end = np.take_along_axis(D, np.maximum(count - 1, 0)[:, None], axis=1)[:, 0]
+    e_end = e0 - (1 + e0) * d_end / H0
+    Hdr = (H0 - 0.5 * (d_start + d_end)) / 2.0
+
+    # Unloading increments swell: flip them so every curve rises with time
+    D_fit = D * np.where(d_end < d_start, -1.0, 1.0)[:, None]
+    tay = taylor_t90(T, D_fit)
+    cas = casagrande_t50(T, D_fit, t1)
+    cv_taylor = time_factor(0.9) * Hdr**2 / tay["t90"] * MM2_PER_MIN_TO_M2_PER_YEAR
+    cv_cas = time_factor(0.5) * Hdr**2 / cas["t50"] * MM2_PER_MIN_TO_M2_PER_YEAR
+    comp = compression_parameters(test["stress"], e_end, n_virgin)
+
+    table = pd.DataFrame({
+        "Increment": np.arange(1, T.shape[0] + 1),
+        "σ' (kPa)": test["stress"],
+        "Readings": count,
+        "ΔH (mm)": d_end - d_start,
+        "e (end)": e_end,
+        "t50 (min)": cas["t50"],
+        "t90 (min)": tay["t90"],
+        "cv Casagrande (m²/yr)": cv_cas,
+        "cv Taylor (m²/yr)": cv_taylor,
+    })
+    return table, comp, tay, cas
@@ -0,0 +1,15 @@
+import multiprocessing as mp
+
+# =========================================================
+# PROCESS POOL HELPERS (no Streamlit imports)
+# =========================================================
+# Shared by the engines that fan work out to a ProcessPoolExecutor, so
+# none of them has to import another engine just for the pool setup.
+
+
+def process_pool_context():
+    """
+    Multiprocessing context for worker pools. Fork is used where available,
+    since spawned workers would re-run the calling Streamlit script as __main__.
+    """
+    return mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
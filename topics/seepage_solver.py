@@ -0,0 +1,269 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# =========================================================
+# 2D STEADY SEEPAGE ENGINE (no Streamlit imports)
+# =========================================================
+# Confined flow below a dam base and/or a sheet pile on a structured grid
+# of nx x ny nodes. x is horizontal (the structure centred on x = 0), y is
+# elevation with the ground surface at y = 0 and the impervious base at
+# y = -soil_depth. Heads are total heads with the datum at the ground
+# surface, so h_up / h_down are the water depths above ground upstream /
+# downstream. The far sides of the domain are no-flow boundaries.
+#
+# Node (j, i) (row j from the base, column i) has index j * nx + i. The
+# 5-point finite-volume Laplacian uses half control volumes on the domain
+# boundary; a sheet pile is a line between two node columns across which
+# the horizontal links are removed, the dam base is a no-flow stretch of
+# the surface.
+
+GAMMA_W = 9.81
+MODES = ("Sheet Pile Only", "Concrete Dam Only", "Combined (Dam + Pile)")
+
+
+# =========================================================
+# GEOMETRY
+# =========================================================
+def structure(mode, dam_width=0.0, pile_depth=0.0, pile_x=0.0):
+    """(dam_left, dam_right, pile_depth, pile_x) actually present for `mode`."""
+    dam = dam_width / 2.0 if mode != "Sheet Pile Only" else 0.0
+    pile = pile_depth if mode != "Concrete Dam Only" else 0.0
+    return -dam, dam, pile, pile_x if pile > 0 else 0.0
+
+
+def build_grid(soil_depth, x_extent, dam_width=0.0, nx=400, ny=200):
+    """Node coordinates: x spans the dam plus `x_extent` on each side, y from the base up to the surface."""
+    half = dam_width / 2.0 + x_extent
+    return np.linspace(-half, half, nx), np.linspace(-soil_depth, 0.0, ny)
+
+
+def _pile_column(x, pile_x):
+    """Index i of the node column just upstream of the pile line (the pile lies between i and i + 1)."""
+    return int(np.clip(np.searchsorted(x, pile_x) - 1, 0, x.size - 2))
+
+
+# =========================================================
+# ASSEMBLY
+# =========================================================
+def link_conductances(x, y, kx, ky, pile_depth=0.0, pile_x=0.0):
+    """
+    Horizontal (ny, nx-1) and vertical (ny-1, nx) link conductances of the
+    finite-volume grid; links crossing the sheet pile are zero.
+    """
+    dx, dy = x[1] - x[0], y[1] - y[0]
+    wy = np.full(y.size, dy)
+    wy[[0, -1]] *= 0.5
+    wx = np.full(x.size, dx)
+    wx[[0, -1]] *= 0.5
+    c_h = np.repeat((kx * wy / dx)[:, None], x.size - 1, axis=1)
+    c_v = np.repeat((ky * wx / dy)[None, :], y.size - 1, axis=0)
+    if pile_depth > 0:
+        c_h[y > -pile_depth - 0.5 * dy, _pile_column(x, pile_x)] = 0.0
+    return c_h, c_v
+
+
+def laplacian(c_h, c_v):
+    """Sparse graph Laplacian (CSR, symmetric positive semi-definite) from the link conductances."""
+    from scipy import sparse
+
+    ny, nx = c_v.shape[0] + 1, c_h.shape[1] + 1
+    idx = np.arange(ny * nx).reshape(ny, nx)
+    a = np.concatenate([idx[:, :-1].ravel(), idx[:-1, :].ravel()])
+    b = np.concatenate([idx[:, 1:].ravel(), idx[1:, :].ravel()])
+    c = np.concatenate([c_h.ravel(), c_v.ravel()])
+    keep = c > 0
+    a, b, c = a[keep], b[keep], c[keep]
+    rows = np.concatenate([a, b, a, b])
+    cols = np.concatenate([b, a, a, b])
+    data = np.concatenate([-c, -c, c, c])
+    return sparse.csr_matrix((data, (rows, cols)), shape=(ny * nx, ny * nx))
+
+
+def boundary_nodes(x, y, dam_left, dam_right, pile_x, has_pile):
+    """Surface node indices held at h_up (upstream) and h_down (downstream)."""
+    top = (y.size - 1) * x.size
+    if dam_right > dam_left:
+        up, down = x < dam_left, x > dam_right
+    elif has_pile:
+        i_p = _pile_column(x, pile_x)
+        up, down = np.arange(x.size) <= i_p, np.arange(x.size) > i_p
+    else:
+        raise ValueError("Define a dam base or a sheet pile.")
+    return top + np.flatnonzero(up), top + np.flatnonzero(down)
+
+
+# =========================================================
+# UNIT-HEAD SOLUTION CACHE
+# =========================================================
+# Seepage is linear in the boundary heads and in k, so the field for any
+# h_up / h_down / k is h = h_down + (h_up - h_down) * phi, where phi is the
+# solution for unit head drop and unit permeability. phi depends only on
+# the geometry, the anisotropy and the mesh; it is cached (least recently
+# used evicted first) with the total size of the cached arrays bounded.
+
+CACHE_MAX_BYTES = 64 * 2**20
+
+
+class UnitSolutionCache:
+    """LRU mapping of geometry keys to unit-head solutions, bounded by the bytes of their arrays."""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _size(entry):
+        return sum(v.nbytes for v in entry.values() if isinstance(v, np.ndarray))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        size = self._size(entry)
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._size(self._entries.pop(key))
+            if size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self.nbytes -= self._size(old)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = self.hits = self.misses = 0
+
+    def info(self):
+        return {"entries": len(self._entries), "nbytes": self.nbytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+
+UNIT_CACHE = UnitSolutionCache()
+
+
+# =========================================================
+# SOLUTION
+# =========================================================
+def unit_solution(dam_left, dam_right, pile, pile_x, soil_depth, x_extent, anisotropy, nx, ny):
+    """
+    Head field phi for h_up = 1, h_down = 0 and kx = 1: the free nodes of the
+    5-point system are solved with a sparse LU factorization
+    (scipy.sparse.linalg.splu). The stream function is integrated from the
+    discrete horizontal link fluxes, column by column upward from the base
+    (psi = 0), so it is exactly consistent with the head solution. The
+    returned arrays are read-only.
+    """
+    from scipy.sparse.linalg import splu
+
+    x, y = build_grid(soil_depth, x_extent, dam_right - dam_left, nx, ny)
+    c_h, c_v = link_conductances(x, y, 1.0, 1.0 / anisotropy, pile, pile_x)
+    A = laplacian(c_h, c_v)
+    up, down = boundary_nodes(x, y, dam_left, dam_right, pile_x, pile > 0)
+
+    phi = np.zeros(nx * ny)
+    fixed = np.zeros(nx * ny, dtype=bool)
+    fixed[up], fixed[down] = True, True
+    phi[up] = 1.0
+    free = ~fixed
+    A_free = A[free][:, free].tocsc()
+    rhs = -(A[free][:, fixed] @ phi[fixed])
+    phi[free] = splu(A_free, permc_spec="COLAMD").solve(rhs)
+
+    # Flux leaving the domain at each fixed node (positive out)
+    out = -(A @ phi)
+    P = phi.reshape(ny, nx)
+    F = c_h * (P[:, :-1] - P[:, 1:])  # horizontal link flux, positive towards +x
+    dy = y[1] - y[0]
+    top = (ny - 1) * nx
+    entry = {
+        "x": x, "y": y, "phi": P, "psi": np.vstack([np.zeros((1, nx - 1)), np.cumsum(F, axis=0)]),
+        "x_psi": 0.5 * (x[:-1] + x[1:]), "y_psi": np.concatenate([[y[0]], np.minimum(y + 0.5 * dy, 0.0)]),
+        "q": float(out[down].sum()), "q_up": float(-out[up].sum()),
+        "rise": (P[-2, :] - P[-1, :]) / dy, "up_cols": up - top, "down_cols": down - top,
+    }
+    for v in entry.values():
+        if isinstance(v, np.ndarray):
+            v.flags.writeable = False
+    return entry
+
+
+def solve_seepage(mode, h_up, h_down, soil_depth, dam_width=0.0, pile_depth=0.0, pile_x=0.0, k=1e-5,
+                  anisotropy=1.0, x_extent=None, nx=400, ny=200, gamma_sat=20.0, gamma_w=GAMMA_W,
+                  cache=UNIT_CACHE):
+    """
+    Steady confined seepage for the given heads. `k` is the horizontal
+    permeability [m/s] and `anisotropy` = kx / ky. The unit-head solution is
+    taken from `cache` (pass None to always solve) and scaled to the heads
+    and k, so changing only those costs no solve.
+
+    Returns head and pore pressure fields, psi, the flow rate q [m^3/s per
+    m], the uplift under the dam and the exit gradients on the outflow side
+    (downstream, or upstream when h_down > h_up).
+    """
+    if soil_depth <= 0 or nx < 3 or ny < 3:
+        raise ValueError("soil_depth must be > 0 and the grid at least 3 x 3.")
+    dam_left, dam_right, pile, pile_x = structure(mode, dam_width, pile_depth, pile_x)
+    if pile >= soil_depth:
+        raise ValueError("The sheet pile must stop above the impervious base.")
+    if dam_right <= dam_left and pile <= 0:
+        raise ValueError("Define a dam base or a sheet pile.")
+    if x_extent is None:
+        x_extent = 3.0 * soil_depth + abs(pile_x)
+
+    key = (dam_left, dam_right, pile, pile_x, soil_depth, x_extent, anisotropy, int(nx), int(ny))
+    unit = cache.get(key) if cache is not None else None
+    cached = unit is not None
+    if unit is None:
+        unit = unit_solution(*key)
+        if cache is not None:
+            cache.put(key, unit)
+
+    x, y = unit["x"], unit["y"]
+    dh = h_up - h_down
+    H = h_down + dh * unit["phi"]
+    on_dam = (x >= dam_left) & (x <= dam_right) & (dam_right > dam_left)
+    xd, u_dam = x[on_dam], H[-1, on_dam] * gamma_w
+    uplift = float(np.sum(0.5 * (u_dam[1:] + u_dam[:-1]) * np.diff(xd)))  # trapezoid rule
+    # Water leaves through the surface on the low-head side
+    out_cols = unit["down_cols"] if dh >= 0 else unit["up_cols"]
+    exit_i = dh * unit["rise"][out_cols]  # upward gradient just below the surface
+    i_crit = (gamma_sat - gamma_w) / gamma_w
+    i_max = float(exit_i.max()) if exit_i.size else np.nan
+
+    return {
+        "x": x, "y": y, "h": H, "u": (H - y[:, None]) * gamma_w, "psi": k * dh * unit["psi"],
+        "x_psi": unit["x_psi"], "y_psi": unit["y_psi"], "q": k * dh * unit["q"], "q_up": k * dh * unit["q_up"],
+        "shape_factor": unit["q"], "dam": (dam_left, dam_right), "pile": (pile, pile_x),
+        "uplift_x": xd, "uplift_u": u_dam, "uplift_force": uplift,
+        "exit_x": x[out_cols], "exit_gradient": exit_i, "i_exit_max": i_max, "i_crit": i_crit,
+        "fs_piping": i_crit / i_max if i_max > 0 else np.inf, "cached": cached,
+    }
+
+
+def point_values(result, px, py, gamma_w=GAMMA_W):
+    """Bilinear total head and pore pressure at (px, py) below the surface (None outside the domain)."""
+    x, y, H = result["x"], result["y"], result["h"]
+    if not (x[0] <= px <= x[-1] and y[0] <= py <= y[-1]):
+        return None
+    i = int(np.clip(np.searchsorted(x, px) - 1, 0, x.size - 2))
+    j = int(np.clip(np.searchsorted(y, py) - 1, 0, y.size - 2))
+    tx, ty = (px - x[i]) / (x[i + 1] - x[i]), (py - y[j]) / (y[j + 1] - y[j])
+    h = ((1 - tx) * (1 - ty) * H[j, i] + tx * (1 - ty) * H[j, i + 1]
+         + (1 - tx) * ty * H[j + 1, i] + tx * ty * H[j + 1, i + 1])
+    return {"h_total": h, "pressure_head": h - py, "u": (h - py) * gamma_w}
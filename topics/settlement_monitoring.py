@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+
+from topics.consolidation_engine import time_factor
+
+# =========================================================
+# SETTLEMENT MONITORING BACK-ANALYSIS (no Streamlit imports)
+# =========================================================
+# Settlement-plate readings for many plates are held as two NaN-padded
+# arrays T, S of shape (n_plates, n_readings), each row sorted by time.
+# Units follow the rest of the consolidation pages: time [years],
+# settlement [m], drainage path [m], cv [m^2/year].
+
+HYPERBOLA_M, HYPERBOLA_C = 0.8212, 0.2438  # Tv/U = M Tv + C, least-squares over U = 60-90 %
+
+
+# =========================================================
+# READING DATA
+# =========================================================
+def pad_series(series):
+    """Stack a list of (t, s) arrays into time-sorted, NaN-padded T and S."""
+    n_max = max((len(t) for t, _ in series), default=0)
+    T = np.full((len(series), n_max), np.nan)
+    S = np.full((len(series), n_max), np.nan)
+    for i, (t, s) in enumerate(series):
+        t, s = np.asarray(t, dtype=float), np.asarray(s, dtype=float)
+        keep = np.isfinite(t) & np.isfinite(s)
+        order = np.argsort(t[keep], kind="stable")
+        T[i, :order.size], S[i, :order.size] = t[keep][order], s[keep][order]
+    return T, S
+
+
+def load_readings(source, time_scale=1.0, settlement_scale=1.0):
+    """
+    Read settlement-plate readings from a CSV path or file-like object.
+
+    Long format: columns "plate", "time", "settlement" (any case).
+    Wide format: first column is time, every other column one plate.
+    `time_scale` / `settlement_scale` convert to years and metres
+    (e.g. 1/365.25 for days, 1/1000 for mm). Returns (plate_ids, T, S).
+    """
+    df = pd.read_csv(source)
+    cols = {c.strip().lower(): c for c in df.columns}
+    if {"plate", "time", "settlement"} <= cols.keys():
+        groups = df.groupby(cols["plate"], sort=False)
+        ids = [str(k) for k in groups.groups]
+        series = [(g[cols["time"]].to_numpy(), g[cols["settlement"]].to_numpy()) for _, g in groups]
+    else:
+        t = df.iloc[:, 0].to_numpy()
+        ids = [str(c) for c in df.columns[1:]]
+        series = [(t, df[c].to_numpy()) for c in df.columns[1:]]
+    T, S = pad_series([(np.asarray(t, dtype=float) * time_scale, np.asarray(s, dtype=float) * settlement_scale)
+                       for t, s in series])
+    return ids, T, S
+
+
+def resample(T, S, grid):
+    """
+    Linear interpolation of every row onto the common time `grid` in one
+    pass: rows are laid end to end with an offset so a single searchsorted
+    serves all plates. Points outside a plate's reading span are NaN.
+    """
+    n_p, n_r = T.shape
+    grid = np.asarray(grid, dtype=float)
+    count = np.isfinite(T).sum(axis=1)
+    out = np.full((n_p, grid.size), np.nan)
+    if n_r < 2 or not (count >= 2).any():
+        return out
+
+    t_first = T[:, 0]
+    t_last = np.take_along_axis(T, np.maximum(count - 1, 0)[:, None], axis=1)[:, 0]
+    span = np.nanmax(T) - np.nanmin(T) + abs(grid).max() + 1.0
+    offset = np.arange(n_p)[:, None] * span
+    # Pad each row with its last time so the concatenation stays sorted
+    Tf = np.where(np.isfinite(T), T, t_last[:, None]) + offset
+    q = grid[None, :] + offset
+    k = np.searchsorted(Tf.ravel(), q.ravel(), side="right").reshape(q.shape) - 1
+    row0 = np.arange(n_p)[:, None] * n_r
+    k = np.clip(k - row0, 0, np.maximum(count - 2, 0)[:, None])
+
+    t0, t1 = np.take_along_axis(T, k, axis=1), np.take_along_axis(T, k + 1, axis=1)
+    s0, s1 = np.take_along_axis(S, k, axis=1), np.take_along_axis(S, k + 1, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        w = np.where(t1 > t0, (grid[None, :] - t0) / (t1 - t0), 0.0)
+    inside = (count[:, None] >= 2) & (grid[None, :] >= t_first[:, None]) & (grid[None, :] <= t_last[:, None])
+    out[inside] = (s0 + w * (s1 - s0))[inside]
+    return out
+
+
+# =========================================================
+# BATCH LEAST SQUARES
+# =========================================================
+def batch_linear_fit(x, y):
+    """
+    Row-wise least-squares line y = a + b x for NaN-padded arrays, using
+    masked sums (no Python loop over rows). Returns (a, b, n, r2); rows with
+    fewer than two points give NaN.
+    """
+    m = np.isfinite(x) & np.isfinite(y)
+    n = m.sum(axis=1)
+    x0, y0 = np.where(m, x, 0.0), np.where(m, y, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        xm, ym = x0.sum(axis=1) / n, y0.sum(axis=1) / n
+        dx, dy = np.where(m, x - xm[:, None], 0.0), np.where(m, y - ym[:, None], 0.0)
+        sxx, syy, sxy = (dx**2).sum(axis=1), (dy**2).sum(axis=1), (dx * dy).sum(axis=1)
+        b = sxy / sxx
+        a = ym - b * xm
+        r2 = sxy**2 / (sxx * syy)
+    bad = n < 2
+    a[bad], b[bad], r2[bad] = np.nan, np.nan, np.nan
+    return a, b, n, r2
+
+
+# =========================================================
+# ASAOKA & HYPERBOLIC METHODS
+# =========================================================
+def asaoka(T, S, dt, t_start=0.0, H_dr=None):
+    """
+    Asaoka (1978): readings resampled at a constant interval dt from t_start
+    satisfy S_i = b0 + b1 S_(i-1). Ultimate settlement S_ult = b0 / (1 - b1);
+    cv = -5 H_dr^2 ln(b1) / (12 dt) (double drainage, H_dr the drainage path);
+    t90 extrapolates the fitted geometric approach from the last reading.
+    """
+    grid = np.arange(t_start, np.nanmax(T) + 0.5 * dt, dt)
+    Sg = resample(T, S, grid)
+    b0, b1, n, r2 = batch_linear_fit(Sg[:, :-1], Sg[:, 1:])
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ok = (b1 > 0) & (b1 < 1)
+        S_ult = np.where(ok, b0 / (1 - b1), np.nan)
+        cv = np.where(ok & (H_dr is not None), -5.0 * (H_dr or 0.0) ** 2 * np.log(b1) / (12.0 * dt), np.nan)
+
+        last = np.isfinite(Sg).sum(axis=1) - 1
+        t_last = grid[np.maximum(last, 0)]
+        S_last = np.take_along_axis(Sg, np.maximum(last, 0)[:, None], axis=1)[:, 0]
+        t90 = t_last + dt * np.log(0.1 * S_ult / (S_ult - S_last)) / np.log(b1)
+    t90 = _observed_t90(T, S, S_ult, np.where(S_last >= 0.9 * S_ult, np.nan, t90))
+    return {"S_ult": S_ult, "cv": cv, "t90": t90, "beta0": b0, "beta1": b1, "n_points": n, "r2": r2,
+            "grid": grid, "S_grid": Sg}
+
+
+def hyperbolic(T, S, t_start=0.0, H_dr=None, M=HYPERBOLA_M, C=HYPERBOLA_C):
+    """
+    Hyperbolic method in absolute time (t and S measured from the start of
+    consolidation, the plates being zeroed at t = 0): readings from t_start
+    on plot as a straight line t/S = alpha + beta t (Tan 1971). Over 60-90 %
+    consolidation Terzaghi's solution follows Tv/U = M Tv + C (Sridharan et
+    al. 1987), which corrects the raw asymptote 1/beta: S_ult = M / beta,
+    cv = C beta H_dr^2 / (M alpha) and t90 = Tv90 H_dr^2 / cv, so t_start
+    should open a window of roughly 60-90 % consolidation. Without H_dr, t90
+    is read from the fitted hyperbola instead.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        use = (T >= t_start) & (T > 0) & (S > 0)
+        alpha, beta, n, r2 = batch_linear_fit(np.where(use, T, np.nan), np.where(use, T / S, np.nan))
+        ok = (beta > 0) & (alpha > 0)
+        S_ult = np.where(ok, M / beta, np.nan)
+        if H_dr is None:
+            cv = np.full(S_ult.shape, np.nan)
+            target = 0.9 * S_ult
+            t90 = np.where(ok & (target * beta < 1), alpha * target / (1 - beta * target), np.nan)
+        else:
+            cv = np.where(ok, C * beta * H_dr**2 / (M * alpha), np.nan)
+            t90 = time_factor(0.9) * H_dr**2 / cv
+    return {"S_ult": S_ult, "cv": cv, "t90": t90, "alpha": alpha, "beta": beta, "n_points": n, "r2": r2}
+
+
+def _observed_t90(T, S, S_ult, t90):
+    """Where a plate has already passed 0.9 S_ult, take the first reading time beyond it."""
+    with np.errstate(invalid="ignore"):
+        passed = np.isfinite(S) & (T >= 0) & (S >= 0.9 * S_ult[:, None])
+    first = np.argmax(passed, axis=1)
+    hit = passed.any(axis=1)
+    return np.where(hit & ~np.isfinite(t90), T[np.arange(T.shape[0]), first], t90)
+
+
+def back_analysis(plate_ids, T, S, dt, t_start=0.0, H_dr=None):
+    """Run both methods on every plate and return a summary table (one row per plate)."""
+    a = asaoka(T, S, dt, t_start, H_dr)
+    h = hyperbolic(T, S, t_start, H_dr)
+    count = np.isfinite(T).sum(axis=1)
+    last = np.maximum(count - 1, 0)[:, None]
+    return pd.DataFrame({
+        "Plate": list(plate_ids),
+        "Readings": count,
+        "Last Time (yr)": np.take_along_axis(T, last, axis=1)[:, 0],
+        "Last S (mm)": np.take_along_axis(S, last, axis=1)[:, 0] * 1000,
+        "Asaoka S_ult (mm)": a["S_ult"] * 1000,
+        "Asaoka cv (m²/yr)": a["cv"],
+        "Asaoka t90 (yr)": a["t90"],
+        "Asaoka β1": a["beta1"],
+        "Asaoka R²": a["r2"],
+        "Hyperbolic S_ult (mm)": h["S_ult"] * 1000,
+        "Hyperbolic cv (m²/yr)": h["cv"],
+        "Hyperbolic t90 (yr)": h["t90"],
+        "Hyperbolic R²": h["r2"],
+    })
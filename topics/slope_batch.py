@@ -0,0 +1,262 @@
+"""
+Headless batch runner for slope stability sections.
+
+Reads a CSV or JSON file of sections, solves each one with the engines in
+`topics.slope_engine` (no Streamlit import) on a process pool, and streams a
+results row plus the critical surface of every section as soon as it
+finishes. A section that fails produces an error row instead of stopping the
+batch.
+
+Usage:
+    python -m topics.slope_batch sections.csv -o results.csv --surfaces surfaces.csv --workers 8
+
+CSV columns (one row per section; layer 1 uses the unsuffixed names, deeper
+layers add the suffix 2, 3, ... with a horizontal top elevation `top<k>`):
+    name, H, beta, method, c, phi, gamma, gamma_sat,
+    c2, phi2, gamma2, gamma_sat2, top2, ...,
+    water_toe, water_crest, kh, kv, n_slices
+
+JSON: a list of sections (or {"sections": [...]}) with the same scalar keys,
+or a "layers" list in the `slope_engine` layer format, plus optional
+"piezo_x"/"piezo_y" and search ranges "xc_range", "yc_range", "yt_range",
+"entry_range", "exit_range".
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from topics import slope_engine
+from topics.parallel import process_pool_context
+
+METHODS = ("Ordinary", "Bishop", "Janbu", "Non-Circular")
+RESULT_FIELDS = ["name", "method", "status", "fs", "kh", "kv", "xc", "yc", "R",
+                 "x_entry", "x_exit", "n_layers", "seconds", "message"]
+
+
+# =========================================================
+# INPUT
+# =========================================================
+def _number(value, default=None):
+    """Parse a CSV/JSON field as float; blanks give `default`."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return default
+    return float(value)
+
+
+def _layers_from_flat(row):
+    """Build the layer list from flat c/phi/gamma(/k) keys."""
+    layers = [{
+        "c": _number(row.get("c"), 0.0), "phi": _number(row.get("phi"), 30.0),
+        "gamma": _number(row.get("gamma"), 19.0),
+        "gamma_sat": _number(row.get("gamma_sat"), _number(row.get("gamma"), 19.0)),
+    }]
+    k = 2
+    while _number(row.get(f"top{k}")) is not None:
+        gamma_k = _number(row.get(f"gamma{k}"), layers[-1]["gamma"])
+        top = _number(row.get(f"top{k}"))
+        layers.append({
+            "c": _number(row.get(f"c{k}"), 0.0), "phi": _number(row.get(f"phi{k}"), 30.0),
+            "gamma": gamma_k, "gamma_sat": _number(row.get(f"gamma_sat{k}"), gamma_k),
+            "top_x": [-1e6, 1e6], "top_y": [top, top],
+        })
+        k += 1
+    return layers
+
+
+def normalize_section(raw, index=0):
+    """Turn one CSV row / JSON object into a complete section dict (raises ValueError on bad input)."""
+    sec = {
+        "name": str(raw.get("name") or f"section_{index + 1}"),
+        "H": _number(raw.get("H")),
+        "beta": _number(raw.get("beta")),
+        "method": str(raw.get("method") or "Bishop").strip(),
+        "kh": _number(raw.get("kh"), 0.0),
+        "kv": _number(raw.get("kv"), 0.0),
+        "n_slices": int(_number(raw.get("n_slices"), 30)),
+    }
+    if sec["H"] is None or sec["beta"] is None:
+        raise ValueError("H and beta are required")
+    if not (sec["H"] > 0 and 0 < sec["beta"] <= 90):
+        raise ValueError("H must be > 0 and 0 < beta <= 90")
+    if sec["method"] not in METHODS:
+        raise ValueError(f"method must be one of {', '.join(METHODS)}")
+    sec["layers"] = raw["layers"] if isinstance(raw.get("layers"), list) else _layers_from_flat(raw)
+
+    sec["ground_x"], sec["ground_y"] = (list(map(float, v)) for v in
+                                        slope_engine.build_ground_profile(sec["H"], sec["beta"], max(10.0, 3 * sec["H"])))
+    X_crest, H = sec["ground_x"][2], sec["H"]
+    if raw.get("piezo_x") is not None:
+        sec["piezo_x"], sec["piezo_y"] = list(map(float, raw["piezo_x"])), list(map(float, raw["piezo_y"]))
+    elif _number(raw.get("water_toe")) is not None:
+        w_toe = _number(raw.get("water_toe"))
+        w_crest = _number(raw.get("water_crest"), w_toe)
+        sec["piezo_x"] = list(sec["ground_x"])
+        sec["piezo_y"] = [w_toe, w_toe, w_crest, w_crest]
+    else:
+        sec["piezo_x"] = sec["piezo_y"] = None
+
+    # Default search windows (as in the Streamlit tab), overridable per section
+    defaults = {
+        "xc_range": (-0.5 * H, X_crest + 0.5 * H), "yc_range": (1.0 * H, 3.0 * H),
+        "yt_range": (-0.5 * H, 0.5 * H), "entry_range": (-1.0 * H, 0.0),
+        "exit_range": (X_crest, X_crest + 1.5 * H),
+    }
+    for key, value in defaults.items():
+        sec[key] = tuple(map(float, raw[key])) if raw.get(key) is not None else value
+    return sec
+
+
+def load_sections(path):
+    """Read raw section records from a .csv or .json file."""
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data["sections"] if isinstance(data, dict) else data
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+# =========================================================
+# SOLVING
+# =========================================================
+def _circle_polyline(ground_x, ground_y, xc, yc, R, n=60):
+    """Points along the lower arc between its ground intersections."""
+    x_in, x_out = slope_engine.circle_ground_intersections(ground_x, ground_y, xc, yc, R)
+    xs = np.linspace(float(x_in), float(x_out), n)
+    return xs, yc - np.sqrt(np.clip(R**2 - (xs - xc)**2, 0.0, None))
+
+
+def solve_section(sec):
+    """Critical FS and surface of one normalised section."""
+    gx, gy, layers = sec["ground_x"], sec["ground_y"], sec["layers"]
+    row = {"name": sec["name"], "method": sec["method"], "kh": sec["kh"], "kv": sec["kv"],
+           "n_layers": len(layers)}
+
+    if sec["method"] == "Non-Circular":
+        res = slope_engine.noncircular_search(
+            gx, gy, layers, sec["entry_range"], sec["exit_range"], n_slices=sec["n_slices"],
+            piezo_x=sec["piezo_x"], piezo_y=sec["piezo_y"], kh=sec["kh"], kv=sec["kv"],
+            max_workers=1, seed=0
+        )
+        best = res["best"]
+        if best is None:
+            raise RuntimeError("no admissible surface in the search ranges")
+        row.update({"fs": best["fs"], "x_entry": float(best["surf_x"][0]), "x_exit": float(best["surf_x"][-1])})
+        return row, (best["surf_x"], best["surf_y"])
+
+    res = slope_engine.search_circle_slices(
+        gx, gy, layers, sec["xc_range"], sec["yc_range"], sec["yt_range"],
+        n_slices=sec["n_slices"], method=sec["method"], piezo_x=sec["piezo_x"], piezo_y=sec["piezo_y"],
+        kh=sec["kh"], kv=sec["kv"]
+    )
+    best = res["best"]
+    if best is None:
+        raise RuntimeError("no admissible circle in the search grid")
+    xs, ys = _circle_polyline(gx, gy, best["xc"], best["yc"], best["R"])
+    row.update({"fs": best["fs"], "xc": best["xc"], "yc": best["yc"], "R": best["R"],
+                "x_entry": float(xs[0]), "x_exit": float(xs[-1])})
+    return row, (xs, ys)
+
+
+def run_section(index, raw):
+    """Worker entry point: never raises, returns (index, result row, surface or None)."""
+    t0 = time.perf_counter()
+    name = str(raw.get("name") or f"section_{index + 1}") if isinstance(raw, dict) else f"section_{index + 1}"
+    try:
+        sec = normalize_section(raw, index)
+        row, surface = solve_section(sec)
+        row.update({"status": "ok", "message": ""})
+        surface = (list(map(float, surface[0])), list(map(float, surface[1])))
+    except Exception as e:  # one bad section must not stop the batch
+        row = {"name": name, "method": raw.get("method", "") if isinstance(raw, dict) else "",
+               "status": "error", "message": f"{type(e).__name__}: {e}"}
+        surface = None
+    row["seconds"] = round(time.perf_counter() - t0, 3)
+    return index, row, surface
+
+
+def run_batch(sections, max_workers=None):
+    """
+    Solve raw section records in parallel, yielding (index, row, surface) as each
+    one finishes. Sections run one per task on a `ProcessPoolExecutor`; a
+    crashed worker is reported as an error row for the affected sections.
+    """
+    if max_workers == 1:
+        for i, raw in enumerate(sections):
+            yield run_section(i, raw)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=process_pool_context()) as pool:
+        futures = {pool.submit(run_section, i, raw): i for i, raw in enumerate(sections)}
+        for fut in as_completed(futures):
+            try:
+                yield fut.result()
+            except Exception as e:
+                i = futures[fut]
+                raw = sections[i] if isinstance(sections[i], dict) else {}
+                yield i, {"name": str(raw.get("name") or f"section_{i + 1}"), "method": raw.get("method", ""),
+                          "status": "error", "seconds": float("nan"), "message": f"{type(e).__name__}: {e}"}, None
+
+
+# =========================================================
+# OUTPUT / CLI
+# =========================================================
+def _fmt(value):
+    if isinstance(value, float):
+        return "" if math.isnan(value) else f"{value:.6g}"
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch slope stability for many cross-sections.")
+    parser.add_argument("sections", help="Input .csv or .json file of sections")
+    parser.add_argument("-o", "--output", default="slope_results.csv", help="Results table (.csv)")
+    parser.add_argument("--surfaces", default=None, help="Critical surfaces, long format (.csv)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Do not print progress")
+    args = parser.parse_args(argv)
+
+    sections = load_sections(args.sections)
+    n_total, n_fail = len(sections), 0
+    t0 = time.perf_counter()
+
+    surf_file = open(args.surfaces, "w", newline="", encoding="utf-8") if args.surfaces else None
+    try:
+        with open(args.output, "w", newline="", encoding="utf-8") as out:
+            writer = csv.DictWriter(out, fieldnames=RESULT_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            surf_writer = csv.writer(surf_file) if surf_file else None
+            if surf_writer:
+                surf_writer.writerow(["name", "point", "x", "y"])
+
+            for done, (index, row, surface) in enumerate(run_batch(sections, args.workers), start=1):
+                writer.writerow({k: _fmt(v) for k, v in row.items()})
+                out.flush()
+                if surf_writer and surface is not None:
+                    surf_writer.writerows([row["name"], k, f"{x:.4f}", f"{y:.4f}"]
+                                          for k, (x, y) in enumerate(zip(*surface)))
+                    surf_file.flush()
+                if row["status"] != "ok":
+                    n_fail += 1
+                if not args.quiet:
+                    fs_txt = f"FS = {row['fs']:.3f}" if row["status"] == "ok" else f"ERROR {row['message']}"
+                    print(f"[{done}/{n_total}] {row['name']}: {fs_txt} ({row['seconds']:.1f} s)", file=sys.stderr)
+    finally:
+        if surf_file:
+            surf_file.close()
+
+    if not args.quiet:
+        print(f"{n_total - n_fail}/{n_total} sections solved in {time.perf_counter() - t0:.1f} s "
+              f"on {args.workers or os.cpu_count()} worker(s) -> {args.output}", file=sys.stderr)
+    return 1 if n_fail else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
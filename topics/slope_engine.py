@@ -0,0 +1,1129 @@
+import numpy as np
+from scipy import stats
+
+from topics.parallel import process_pool_context
+
+# =========================================================
+# SLOPE STABILITY ENGINE (no Streamlit imports)
+# =========================================================
+GAMMA_W = 9.81
+
+
+# =========================================================
+# GEOMETRY HELPERS
+# =========================================================
+def build_ground_profile(H, beta, extent=10.0):
+    """Toe at (0, 0), crest at (X_crest, H), flat ground `extent` m either side."""
+    X_crest = H / np.tan(np.radians(beta)) if beta > 0 else 10
+    ground_x = [-extent, 0, X_crest, X_crest + extent]
+    ground_y = [0, 0, H, H]
+    return ground_x, ground_y
+
+
+def circle_mass_properties(ground_x, ground_y, xc, yc, R, n_columns=120):
+    """
+    Sliding mass above the lower arc of circle(s) (xc, yc, R).
+
+    Centres and radii broadcast against each other; the mass is cut into
+    `n_columns` vertical columns across the ground profile and integrated in
+    one pass. Returns a dict of arrays with the broadcast shape.
+    """
+    gx = np.asarray(ground_x, dtype=float)
+    gy = np.asarray(ground_y, dtype=float)
+    xc, yc, R = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (xc, yc, R)))
+
+    edges = np.linspace(gx[0], gx[-1], n_columns + 1)
+    mids = 0.5 * (edges[:-1] + edges[1:])
+    dx = edges[1] - edges[0]
+    y_top = np.interp(mids, gx, gy)
+
+    xc_, yc_, R_ = xc[..., None], yc[..., None], R[..., None]
+    s = mids - xc_
+    inside = np.abs(s) < R_
+    y_base = yc_ - np.sqrt(np.clip(R_**2 - s**2, 0.0, None))
+    thk = np.where(inside, np.clip(y_top - y_base, 0.0, None), 0.0)
+    in_mass = thk > 0
+
+    # Exact arc length of the lower arc over each column: R * d(asin(s/R))
+    s_l = np.clip((edges[:-1] - xc_) / R_, -1.0, 1.0)
+    s_r = np.clip((edges[1:] - xc_) / R_, -1.0, 1.0)
+    arc = np.where(in_mass, R_ * (np.arcsin(s_r) - np.arcsin(s_l)), 0.0)
+
+    area = thk.sum(axis=-1) * dx
+    moment_x = (thk * s).sum(axis=-1) * dx
+    y_cent = (thk * 0.5 * (y_top + y_base)).sum(axis=-1) * dx
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        d = np.where(area > 0, moment_x / area, np.nan)
+        y_bar = np.where(area > 0, y_cent / area, np.nan)
+
+    # The lower arc must cross the ground on both sides (no vertical cut-offs),
+    # and masses spilling over the model boundary are not admissible
+    crosses = (np.interp(xc - R, gx, gy) <= yc) & (np.interp(xc + R, gx, gy) <= yc)
+    clipped = in_mass[..., 0] | in_mass[..., -1]
+
+    return {
+        "area": area,
+        "d": d,
+        "y_bar": y_bar,
+        "L_arc": arc.sum(axis=-1),
+        "valid": (area > 1e-6) & crosses & ~clipped,
+    }
+
+
+def polyline_integral(px, py, x):
+    """Integral of the piecewise-linear profile through (px, py) from px[0] to x."""
+    px = np.asarray(px, dtype=float)
+    py = np.asarray(py, dtype=float)
+    cum = np.concatenate(([0.0], np.cumsum(0.5 * (py[1:] + py[:-1]) * np.diff(px))))
+    x = np.clip(np.asarray(x, dtype=float), px[0], px[-1])
+    k = np.clip(np.searchsorted(px, x, side="right") - 1, 0, len(px) - 2)
+    return cum[k] + 0.5 * (py[k] + np.interp(x, px, py)) * (x - px[k])
+
+
+def circle_ground_intersections(ground_x, ground_y, xc, yc, R):
+    """Entry/exit x of the lower arc of circle(s) with the ground polyline (NaN if missed)."""
+    gx = np.asarray(ground_x, dtype=float)
+    gy = np.asarray(ground_y, dtype=float)
+    xc, yc, R = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (xc, yc, R)))
+    x0, y0 = gx[:-1], gy[:-1]
+    dx, dy = np.diff(gx), np.diff(gy)
+
+    # |P0 + t D - C|^2 = R^2 for every circle x segment
+    ox = x0 - xc[..., None]
+    oy = y0 - yc[..., None]
+    A = dx**2 + dy**2
+    B = 2 * (dx * ox + dy * oy)
+    Cq = ox**2 + oy**2 - R[..., None]**2
+    disc = B**2 - 4 * A * Cq
+    root = np.sqrt(np.clip(disc, 0.0, None))
+
+    hits = []
+    for sign in (-1.0, 1.0):
+        t = (-B + sign * root) / (2 * A)
+        ok = (disc >= 0) & (t >= 0) & (t <= 1) & (y0 + t * dy <= yc[..., None])
+        hits.append(np.where(ok, x0 + t * dx, np.nan))
+    hits = np.concatenate(hits, axis=-1)
+
+    with np.errstate(invalid="ignore"):
+        all_nan = np.all(np.isnan(hits), axis=-1)
+        x_in = np.where(all_nan, np.nan, np.nanmin(np.where(all_nan[..., None], 0.0, hits), axis=-1))
+        x_out = np.where(all_nan, np.nan, np.nanmax(np.where(all_nan[..., None], 0.0, hits), axis=-1))
+    return x_in, x_out
+
+
+# =========================================================
+# INFINITE SLOPE
+# =========================================================
+def calculate_infinite_slope(beta, phi, c, gamma, gamma_sat, z, u, case, kh=0.0, kv=0.0):
+    """
+    Infinite slope FS for one case. Inputs may be scalars or NumPy arrays
+    (broadcast together); flat or unloaded slopes return 999.0.
+
+    `kh` (downslope) and `kv` (upward) are pseudo-static seismic
+    coefficients applied to the soil column weight.
+    """
+    beta = np.asarray(beta, dtype=float)
+    beta_r = np.radians(beta)
+    phi_r = np.radians(phi)
+    seismic = np.any(np.asarray(kh) != 0) or np.any(np.asarray(kv) != 0)
+    # Normal and downslope components of the (pseudo-static) column load per unit weight
+    n_fac = (1 - kv) * np.cos(beta_r) - kh * np.sin(beta_r)
+    t_fac = (1 - kv) * np.sin(beta_r) + kh * np.cos(beta_r)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if case == "Dry Cohesionless (Sand)":
+            flat = t_fac <= 0
+            fs = np.where(flat, 999.0, n_fac * np.tan(phi_r) / t_fac)
+            formula, flat_msg = r"FS = \frac{\tan \phi'}{\tan \beta}", "Stable (Flat)"
+            if seismic:
+                formula = r"FS = \frac{[(1-k_v)\cos\beta - k_h\sin\beta]\tan\phi'}{(1-k_v)\sin\beta + k_h\cos\beta}"
+
+        elif case == "Seepage Parallel to Slope":
+            flat = t_fac <= 0
+            sigma_eff = gamma_sat * n_fac - GAMMA_W * np.cos(beta_r)
+            fs = np.where(flat, 999.0, sigma_eff * np.tan(phi_r) / (gamma_sat * t_fac))
+            formula, flat_msg = r"FS = \frac{\gamma'}{\gamma_{sat}} \frac{\tan \phi'}{\tan \beta}", "Stable"
+            if seismic:
+                formula = (r"FS = \frac{\{\gamma_{sat}[(1-k_v)\cos\beta - k_h\sin\beta] - \gamma_w\cos\beta\}\tan\phi'}"
+                           r"{\gamma_{sat}[(1-k_v)\sin\beta + k_h\cos\beta]}")
+
+        else: # Cohesive
+            sigma_n = gamma * z * np.cos(beta_r) * n_fac
+            tau_mob = gamma * z * np.cos(beta_r) * t_fac
+            resisting = c + (sigma_n - u) * np.tan(phi_r)
+            flat = tau_mob <= 0.001
+            fs = np.where(flat, 999.0, resisting / tau_mob)
+            formula, flat_msg = r"FS = \frac{c' + (\gamma z \cos^2\beta - u)\tan\phi'}{\gamma z \sin\beta \cos\beta}", "Stable (Flat)"
+            if seismic:
+                formula = (r"FS = \frac{c' + (\gamma z \cos\beta[(1-k_v)\cos\beta - k_h\sin\beta] - u)\tan\phi'}"
+                           r"{\gamma z \cos\beta[(1-k_v)\sin\beta + k_h\cos\beta]}")
+
+    if fs.ndim == 0:
+        if flat:
+            return 999.0, flat_msg
+        return float(fs), formula
+    return fs, formula
+
+
+def sample_parameter(spec, size, rng):
+    """
+    Draw `size` samples for one parameter. `spec` is a number (constant) or a
+    dict with "dist" in {"constant", "normal", "lognormal", "truncated"},
+    "mean", "std" and, for truncated normals, "low"/"high".
+    """
+    if np.isscalar(spec):
+        return np.full(size, float(spec))
+    dist = spec.get("dist", "normal").lower()
+    mean, std = float(spec["mean"]), float(spec.get("std", 0.0))
+
+    if dist == "constant" or std <= 0:
+        return np.full(size, mean)
+    if dist == "normal":
+        return rng.normal(mean, std, size)
+    if dist == "lognormal":
+        if mean <= 0:
+            raise ValueError("lognormal mean must be positive")
+        sig_ln = np.sqrt(np.log(1 + (std / mean)**2))
+        return rng.lognormal(np.log(mean) - 0.5 * sig_ln**2, sig_ln, size)
+    if dist == "truncated":
+        lo = (spec.get("low", -np.inf) - mean) / std
+        hi = (spec.get("high", np.inf) - mean) / std
+        return stats.truncnorm.rvs(lo, hi, loc=mean, scale=std, size=size, random_state=rng)
+    raise ValueError(f"Unknown distribution: {dist}")
+
+
+def monte_carlo_infinite_slope(case, params, n_samples=1_000_000, chunk_size=100_000, seed=None,
+                               bins=80, fs_range=(0.0, 4.0)):
+    """
+    Monte Carlo reliability of the infinite slope.
+
+    `params` maps "beta", "phi", "c", "gamma", "z" and "water_depth" to
+    distribution specs (see `sample_parameter`). Samples are drawn and
+    evaluated in chunks so memory stays bounded; only running sums, the
+    failure count and histogram counts are kept. For the cohesive case the
+    pore pressure is u = gamma_w (z - d_w) cos^2(beta).
+    """
+    rng = np.random.default_rng(seed)
+    edges = np.linspace(fs_range[0], fs_range[1], bins + 1)
+    counts = np.zeros(bins, dtype=np.int64)
+    n_fail, s1, s2, done = 0, 0.0, 0.0, 0
+
+    while done < n_samples:
+        m = min(chunk_size, n_samples - done)
+        beta = np.clip(sample_parameter(params.get("beta", 25.0), m, rng), 0.1, 89.9)
+        phi = np.clip(sample_parameter(params.get("phi", 30.0), m, rng), 0.0, 89.9)
+        c = np.clip(sample_parameter(params.get("c", 0.0), m, rng), 0.0, None)
+        gamma = np.clip(sample_parameter(params.get("gamma", 19.0), m, rng), GAMMA_W + 0.01, None)
+        z = np.clip(sample_parameter(params.get("z", 5.0), m, rng), 0.01, None)
+        d_w = np.clip(sample_parameter(params.get("water_depth", np.inf), m, rng), 0.0, z)
+        u = GAMMA_W * (z - d_w) * np.cos(np.radians(beta))**2
+
+        fs, _ = calculate_infinite_slope(beta, phi, c, gamma, gamma, z, u, case)
+
+        n_fail += int(np.count_nonzero(fs < 1.0))
+        s1 += float(fs.sum())
+        s2 += float(np.square(fs).sum())
+        counts += np.histogram(np.clip(fs, edges[0], edges[-1]), bins=edges)[0]
+        done += m
+
+    mean = s1 / n_samples
+    std = float(np.sqrt(max(s2 / n_samples - mean**2, 0.0)))
+    pf = n_fail / n_samples
+    return {
+        "pf": pf,
+        "beta": (mean - 1.0) / std if std > 0 else np.inf,
+        "beta_pf": float(-stats.norm.ppf(pf)) if 0 < pf < 1 else (np.inf if pf == 0 else -np.inf),
+        "mean": mean, "std": std, "n": n_samples,
+        "hist_counts": counts, "hist_edges": edges,
+    }
+
+
+def infinite_slope_grid(case, beta_values, y_values, y_param, phi, c, gamma, gamma_sat, z, u):
+    """
+    FS over a slope angle x `y_param` grid, shape (len(y_values), len(beta_values)).
+
+    `y_param` is "z" (failure depth; other inputs fixed) or "m" (water table
+    height above the failure plane as a fraction of z), in which case
+    u = m gamma_w z cos^2(beta) is applied through the c-phi expression
+    with gamma_sat for the seepage case.
+    """
+    B, Y = np.meshgrid(np.asarray(beta_values, dtype=float), np.asarray(y_values, dtype=float))
+    if y_param == "z":
+        fs, _ = calculate_infinite_slope(B, phi, c, gamma, gamma_sat, Y, u, case)
+    else:
+        g = gamma_sat if case == "Seepage Parallel to Slope" else gamma
+        c_eff = c if case == "Cohesive Soil (c-ϕ)" else 0.0
+        u_grid = Y * GAMMA_W * z * np.cos(np.radians(B))**2
+        fs, _ = calculate_infinite_slope(B, phi, c_eff, g, gamma_sat, z, u_grid, "Cohesive Soil (c-ϕ)")
+    return np.broadcast_to(fs, B.shape)
+
+
+# =========================================================
+# MASS PROCEDURE (UNDRAINED, phi = 0)
+# =========================================================
+def mass_procedure_fs(cu, gamma, area, d, L_arc, R, kh=0.0, kv=0.0, arm_h=0.0):
+    """
+    FS = Cu L R / (W d); NaN where the driving moment is not positive.
+
+    With seismic coefficients the driving moment is (1 - kv) W d + kh W arm_h,
+    where arm_h = yc - y_bar is the lever arm of the horizontal inertia force.
+    """
+    W = gamma * np.asarray(area, dtype=float)
+    M_drv = W * ((1 - kv) * np.asarray(d, dtype=float) + kh * np.asarray(arm_h, dtype=float))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(M_drv > 0, cu * L_arc * R / M_drv, np.nan)
+
+
+def critical_circle_search(ground_x, ground_y, gamma, cu, xc_range, yc_range, yt_range,
+                           n_x=50, n_y=50, n_r=20, n_columns=120, chunk_size=5000, kh=0.0, kv=0.0):
+    """
+    Grid search for the critical circle of the Mass Procedure.
+
+    Trial centres span `xc_range` x `yc_range`; for each centre the radii are
+    set by `n_r` tangent elevations in `yt_range` (R = yc - y_t), so every
+    trial circle bottoms out at a known depth. All circles are evaluated as
+    arrays in chunks of `chunk_size` circles to keep memory bounded.
+    """
+    xc = np.linspace(*xc_range, n_x)
+    yc = np.linspace(*yc_range, n_y)
+    yt = np.linspace(*yt_range, n_r)
+
+    YC, XC, YT = np.meshgrid(yc, xc, yt, indexing="ij")
+    RR = YC - YT
+    fs = np.full(RR.shape, np.nan)
+
+    flat_x, flat_y, flat_r, flat_fs = XC.ravel(), YC.ravel(), RR.ravel(), fs.ravel()
+    for start in range(0, flat_r.size, chunk_size):
+        sl = slice(start, start + chunk_size)
+        ok = flat_r[sl] > 0
+        props = circle_mass_properties(ground_x, ground_y, flat_x[sl], flat_y[sl],
+                                       np.where(ok, flat_r[sl], 1.0), n_columns)
+        chunk_fs = mass_procedure_fs(cu, gamma, props["area"], props["d"], props["L_arc"], flat_r[sl],
+                                     kh, kv, flat_y[sl] - props["y_bar"])
+        flat_fs[sl] = np.where(ok & props["valid"], chunk_fs, np.nan)
+
+    fs = flat_fs.reshape(RR.shape)
+    fs_map = np.min(np.where(np.isnan(fs), np.inf, fs), axis=-1)
+    fs_map[np.isinf(fs_map)] = np.nan
+    if np.all(np.isnan(fs)):
+        return {"xc": xc, "yc": yc, "radii": RR, "fs": fs, "fs_map": fs_map, "best": None}
+
+    i, j, k = np.unravel_index(np.nanargmin(fs), fs.shape)
+    best_R = RR[i, j, k]
+    props = circle_mass_properties(ground_x, ground_y, xc[j], yc[i], best_R, n_columns)
+    best = {
+        "xc": float(xc[j]), "yc": float(yc[i]), "R": float(best_R), "fs": float(fs[i, j, k]),
+        "area": float(props["area"]), "W": gamma * float(props["area"]),
+        "d": float(props["d"]), "y_bar": float(props["y_bar"]), "L_arc": float(props["L_arc"]),
+    }
+    return {"xc": xc, "yc": yc, "radii": RR, "fs": fs, "fs_map": fs_map, "best": best}
+
+
+# =========================================================
+# METHOD OF SLICES SOLVERS
+# =========================================================
+# Slice inputs are arrays along the last axis: W [kN], alpha [deg], l [m],
+# u [kPa]; c [kPa] and phi [deg] may be scalars or per-slice arrays. Leading
+# axes (e.g. one row per trial circle) are solved together. Pseudo-static
+# loads are (1 - kv) W vertically and kh W horizontally (downslope) at each
+# slice base.
+
+def _slice_terms(W, alpha, l, u, c, phi):
+    W, l, u, c = (np.asarray(v, dtype=float) for v in (W, l, u, c))
+    a = np.radians(np.asarray(alpha, dtype=float))
+    tan_phi = np.tan(np.radians(np.asarray(phi, dtype=float)))
+    return W, a, l, u, c, tan_phi
+
+
+def _fixed_point(update, fs0, tol, max_iter):
+    """Iterate FS = update(FS) until the largest change drops below `tol`."""
+    fs = np.asarray(fs0, dtype=float)
+    history = []
+    for it in range(1, max_iter + 1):
+        fs_new = update(fs)
+        with np.errstate(invalid="ignore"):
+            err = float(np.nanmax(np.abs(fs_new - fs))) if np.any(np.isfinite(fs_new)) else np.nan
+        history.append({"Iteration": it, "FS": float(np.nanmin(fs_new)), "ΔFS": err})
+        fs = fs_new
+        if err < tol:
+            return fs, True, history
+    return fs, False, history
+
+
+def ordinary_fs(W, alpha, l, u, c, phi, kh=0.0, kv=0.0):
+    """Ordinary (Fellenius) method: N' = W cos(a) - u l."""
+    W, a, l, u, c, tan_phi = _slice_terms(W, alpha, l, u, c, phi)
+    N_prime = (1 - kv) * W * np.cos(a) - kh * W * np.sin(a) - u * l
+    T_f = c * l + N_prime * tan_phi
+    T_d = (1 - kv) * W * np.sin(a) + kh * W * np.cos(a)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fs = T_f.sum(axis=-1) / T_d.sum(axis=-1)
+    return {"method": "Ordinary", "fs": fs, "converged": True, "history": [],
+            "resisting": T_f, "driving": T_d}
+
+
+def bishop_fs(W, alpha, l, u, c, phi, tol=1e-4, max_iter=100, fs0=None, kh=0.0, kv=0.0):
+    """Simplified Bishop: fixed-point iteration on FS (moment equilibrium)."""
+    W, a, l, u, c, tan_phi = _slice_terms(W, alpha, l, u, c, phi)
+    b = l * np.cos(a)
+    top = c * b + ((1 - kv) * W - u * b) * tan_phi
+    T_d = (1 - kv) * W * np.sin(a) + kh * W * np.cos(a)
+    sum_d = T_d.sum(axis=-1)
+
+    def resisting(fs):
+        m_alpha = np.cos(a) + np.sin(a) * tan_phi / fs[..., None]
+        return top / m_alpha
+
+    def update(fs):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return resisting(fs).sum(axis=-1) / sum_d
+
+    if fs0 is None:
+        fs0 = np.nan_to_num(ordinary_fs(W, alpha, l, u, c, phi, kh, kv)["fs"], nan=1.0)
+    fs, converged, history = _fixed_point(update, np.maximum(fs0, 0.1), tol, max_iter)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        T_f = resisting(fs)
+    return {"method": "Bishop", "fs": fs, "converged": converged, "history": history,
+            "resisting": T_f, "driving": T_d}
+
+
+def janbu_fs(W, alpha, l, u, c, phi, tol=1e-4, max_iter=100, f0=1.0, fs0=None, kh=0.0, kv=0.0):
+    """Janbu simplified: fixed-point iteration on FS (horizontal force equilibrium), times f0."""
+    W, a, l, u, c, tan_phi = _slice_terms(W, alpha, l, u, c, phi)
+    b = l * np.cos(a)
+    top = c * b + ((1 - kv) * W - u * b) * tan_phi
+    T_d = (1 - kv) * W * np.tan(a) + kh * W
+    sum_d = T_d.sum(axis=-1)
+
+    def resisting(fs):
+        m_alpha = np.cos(a) + np.sin(a) * tan_phi / fs[..., None]
+        return top / (np.cos(a) * m_alpha)
+
+    def update(fs):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return f0 * resisting(fs).sum(axis=-1) / sum_d
+
+    if fs0 is None:
+        fs0 = np.nan_to_num(ordinary_fs(W, alpha, l, u, c, phi, kh, kv)["fs"], nan=1.0)
+    fs, converged, history = _fixed_point(update, np.maximum(fs0, 0.1), tol, max_iter)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        T_f = resisting(fs)
+    return {"method": "Janbu", "fs": fs, "converged": converged, "history": history,
+            "resisting": T_f, "driving": T_d}
+
+
+def spencer_fs(W, alpha, l, u, c, phi, tol=1e-4, max_iter=50, fs0=None, kh=0.0, kv=0.0):
+    """
+    Spencer's method for a circular slip surface (single set of slices).
+
+    Interslice resultants Q are parallel at inclination theta; Newton
+    iteration on (FS, theta) drives both the force (sum Q = 0) and moment
+    (sum Q cos(a - theta) = 0) residuals to zero.
+    """
+    W, a, l, u, c, tan_phi = _slice_terms(W, alpha, l, u, c, phi)
+    N_prime = (1 - kv) * W * np.cos(a) - kh * W * np.sin(a) - u * l
+    T_d = (1 - kv) * W * np.sin(a) + kh * W * np.cos(a)
+    scale = W.sum()
+
+    def Q(fs, theta):
+        d = a - theta
+        return (c * l / fs + N_prime * tan_phi / fs - T_d) / (np.cos(d) * (1 + tan_phi * np.tan(d) / fs))
+
+    def residual(x):
+        q = Q(*x)
+        return np.array([q.sum(), (q * np.cos(a - x[1])).sum()]) / scale
+
+    if fs0 is None:
+        fs0 = float(bishop_fs(W, alpha, l, u, c, phi, tol=tol, kh=kh, kv=kv)["fs"])
+    x = np.array([fs0, 0.0])
+    r = residual(x)
+    history = []
+    converged = False
+    for it in range(1, max_iter + 1):
+        J = np.empty((2, 2))
+        for k, h in enumerate((1e-6 * max(abs(x[0]), 1.0), 1e-6)):
+            dx = np.zeros(2)
+            dx[k] = h
+            J[:, k] = (residual(x + dx) - r) / h
+        step = np.linalg.solve(J, -r)
+        # Damped step: keep FS positive and theta within +-60 deg
+        lam = 1.0
+        x_new, r_new = x, r
+        while lam > 1e-3:
+            x_new = x + lam * step
+            if x_new[0] > 0 and abs(x_new[1]) < np.radians(60):
+                r_new = residual(x_new)
+                if np.linalg.norm(r_new) < np.linalg.norm(r) or lam < 0.01:
+                    break
+            lam *= 0.5
+        d_fs = abs(x_new[0] - x[0])
+        x, r = x_new, r_new
+        history.append({"Iteration": it, "FS": float(x[0]), "θ (deg)": float(np.degrees(x[1])),
+                        "ΔFS": float(d_fs), "|Residual|": float(np.linalg.norm(r))})
+        if d_fs < tol and np.linalg.norm(r) < tol:
+            converged = True
+            break
+
+    fs, theta = x
+    q = Q(fs, theta)
+    return {"method": "Spencer", "fs": float(fs), "theta": float(np.degrees(theta)),
+            "converged": converged, "history": history, "Q": q}
+
+
+# =========================================================
+# SLICE DISCRETIZATION
+# =========================================================
+def _slices_from_edges(ground_x, ground_y, edges, y_base_edges, y_base_mid, base_area,
+                       gamma, water_x, water_y, gamma_w):
+    """Column weights, base chords and pore pressures for slices between `edges`."""
+    x_l, x_r = edges[..., :-1], edges[..., 1:]
+    x_mid = 0.5 * (x_l + x_r)
+    top_area = polyline_integral(ground_x, ground_y, x_r) - polyline_integral(ground_x, ground_y, x_l)
+    area = np.clip(top_area - base_area, 0.0, None)
+
+    y_l, y_r = y_base_edges[..., :-1], y_base_edges[..., 1:]
+    b = x_r - x_l
+    alpha = np.degrees(np.arctan2(y_r - y_l, b))
+    l = np.hypot(b, y_r - y_l)
+
+    y_top = np.interp(x_mid, ground_x, ground_y)
+    if water_x is not None:
+        y_w = np.interp(x_mid, water_x, water_y)
+        h_w = np.clip(y_w - y_base_mid, 0.0, None)
+        ponded = gamma_w * np.clip(y_w - y_top, 0.0, None) * b
+    else:
+        h_w = np.zeros_like(x_mid)
+        ponded = 0.0
+
+    return {
+        "x_left": x_l, "x_right": x_r, "x_mid": x_mid, "b": b,
+        "y_top": y_top, "y_base": y_base_mid,
+        "area": area, "W": gamma * area + ponded, "alpha": alpha, "l": l, "u": gamma_w * h_w,
+    }
+
+
+def circle_slices(ground_x, ground_y, xc, yc, R, n_slices=20, gamma=19.0,
+                  water_x=None, water_y=None, gamma_w=GAMMA_W):
+    """
+    Cut the mass above a trial circle into `n_slices` equal-width slices.
+
+    Slice areas are exact (ground polyline integral minus circular segment
+    integral), base angles and lengths come from the arc chords, and u is
+    taken from the water table at each base midpoint. Circles broadcast, so
+    a batch of circles gives arrays of shape (..., n_slices).
+    """
+    gx = np.asarray(ground_x, dtype=float)
+    gy = np.asarray(ground_y, dtype=float)
+    xc, yc, R = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (xc, yc, R)))
+    x_in, x_out = circle_ground_intersections(gx, gy, xc, yc, R)
+    valid = np.isfinite(x_in) & (x_out > x_in)
+
+    frac = np.linspace(0.0, 1.0, n_slices + 1)
+    x_in_ = np.where(valid, x_in, xc - 0.5 * R)[..., None]
+    x_out_ = np.where(valid, x_out, xc + 0.5 * R)[..., None]
+    edges = x_in_ + (x_out_ - x_in_) * frac
+
+    xc_, yc_, R_ = xc[..., None], yc[..., None], R[..., None]
+
+    def arc_y(x):
+        return yc_ - np.sqrt(np.clip(R_**2 - (x - xc_)**2, 0.0, None))
+
+    def arc_integral(x):
+        s = np.clip(x - xc_, -R_, R_)
+        return yc_ * x - 0.5 * (s * np.sqrt(np.clip(R_**2 - s**2, 0.0, None)) + R_**2 * np.arcsin(s / R_))
+
+    base_int = arc_integral(edges)
+    x_mid = 0.5 * (edges[..., :-1] + edges[..., 1:])
+    out = _slices_from_edges(gx, gy, edges, arc_y(edges), arc_y(x_mid), np.diff(base_int, axis=-1),
+                             gamma, water_x, water_y, gamma_w)
+
+    for key in ("area", "W", "alpha", "l", "u"):
+        out[key] = np.where(valid[..., None], out[key], np.nan)
+    out.update({"x_entry": x_in, "x_exit": x_out, "valid": valid})
+    return out
+
+
+# =========================================================
+# LAYERED SECTIONS
+# =========================================================
+# `layers` is a list of dicts ordered top-down with keys "c", "phi",
+# "gamma", "gamma_sat" and, for every layer below the first, its top
+# boundary polyline "top_x"/"top_y". The first layer is bounded above by the
+# ground surface; the last extends downwards without limit.
+
+def layer_tops(ground_x, ground_y, layers, x):
+    """Top elevation of every layer at x, shape (n_layers, *x.shape), non-crossing."""
+    x = np.asarray(x, dtype=float)
+    tops = [np.interp(x, ground_x, ground_y)]
+    for lay in layers[1:]:
+        tops.append(np.interp(x, lay["top_x"], lay["top_y"]))
+    return np.minimum.accumulate(np.stack(tops), axis=0)
+
+
+def layer_index(tops, y):
+    """
+    Index of the layer containing elevation y below each column of `tops`.
+
+    A batched `searchsorted`: every column is negated (ascending) and shifted
+    by a per-column offset so all columns form one sorted array.
+    """
+    y = np.asarray(y, dtype=float)
+    n_layers = tops.shape[0]
+    cols = -tops.reshape(n_layers, -1).T
+    span = np.ptp(cols) + np.ptp(y) + abs(cols).max() + abs(y).max() + 1.0
+    offset = span * np.arange(cols.shape[0])
+    pos = np.searchsorted((cols + offset[:, None]).ravel(), -y.ravel() + offset, side="right")
+    idx = pos - n_layers * np.arange(cols.shape[0]) - 1
+    return np.clip(idx, 0, n_layers - 1).reshape(y.shape)
+
+
+def _layered_column_weights(ground_x, ground_y, layers, xs, y_base, piezo_x, piezo_y, gamma_w):
+    """Column weight per unit width at verticals `xs` down to `y_base` (gamma / gamma_sat split by the piezometric line)."""
+    gamma = np.array([lay["gamma"] for lay in layers], dtype=float)
+    gamma_sat = np.array([lay.get("gamma_sat", lay["gamma"]) for lay in layers], dtype=float)
+    y_top = np.interp(xs, ground_x, ground_y)
+    y_pz = np.interp(xs, piezo_x, piezo_y) if piezo_x is not None else np.full(xs.shape, -np.inf)
+
+    tops = layer_tops(ground_x, ground_y, layers, xs)
+    bots = np.concatenate((tops[1:], np.full((1,) + xs.shape, -np.inf)))
+    hi = np.minimum(tops, y_top)
+    lo = np.maximum(bots, y_base)
+    thk = np.clip(hi - lo, 0.0, None)
+    thk_sat = np.clip(np.minimum(hi, y_pz) - lo, 0.0, None)
+    g = gamma.reshape((-1,) + (1,) * xs.ndim)
+    gs = gamma_sat.reshape((-1,) + (1,) * xs.ndim)
+    # Water ponded above the ground surface loads the column
+    return (g * (thk - thk_sat) + gs * thk_sat).sum(axis=0) + gamma_w * np.clip(y_pz - y_top, 0.0, None)
+
+
+def _assign_layer_strength(out, ground_x, ground_y, layers):
+    """Add the base layer index and its c, phi to a slice dict."""
+    c = np.array([lay["c"] for lay in layers], dtype=float)
+    phi = np.array([lay["phi"] for lay in layers], dtype=float)
+    idx = layer_index(layer_tops(ground_x, ground_y, layers, out["x_mid"]), out["y_base"])
+    out["layer"] = idx
+    out["c"] = c[idx]
+    out["phi"] = phi[idx]
+    return out
+
+
+def layered_circle_slices(ground_x, ground_y, layers, xc, yc, R, n_slices=30,
+                          piezo_x=None, piezo_y=None, n_sub=4, gamma_w=GAMMA_W):
+    """
+    `circle_slices` for a layered section with a piezometric line.
+
+    Column weights sum gamma (above the piezometric line) and gamma_sat
+    (below it) over the layer thicknesses at `n_sub` sample verticals per
+    slice; base c and phi come from the layer index at each base midpoint.
+    """
+    out = circle_slices(ground_x, ground_y, xc, yc, R, n_slices, 1.0, piezo_x, piezo_y, gamma_w)
+
+    # Sample verticals inside each slice
+    frac = (np.arange(n_sub) + 0.5) / n_sub
+    xs = out["x_left"][..., None] + out["b"][..., None] * frac
+    xc_, yc_, R_ = (np.asarray(v, dtype=float)[..., None, None] for v in (xc, yc, R))
+    y_base = yc_ - np.sqrt(np.clip(R_**2 - (xs - xc_)**2, 0.0, None))
+    unit_w = _layered_column_weights(ground_x, ground_y, layers, xs, y_base, piezo_x, piezo_y, gamma_w)
+
+    valid = out["valid"][..., None]
+    out["W"] = np.where(valid, unit_w.mean(axis=-1) * out["b"], np.nan)
+    return _assign_layer_strength(out, ground_x, ground_y, layers)
+
+
+def search_circle_slices(ground_x, ground_y, layers, xc_range, yc_range, yt_range,
+                         n_x=20, n_y=20, n_r=10, n_slices=30, method="Bishop",
+                         piezo_x=None, piezo_y=None, min_area=1.0, chunk_size=2000, kh=0.0, kv=0.0):
+    """
+    Grid search (centres x tangent elevations, as in `critical_circle_search`)
+    for the minimum slice-method FS on a layered section. Each chunk of
+    circles is sliced and solved as one batch.
+    """
+    solver = {"Ordinary": ordinary_fs, "Bishop": bishop_fs, "Janbu": janbu_fs}[method]
+    xc = np.linspace(*xc_range, n_x)
+    yc = np.linspace(*yc_range, n_y)
+    yt = np.linspace(*yt_range, n_r)
+    YC, XC, YT = np.meshgrid(yc, xc, yt, indexing="ij")
+    RR = YC - YT
+    flat_x, flat_y, flat_r = XC.ravel(), YC.ravel(), RR.ravel()
+    flat_fs = np.full(flat_r.size, np.nan)
+
+    for start in range(0, flat_r.size, chunk_size):
+        sl = slice(start, start + chunk_size)
+        ok = flat_r[sl] > 0
+        sl_geo = layered_circle_slices(ground_x, ground_y, layers, flat_x[sl], flat_y[sl],
+                                       np.where(ok, flat_r[sl], 1.0), n_slices, piezo_x, piezo_y)
+        admissible = (ok & sl_geo["valid"] & (sl_geo["x_entry"] > ground_x[0]) & (sl_geo["x_exit"] < ground_x[-1])
+                      & (np.nansum(sl_geo["area"], axis=-1) >= min_area))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fs = solver(sl_geo["W"], sl_geo["alpha"], sl_geo["l"], sl_geo["u"], sl_geo["c"], sl_geo["phi"],
+                        kh=kh, kv=kv)["fs"]
+            # Reject surfaces with numerically unstable slices (m_alpha < 0.2)
+            a = np.radians(sl_geo["alpha"])
+            m_alpha = np.cos(a) + np.sin(a) * np.tan(np.radians(sl_geo["phi"])) / fs[..., None]
+            stable = np.all((m_alpha >= 0.2) | np.isnan(m_alpha), axis=-1)
+        flat_fs[sl] = np.where(admissible & stable & (fs > 0), fs, np.nan)
+
+    fs = flat_fs.reshape(RR.shape)
+    fs_map = np.min(np.where(np.isnan(fs), np.inf, fs), axis=-1)
+    fs_map[np.isinf(fs_map)] = np.nan
+    best = None
+    if not np.all(np.isnan(fs)):
+        i, j, k = np.unravel_index(np.nanargmin(fs), fs.shape)
+        best = {"xc": float(xc[j]), "yc": float(yc[i]), "R": float(RR[i, j, k]), "fs": float(fs[i, j, k])}
+    return {"xc": xc, "yc": yc, "radii": RR, "fs": fs, "fs_map": fs_map, "best": best}
+
+
+# =========================================================
+# NON-CIRCULAR SURFACES
+# =========================================================
+# A trial surface is a polyline from an entry point on the ground (toe side)
+# to an exit point on the ground (crest side) with `n_vertices` equally
+# spaced vertices. Its parameter vector is [x_entry, x_exit, y_1 ... y_{n-2}]
+# (interior vertex elevations). Surfaces must be concave upward so the base
+# inclination increases toward the crest. Janbu's simplified method (force
+# equilibrium) is used, since moment-based methods need a centre of rotation.
+
+def janbu_correction(depth, length, c, phi):
+    """Janbu f0 = 1 + b1 (d/L - 1.4 (d/L)^2), b1 = 0.69 (c only), 0.31 (phi only), 0.50 (c-phi)."""
+    b1 = 0.50 if (c > 0 and phi > 0) else (0.69 if c > 0 else 0.31)
+    r = depth / length if length > 0 else 0.0
+    return 1.0 + b1 * (r - 1.4 * r**2)
+
+
+def surface_vertices(ground_x, ground_y, v):
+    """Vertex coordinates of the trial surface encoded by parameter vector `v`."""
+    v = np.asarray(v, dtype=float)
+    sx = np.linspace(v[0], v[1], v.size)
+    sy = np.concatenate(([np.interp(v[0], ground_x, ground_y)], v[2:], [np.interp(v[1], ground_x, ground_y)]))
+    return sx, sy
+
+
+def layered_surface_slices(ground_x, ground_y, layers, surf_x, surf_y, n_slices=30,
+                           piezo_x=None, piezo_y=None, n_sub=4, gamma_w=GAMMA_W):
+    """Slices above a polyline slip surface on a layered section (see `layered_circle_slices`)."""
+    sx = np.asarray(surf_x, dtype=float)
+    sy = np.asarray(surf_y, dtype=float)
+    edges = np.linspace(sx[0], sx[-1], n_slices + 1)
+    x_mid = 0.5 * (edges[:-1] + edges[1:])
+    base_area = np.diff(polyline_integral(sx, sy, edges))
+    out = _slices_from_edges(ground_x, ground_y, edges, np.interp(edges, sx, sy), np.interp(x_mid, sx, sy),
+                             base_area, 1.0, piezo_x, piezo_y, gamma_w)
+
+    frac = (np.arange(n_sub) + 0.5) / n_sub
+    xs = out["x_left"][:, None] + out["b"][:, None] * frac
+    unit_w = _layered_column_weights(ground_x, ground_y, layers, xs, np.interp(xs, sx, sy), piezo_x, piezo_y, gamma_w)
+    out["W"] = unit_w.mean(axis=-1) * out["b"]
+    return _assign_layer_strength(out, ground_x, ground_y, layers)
+
+
+def noncircular_fs(v, ground_x, ground_y, layers, n_slices=30, piezo_x=None, piezo_y=None,
+                   min_area=1.0, kh=0.0, kv=0.0, f0_correction=False):
+    """Janbu FS of the surface encoded by `v`; inf for inadmissible surfaces."""
+    sx, sy = surface_vertices(ground_x, ground_y, v)
+    if not (ground_x[0] < sx[0] < sx[-1] < ground_x[-1]):
+        return np.inf
+    g_v = np.interp(sx, ground_x, ground_y)
+    slopes = np.diff(sy) / np.diff(sx)
+    if np.any(sy[1:-1] >= g_v[1:-1]) or np.any(np.diff(slopes) < -1e-9):
+        return np.inf
+
+    sl = layered_surface_slices(ground_x, ground_y, layers, sx, sy, n_slices, piezo_x, piezo_y)
+    if sl["area"].sum() < min_area:
+        return np.inf
+    f0 = 1.0
+    if f0_correction:
+        depth = float(np.max(sl["y_top"] - sl["y_base"]))
+        f0 = janbu_correction(depth, float(np.hypot(sx[-1] - sx[0], sy[-1] - sy[0])),
+                              float(np.mean(sl["c"])), float(np.mean(sl["phi"])))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fs = float(janbu_fs(sl["W"], sl["alpha"], sl["l"], sl["u"], sl["c"], sl["phi"], f0=f0, kh=kh, kv=kv)["fs"])
+        a = np.radians(sl["alpha"])
+        m_alpha = np.cos(a) + np.sin(a) * np.tan(np.radians(sl["phi"])) / fs
+    if not np.isfinite(fs) or fs <= 0 or np.any(m_alpha < 0.2):
+        return np.inf
+    return fs
+
+
+# Shared state of the search workers (set by `_init_search_worker`)
+_search_best = None
+_search_best_x = None
+_search_stop = None
+
+
+def _init_search_worker(best, best_x, stop):
+    global _search_best, _search_best_x, _search_stop
+    _search_best, _search_best_x, _search_stop = best, best_x, stop
+
+
+def _publish_best(fs, v):
+    """Record a new global best (FS and surface) if `fs` beats it."""
+    with _search_best.get_lock():
+        if fs < _search_best.value:
+            _search_best.value = fs
+            _search_best_x[:] = list(v)
+
+
+def _noncircular_restart(task):
+    """
+    One independent restart: random convex start, simulated-annealing random
+    walk, then Nelder-Mead polish. Polishing is skipped when the walk ends far
+    above the shared best, and every stage returns as soon as the stop flag is set.
+    """
+    from scipy import optimize
+
+    (restart, seed, ground_x, ground_y, layers, entry_range, exit_range, n_vertices,
+     n_iter, fs_kwargs, prune) = task
+    rng = np.random.default_rng(seed)
+    ground_x = np.asarray(ground_x, dtype=float)
+    ground_y = np.asarray(ground_y, dtype=float)
+    n_eval = 0
+
+    def f(v):
+        nonlocal n_eval
+        n_eval += 1
+        return noncircular_fs(v, ground_x, ground_y, layers, **fs_kwargs)
+
+    # Random start: circular-arc-shaped sag below the entry-exit chord (always convex)
+    v, fs = None, np.inf
+    for _ in range(200):
+        x_in, x_out = rng.uniform(*entry_range), rng.uniform(*exit_range)
+        if x_out <= x_in:
+            continue
+        y_in, y_out = np.interp([x_in, x_out], ground_x, ground_y)
+        t = np.linspace(0.0, 1.0, n_vertices)
+        sag = rng.uniform(0.05, 0.5) * (x_out - x_in)
+        chord = y_in + (y_out - y_in) * t
+        cand = np.concatenate(([x_in, x_out], (chord - sag * np.sin(np.pi * t))[1:-1]))
+        fs = f(cand)
+        if np.isfinite(fs):
+            v = cand
+            break
+    if v is None:
+        return {"Restart": restart, "FS": np.nan, "Evaluations": n_eval, "Stopped Early": False, "x": None}
+
+    span = np.array([exit_range[1] - entry_range[0]] * 2 + [np.ptp(ground_y) + 1.0] * (n_vertices - 2))
+    best_v, best_fs = v.copy(), fs
+    T0, T1 = 0.1 * fs, 1e-4 * fs
+    stopped = False
+    for it in range(n_iter):
+        if it % 20 == 0 and _search_stop.value:
+            stopped = True
+            break
+        frac = it / max(n_iter - 1, 1)
+        T = T0 * (T1 / T0) ** frac
+        step = span * 0.05 * (1.0 - 0.9 * frac)
+        cand = v + rng.normal(0.0, 1.0, v.size) * step
+        fs_c = f(cand)
+        if fs_c < fs or (np.isfinite(fs_c) and rng.random() < np.exp(-(fs_c - fs) / T)):
+            v, fs = cand, fs_c
+            if fs < best_fs:
+                best_v, best_fs = v.copy(), fs
+    _publish_best(best_fs, best_v)
+
+    if not stopped and best_fs <= _search_best.value * (1.0 + prune):
+        res = optimize.minimize(f, best_v, method="Nelder-Mead",
+                                options={"xatol": 1e-3, "fatol": 1e-5, "maxiter": 100 * v.size})
+        if res.fun < best_fs:
+            best_v, best_fs = res.x, float(res.fun)
+            _publish_best(best_fs, best_v)
+    return {"Restart": restart, "FS": best_fs, "Evaluations": n_eval, "Stopped Early": stopped, "x": best_v}
+
+
+def noncircular_search(ground_x, ground_y, layers, entry_range, exit_range, n_vertices=6,
+                       n_restarts=16, n_iter=400, max_workers=None, n_slices=30,
+                       piezo_x=None, piezo_y=None, min_area=1.0, kh=0.0, kv=0.0,
+                       f0_correction=False, seed=None, tol=1e-3, patience=4, prune=0.25):
+    """
+    Critical non-circular surface from independent restarts on a process pool.
+
+    Restarts run in parallel on a `ProcessPoolExecutor` and share the best FS
+    found so far (and its surface) through shared memory. The search stops
+    early once `patience` consecutive finished restarts fail to lower the best
+    FS by more than `tol`: the stop flag ends running restarts and pending ones
+    are cancelled. With `max_workers=1` the restarts run in this process.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    ctx = process_pool_context()
+    best = ctx.Value("d", np.inf)
+    best_x = ctx.Array("d", n_vertices)
+    stop = ctx.Value("b", 0)
+
+    fs_kwargs = {"n_slices": n_slices, "piezo_x": piezo_x, "piezo_y": piezo_y, "min_area": min_area,
+                 "kh": kh, "kv": kv, "f0_correction": f0_correction}
+    seeds = np.random.SeedSequence(seed).generate_state(n_restarts)
+    tasks = [(k + 1, int(seeds[k]), list(map(float, ground_x)), list(map(float, ground_y)), layers,
+              tuple(entry_range), tuple(exit_range), n_vertices, n_iter, fs_kwargs, prune)
+             for k in range(n_restarts)]
+
+    runs, stale, best_seen = [], 0, np.inf
+
+    def record(run):
+        nonlocal stale, best_seen
+        runs.append(run)
+        if np.isfinite(run["FS"]) and run["FS"] < best_seen - tol:
+            best_seen, stale = run["FS"], 0
+        else:
+            stale += 1
+        return stale >= patience
+
+    if max_workers == 1:
+        _init_search_worker(best, best_x, stop)
+        for task in tasks:
+            if record(_noncircular_restart(task)):
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx,
+                                 initializer=_init_search_worker, initargs=(best, best_x, stop)) as pool:
+            futures = [pool.submit(_noncircular_restart, task) for task in tasks]
+            for fut in as_completed(futures):
+                if fut.cancelled():  # pending restarts cancelled by an early stop
+                    continue
+                if record(fut.result()):
+                    stop.value = 1
+                    for other in futures:
+                        other.cancel()
+
+    runs.sort(key=lambda r: r["Restart"])
+    history = [{k: r[k] for k in ("Restart", "FS", "Evaluations", "Stopped Early")} for r in runs]
+    if not np.isfinite(best.value):
+        return {"best": None, "history": history, "n_completed": len(runs), "converged": bool(stop.value)}
+    v = np.array(best_x[:])
+    sx, sy = surface_vertices(ground_x, ground_y, v)
+    return {"best": {"fs": float(best.value), "surf_x": sx, "surf_y": sy, "params": v},
+            "history": history, "n_completed": len(runs), "converged": bool(stop.value) or stale >= patience}
+
+
+# =========================================================
+# BLOCK & WEDGE (COMPOUND) MECHANISMS
+# =========================================================
+# A rigid block slides toward -x on a horizontal weak layer at elevation y_w
+# between x_p (passive end) and x_p + L (active end). The active wedge rises
+# to the right of the block on a plane at theta_a, the passive wedge to the
+# left at theta_p; interwedge thrusts are horizontal. Pseudo-static inertia
+# kh W acts toward -x and kv W upward on every wedge and the block.
+
+def _extend_ground(ground_x, ground_y, reach=1e4):
+    """Continue the end segments of the ground horizontally so wedge planes always surface."""
+    gx = np.asarray(ground_x, dtype=float)
+    gy = np.asarray(ground_y, dtype=float)
+    return (np.concatenate(([gx[0] - reach], gx, [gx[-1] + reach])),
+            np.concatenate(([gy[0]], gy, [gy[-1]])))
+
+
+def ray_ground_intersection(ground_x, ground_y, x0, y0, theta, direction):
+    """x where the plane rising from (x0, y0) at `theta` deg toward `direction` (+1/-1) first meets the ground."""
+    gx, gy = _extend_ground(ground_x, ground_y)
+    x0, y0, theta = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (x0, y0, theta)))
+    slope = direction * np.tan(np.radians(theta))[..., None]
+    sx, sy = gx[:-1], gy[:-1]
+    dx, dy = np.diff(gx), np.diff(gy)
+
+    # gy0 + t dy - y0 = slope (gx0 + t dx - x0), t in [0, 1]
+    denom = dy - slope * dx
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = (slope * (sx - x0[..., None]) - (sy - y0[..., None])) / denom
+    t = np.where((t >= 0) & (t <= 1), t, np.nan)
+    run = direction * (sx + t * dx - x0[..., None])
+    run = np.where(run > 1e-9, run, np.inf)
+    first = np.min(run, axis=-1)
+    return np.where(np.isfinite(first), x0 + direction * first, np.nan)
+
+
+def wedge_thrust(ground_x, ground_y, x0, y0, theta, c, phi, gamma, side, kh=0.0, kv=0.0):
+    """
+    Horizontal thrust of an active or passive wedge on the block face at x0.
+
+    The wedge base rises from the weak-layer point (x0, y0) at `theta` degrees,
+    away from the block. Active: P = N(sin t - tan phi cos t) - cL cos t + kh W
+    with N = ((1-kv)W - cL sin t) / (cos t + tan phi sin t). Passive: P =
+    N(sin t + tan phi cos t) + cL cos t - kh W with N = ((1-kv)W + cL sin t) /
+    (cos t - tan phi sin t).
+    """
+    direction = 1 if side == "active" else -1
+    gx, gy = _extend_ground(ground_x, ground_y)
+    x0, y0, theta = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (x0, y0, theta)))
+    x_top = ray_ground_intersection(ground_x, ground_y, x0, y0, theta, direction)
+    t = np.radians(theta)
+    tan_p = np.tan(np.radians(phi))
+
+    run = np.abs(x_top - x0)
+    area = np.abs(polyline_integral(gx, gy, x_top) - polyline_integral(gx, gy, x0)) \
+        - (run * y0 + 0.5 * run**2 * np.tan(t))
+    W = gamma * np.clip(area, 0.0, None)
+    L = run / np.cos(t)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if side == "active":
+            N = ((1 - kv) * W - c * L * np.sin(t)) / (np.cos(t) + tan_p * np.sin(t))
+            P = np.clip(N * (np.sin(t) - tan_p * np.cos(t)) - c * L * np.cos(t) + kh * W, 0.0, None)
+        else:
+            denom = np.cos(t) - tan_p * np.sin(t)
+            N = ((1 - kv) * W + c * L * np.sin(t)) / denom
+            P = np.where(denom > 0, np.clip(N * (np.sin(t) + tan_p * np.cos(t)) + c * L * np.cos(t) - kh * W,
+                                            0.0, None), np.inf)
+    return {"P": P, "W": W, "L": L, "x_top": x_top}
+
+
+def block_fs(ground_x, ground_y, y_w, x_p, L, theta_p, theta_a, c, phi, gamma, c_b, phi_b, kh=0.0, kv=0.0):
+    """FS = (Pp + c_b L + (1-kv) W_block tan phi_b) / (Pa + kh W_block); NaN where inadmissible."""
+    gx, gy = _extend_ground(ground_x, ground_y)
+    y_w, x_p, L = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (y_w, x_p, L)))
+    x_a = x_p + L
+    h_p = np.interp(x_p, gx, gy) - y_w
+    h_a = np.interp(x_a, gx, gy) - y_w
+    W_b = gamma * (polyline_integral(gx, gy, x_a) - polyline_integral(gx, gy, x_p) - L * y_w)
+
+    act = wedge_thrust(ground_x, ground_y, x_a, y_w, theta_a, c, phi, gamma, "active", kh, kv)
+    pas = wedge_thrust(ground_x, ground_y, x_p, y_w, theta_p, c, phi, gamma, "passive", kh, kv)
+    resisting = pas["P"] + c_b * L + (1 - kv) * W_b * np.tan(np.radians(phi_b))
+    driving = act["P"] + kh * W_b
+    ok = (h_p > 0) & (h_a > 0) & (L > 0) & (driving > 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fs = np.where(ok, resisting / driving, np.nan)
+    return {"fs": fs, "Pa": act["P"], "Pp": pas["P"], "W_block": W_b, "W_active": act["W"],
+            "W_passive": pas["W"], "x_active": act["x_top"], "x_passive": pas["x_top"],
+            "resisting": resisting, "driving": driving}
+
+
+def block_search(ground_x, ground_y, c, phi, gamma, c_b, phi_b, yw_range, xp_range, L_range,
+                 n_y=15, n_x=30, n_L=30, n_theta=30, refine=True, kh=0.0, kv=0.0):
+    """
+    Minimum-FS block mechanism over weak-layer elevation, passive end and block length.
+
+    Pa and Pp depend on their own wedge angle only, so the grid stage takes the
+    worst wedge of each side independently (max Pa, min Pp over `n_theta`
+    angles) as arrays. The best grid point is then refined over all five
+    variables with a bounded Nelder-Mead search.
+    """
+    from scipy import optimize
+
+    yw = np.linspace(*yw_range, n_y)
+    xp = np.linspace(*xp_range, n_x)
+    Ls = np.linspace(*L_range, n_L)
+    th_a = np.linspace(5.0, 85.0, n_theta)
+    th_p = np.linspace(5.0, max(5.0, min(85.0, 89.0 - phi)), n_theta)
+
+    YW, XP, LL = np.meshgrid(yw, xp, Ls, indexing="ij")
+    act = wedge_thrust(ground_x, ground_y, (XP + LL)[..., None], YW[..., None], th_a, c, phi, gamma, "active", kh, kv)
+    pas = wedge_thrust(ground_x, ground_y, XP[..., None], YW[..., None], th_p, c, phi, gamma, "passive", kh, kv)
+    ia = np.argmax(act["P"], axis=-1)
+    ip = np.argmin(pas["P"], axis=-1)
+
+    fs = block_fs(ground_x, ground_y, YW, XP, LL, th_p[ip], th_a[ia], c, phi, gamma, c_b, phi_b, kh, kv)["fs"]
+    fs_map = np.min(np.where(np.isnan(fs), np.inf, fs), axis=-1)
+    fs_map[np.isinf(fs_map)] = np.nan
+    if np.all(np.isnan(fs)):
+        return {"yw": yw, "xp": xp, "L": Ls, "fs": fs, "fs_map": fs_map, "best": None}
+
+    i, j, k = np.unravel_index(np.nanargmin(fs), fs.shape)
+    x_best = np.array([yw[i], xp[j], Ls[k], th_p[ip[i, j, k]], th_a[ia[i, j, k]]])
+    fs_grid = float(fs[i, j, k])
+
+    if refine:
+        bounds = [tuple(yw_range), tuple(xp_range), tuple(L_range), (th_p[0], th_p[-1]), (th_a[0], th_a[-1])]
+
+        def objective(v):
+            val = block_fs(ground_x, ground_y, *v, c, phi, gamma, c_b, phi_b, kh, kv)["fs"]
+            return float(val) if np.isfinite(val) else 1e6
+
+        res = optimize.minimize(objective, x_best, method="Nelder-Mead", bounds=bounds,
+                                options={"xatol": 1e-3, "fatol": 1e-5, "maxiter": 2000})
+        if res.fun < fs_grid:
+            x_best = res.x
+
+    props = block_fs(ground_x, ground_y, *x_best, c, phi, gamma, c_b, phi_b, kh, kv)
+    best = {"y_w": float(x_best[0]), "x_p": float(x_best[1]), "L": float(x_best[2]),
+            "theta_p": float(x_best[3]), "theta_a": float(x_best[4]), "fs_grid": fs_grid}
+    best.update({k: float(v) for k, v in props.items()})
+    return {"yw": yw, "xp": xp, "L": Ls, "fs": fs, "fs_map": fs_map, "best": best}
+
+
+# =========================================================
+# SEISMIC: YIELD ACCELERATION & NEWMARK SLIDING BLOCK
+# =========================================================
+def yield_acceleration(fs_of_kh, kh_max=1.0, tol=1e-4, max_iter=60):
+    """
+    Yield coefficient ky (FS = 1) for many sections at once by bisection.
+
+    `fs_of_kh(kh)` takes an array of kh (one per section) and returns the
+    matching FS array; FS must decrease with kh. Sections already failing
+    statically get ky = 0; sections with FS > 1 at `kh_max` get NaN.
+    """
+    fs_0 = np.asarray(fs_of_kh(0.0), dtype=float)
+    fs_max = np.asarray(fs_of_kh(np.full(fs_0.shape, kh_max)), dtype=float)
+    lo = np.zeros_like(fs_0)
+    hi = np.full_like(fs_0, kh_max)
+    for _ in range(max_iter):
+        mid = 0.5 * (lo + hi)
+        stable = np.asarray(fs_of_kh(mid), dtype=float) > 1.0
+        lo = np.where(stable, mid, lo)
+        hi = np.where(stable, hi, mid)
+        if np.max(hi - lo) < tol:
+            break
+    ky = 0.5 * (lo + hi)
+    ky = np.where(fs_0 <= 1.0, 0.0, ky)
+    return np.where(fs_max > 1.0, np.nan, ky)
+
+
+def newmark_displacement(acc, dt, ky, g=9.81):
+    """
+    Rigid-block (Newmark) downslope displacement for yield coefficient(s) ky.
+
+    `acc` is the ground acceleration history in g (positive downslope). The
+    sliding velocity obeys v_n = max(0, v_{n-1} + (a_n - ky) g dt); with
+    S = cumsum((a - ky) g dt) this is v = S - min(0, running min of S), so
+    both integrations are array operations. `ky` may be an array, giving one
+    history per row.
+    """
+    acc = np.asarray(acc, dtype=float)
+    ky = np.asarray(ky, dtype=float)[..., None]
+    S = np.cumsum((acc - ky) * g * dt, axis=-1)
+    v = S - np.minimum(np.minimum.accumulate(S, axis=-1), 0.0)
+    d = np.concatenate((np.zeros(v.shape[:-1] + (1,)), np.cumsum(0.5 * (v[..., 1:] + v[..., :-1]) * dt, axis=-1)),
+                       axis=-1)
+    return {"time": np.arange(acc.shape[-1]) * dt, "velocity": v, "displacement": d,
+            "total": d[..., -1], "sliding_time": np.count_nonzero(v > 0, axis=-1) * dt}
+
+
+def load_time_history(source, dt=None):
+    """
+    Read an acceleration record (in g) from a path or file-like object.
+
+    Accepts PEER .AT2 files (dt from the NPTS/DT header line), two-column
+    time/acceleration text, or a single column with `dt` given. Returns
+    (acc, dt).
+    """
+    import re
+
+    if hasattr(source, "read"):
+        text = source.read()
+        text = text.decode("utf-8", errors="ignore") if isinstance(text, bytes) else text
+    else:
+        with open(source, encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+
+    header = re.search(r"NPTS\s*=\s*(\d+)\s*,?\s*DT\s*=\s*([0-9.eE+-]+)", text, re.IGNORECASE)
+    if header:
+        body = text[header.end():].split("\n", 1)[-1]
+        acc = np.array(body.split(), dtype=float)[:int(header.group(1))]
+        return acc, float(header.group(2))
+
+    rows = []
+    for line in text.splitlines():
+        parts = line.replace(",", " ").split()
+        try:
+            rows.append([float(v) for v in parts])
+        except ValueError:
+            continue  # header or comment line
+    rows = [r for r in rows if r]
+    if not rows:
+        raise ValueError("No numeric data found in the time history file.")
+    n_cols = len(rows[0])
+    data = np.array([r for r in rows if len(r) == n_cols], dtype=float)
+    if n_cols >= 2:
+        return data[:, 1], float(np.median(np.diff(data[:, 0])))
+    if dt is None:
+        raise ValueError("Single-column records need the time step dt.")
+    return data[:, 0], float(dt)
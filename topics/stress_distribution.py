@@ -0,0 +1,157 @@
+import numpy as np
+from functools import lru_cache
+
+# =========================================================
+# STRESS DISTRIBUTION ENGINE (no Streamlit imports)
+# =========================================================
+# Vertical stress increments below flexible surface loads on an elastic
+# half-space. Every load is a dict with "type" and the pressure "q" [kPa]:
+#   Rectangle   : "B" (along x), "L" (along y), centre "x", "y"
+#   Circle      : "B" (diameter), centre "x", "y"
+#   Strip       : "B" (width, along x), centre "x"  (plane strain)
+#   Embankment  : "B" (crest width), "a" (horizontal length of each side
+#                 slope), centre "x"; "q" is the crest pressure gamma*H
+# Depths z [m] are below the loaded surface; (x, y) is the point of interest.
+
+LOAD_TYPES = ["Rectangle", "Circle", "Strip", "Embankment"]
+METHODS = ["Boussinesq", "2:1"]
+Z_MIN = 1e-6  # stresses at z = 0 are evaluated just below the surface
+
+
+# =========================================================
+# BOUSSINESQ: CLOSED FORMS
+# =========================================================
+def rectangle_corner_factor(m, n):
+    """Newmark influence factor below the corner of a B x L rectangle, m = B/z, n = L/z."""
+    m, n = np.asarray(m, dtype=float), np.asarray(n, dtype=float)
+    s = m**2 + n**2 + 1.0
+    mn = m * n
+    # arctan2 keeps the angle in (0, pi) when m^2 + n^2 + 1 < m^2 n^2
+    return (2 * mn * np.sqrt(s) / (s + mn**2) * (s + 1) / s
+            + np.arctan2(2 * mn * np.sqrt(s), s - mn**2)) / (4 * np.pi)
+
+
+def _rectangle(z, dx, dy, B, L):
+    """Rectangle centred (dx, dy) from the point, by superposing four signed corner rectangles."""
+    I = np.zeros_like(z)
+    for ex, sx in ((dx + B / 2, 1.0), (dx - B / 2, -1.0)):
+        for ey, sy in ((dy + L / 2, 1.0), (dy - L / 2, -1.0)):
+            I += sx * sy * np.sign(ex) * np.sign(ey) * rectangle_corner_factor(abs(ex) / z, abs(ey) / z)
+    return I
+
+
+def _circle(z, dx, dy, D, n_theta=720):
+    """
+    Circle of diameter D centred (dx, dy) from the point. Each ray from the
+    point integrates the point-load solution in closed form between its entry
+    and exit distances rho: 1 - z^3 / (z^2 + rho^2)^1.5; the rays are summed
+    with the (periodic, spectrally accurate) trapezoid rule.
+    """
+    R, d = D / 2.0, np.hypot(dx, dy)
+    if d < 1e-12:
+        return 1.0 - (1.0 + (R / z) ** 2) ** -1.5
+    theta = np.linspace(0.0, 2 * np.pi, n_theta, endpoint=False)
+    proj = d * np.cos(theta)  # ray direction measured from the centre direction
+    disc = R**2 - (d * np.sin(theta)) ** 2
+    root = np.sqrt(np.maximum(disc, 0.0))
+    hit = disc > 0
+    rho_in = np.where(hit, np.maximum(proj - root, 0.0), 0.0)
+    rho_out = np.where(hit, np.maximum(proj + root, 0.0), 0.0)
+
+    def G(rho):
+        return (z[None, :] ** 3) / (z[None, :] ** 2 + rho[:, None] ** 2) ** 1.5
+
+    return (G(rho_in) - G(rho_out)).mean(axis=0)
+
+
+def _linear_strip(z, x, s1, s2, p1, p2):
+    """
+    Plane-strain strip from s1 to s2 with pressure varying linearly from p1 to
+    p2, at horizontal position x: the line-load solution 2 p z^3 / pi r^4
+    integrated exactly over the strip.
+    """
+    u1, u2 = s1 - x, s2 - x
+    k = (p2 - p1) / (s2 - s1)
+    p_x = p1 + k * (x - s1)  # pressure line extended to the point
+
+    def A(u):
+        return z * u / (2 * (u**2 + z**2)) + 0.5 * np.arctan(u / z)
+
+    def Bf(u):
+        return -(z**3) / (2 * (u**2 + z**2))
+
+    return 2.0 / np.pi * (p_x * (A(u2) - A(u1)) + k * (Bf(u2) - Bf(u1)))
+
+
+def _embankment(z, dx, B, a):
+    """Symmetric embankment (crest width B, side slopes a) as three linear strips; unit crest pressure."""
+    x = -dx
+    I = _linear_strip(z, x, -B / 2, B / 2, 1.0, 1.0) if B > 0 else np.zeros_like(z)
+    if a > 0:
+        I = I + _linear_strip(z, x, -B / 2 - a, -B / 2, 0.0, 1.0) + _linear_strip(z, x, B / 2, B / 2 + a, 1.0, 0.0)
+    return I
+
+
+# =========================================================
+# 2:1 APPROXIMATION
+# =========================================================
+def _spread(z, dx, dy, kind, B, L, a):
+    """Load spread at 2V:1H; zero outside the spread footprint."""
+    if kind == "Rectangle":
+        inside = (abs(dx) <= (B + z) / 2) & (abs(dy) <= (L + z) / 2)
+        return np.where(inside, B * L / ((B + z) * (L + z)), 0.0)
+    if kind == "Circle":
+        inside = np.hypot(dx, dy) <= (B + z) / 2
+        return np.where(inside, B**2 / (B + z) ** 2, 0.0)
+    width = B + a  # embankment: total load (B + a) per unit crest pressure over base width B + 2a
+    base = B + 2 * a if kind == "Embankment" else B
+    inside = abs(dx) <= (base + z) / 2
+    return np.where(inside, (width if kind == "Embankment" else B) / (base + z), 0.0)
+
+
+# =========================================================
+# CACHED INFLUENCE FACTORS & SUPERPOSITION
+# =========================================================
+@lru_cache(maxsize=256)
+def influence_factors(kind, B, L, a, dx, dy, method, z_key):
+    """
+    Unit-pressure influence factors I(z) for one load geometry relative to the
+    point of interest. Cached on the geometry and the depth grid (as a tuple),
+    so changing only the load intensity, or re-running with the same layout,
+    costs a lookup. The returned array is read-only.
+    """
+    z = np.maximum(np.asarray(z_key, dtype=float), Z_MIN)
+    if method == "2:1":
+        I = _spread(z, dx, dy, kind, B, L, a)
+    elif kind == "Rectangle":
+        I = _rectangle(z, dx, dy, B, L)
+    elif kind == "Circle":
+        I = _circle(z, dx, dy, B)
+    elif kind == "Strip":
+        I = _linear_strip(z, -dx, -B / 2, B / 2, 1.0, 1.0)
+    elif kind == "Embankment":
+        I = _embankment(z, dx, B, a)
+    else:
+        raise ValueError(f"Unknown load type: {kind}")
+    I = np.clip(np.asarray(I, dtype=float), 0.0, 1.0)
+    I.setflags(write=False)
+    return I
+
+
+def stress_increment(loads, z, x=0.0, y=0.0, method="Boussinesq"):
+    """
+    Vertical stress increment [kPa] at depths `z` below (x, y), superposing
+    all `loads`. Returns an array shaped like `z`.
+    """
+    z = np.asarray(z, dtype=float)
+    z_key = tuple(np.ravel(z).tolist())
+    total = np.zeros(z.size)
+    for ld in loads:
+        q = float(ld.get("q", 0.0))
+        if q == 0.0:
+            continue
+        I = influence_factors(ld["type"], float(ld.get("B", 0.0)), float(ld.get("L", ld.get("B", 0.0))),
+                              float(ld.get("a", 0.0)), float(ld.get("x", 0.0)) - x, float(ld.get("y", 0.0)) - y,
+                              method, z_key)
+        total += q * I
+    return total.reshape(z.shape)
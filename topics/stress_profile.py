@@ -0,0 +1,460 @@
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# STRESS PROFILE ENGINE (no Streamlit imports)
+# =========================================================
+# `layers` follows the effective-stress page: top-down dicts with "id",
+# "type", "top", "bot", "g_sat" and "g_dry". The water table is at
+# `water_depth`, the capillary zone reaches `hc` above it, and an artesian
+# layer (1-based id, 0 = none) carries `artesian_head` extra head.
+
+MODES = ("Initial", "Long Term", "Short Term")
+ZONE_DRY, ZONE_CAPILLARY, ZONE_TRANSITION, ZONE_ARTESIAN, ZONE_HYDROSTATIC = range(5)
+
+
+# =========================================================
+# DEPTH POINTS
+# =========================================================
+def profile_points(layers, water_depth, hc, resolution=0.0):
+    """
+    Output depths for every layer: its top and bottom, whole metres, the water
+    table, the top of the capillary zone and (if `resolution` > 0) a regular
+    grid. Interface depths appear once for each adjacent layer. Returns the
+    depths and the layer index of every point, sorted by layer then depth.
+    """
+    tops = np.array([lay["top"] for lay in layers], dtype=float)
+    bots = np.array([lay["bot"] for lay in layers], dtype=float)
+    total = bots[-1]
+    cand = [tops, bots, np.arange(np.ceil(total) + 1.0), [water_depth, water_depth - hc]]
+    if resolution > 0:
+        cand.append(np.arange(0.0, total, resolution))
+    # Candidates that differ only by float noise (e.g. 3.3 - 1.3 vs 2.0) are
+    # merged, keeping the first one listed so layer boundaries stay exact
+    c = np.concatenate(cand)
+    c = c[np.unique(np.round(c, 9), return_index=True)[1]]
+    c = c[(c >= 0) & (c <= total)]
+
+    # A point belongs to every layer whose closed interval contains it
+    inside = (c[None, :] >= tops[:, None] - 1e-9) & (c[None, :] <= bots[:, None] + 1e-9)
+    layer_idx, k = np.nonzero(inside)
+    return c[k], layer_idx
+
+
+# =========================================================
+# PROFILES
+# =========================================================
+def effective_stress_profiles(layers, water_depth, hc, surcharge, artesian_layer_id=0, artesian_head=0.0,
+                              gamma_w=9.81, resolution=0.0):
+    """
+    Total stress, pore pressure and effective stress for the Initial (q = 0),
+    Long Term (q drained) and Short Term (q carried as excess pore pressure in
+    clay) states in one pass; stress arrays have shape (3, n_points).
+
+    Total stress comes from a cumulative sum over gamma segments (layer
+    boundaries plus the top of the capillary zone, with gamma_sat below it and
+    gamma_dry above). Pore pressure is assigned by zone masks
+    (`_pore_pressure`).
+    """
+    z, li = profile_points(layers, water_depth, hc, resolution)
+    tops = np.array([lay["top"] for lay in layers], dtype=float)
+    bots = np.array([lay["bot"] for lay in layers], dtype=float)
+    g_sat = np.array([lay["g_sat"] for lay in layers], dtype=float)
+    g_dry = np.array([lay["g_dry"] for lay in layers], dtype=float)
+    is_clay = np.array([lay["type"] == "Clay" for lay in layers])
+    eff_wt = water_depth - hc
+
+    # Piecewise-constant gamma between breakpoints -> prefix sum of gamma dz
+    brk = np.unique(np.concatenate([tops, bots, [eff_wt] if tops[0] < eff_wt < bots[-1] else []]))
+    seg_mid = 0.5 * (brk[:-1] + brk[1:])
+    seg_layer = np.clip(np.searchsorted(bots, seg_mid), 0, len(layers) - 1)
+    seg_gamma = np.where(seg_mid > eff_wt, g_sat[seg_layer], g_dry[seg_layer])
+    sigma_brk = np.concatenate([[0.0], np.cumsum(seg_gamma * np.diff(brk))])
+    seg = np.clip(np.searchsorted(brk, z, side="right") - 1, 0, seg_gamma.size - 1)
+    sigma0 = sigma_brk[seg] + seg_gamma[seg] * (z - brk[seg])
+
+    zone, u_h, u_top, u_bot = _pore_pressure(z, li, layers, water_depth, hc, artesian_layer_id, artesian_head,
+                                             gamma_w)
+    z_top, z_bot = tops[li], bots[li]
+
+    # The three states as one (3, n) broadcast
+    q = np.array([0.0, surcharge, surcharge])[:, None]
+    excess = np.zeros((3, z.size))
+    if surcharge > 0:
+        excess[2] = np.where(is_clay[li], surcharge, 0.0)
+    sigma = sigma0[None, :] + q
+    u = u_h[None, :] + excess
+    tag = np.where(np.abs(z - z_top) < 1e-3, " (Top)", np.where(np.abs(z - z_bot) < 1e-3, " (Bottom)", ""))
+
+    return {"z": z, "layer": li, "tag": tag, "zone": zone, "u_top": u_top, "u_bot": u_bot,
+            "sigma": sigma, "u": u, "sig_eff": sigma - u, "excess": excess, "modes": MODES,
+            "layers": layers, "water_depth": water_depth, "hc": hc, "surcharge": surcharge,
+            "artesian_layer_id": artesian_layer_id, "artesian_head": artesian_head, "gamma_w": gamma_w}
+
+
+def _pore_pressure(z, li, layers, water_depth, hc, artesian_layer_id, artesian_head, gamma_w):
+    """
+    Pore pressure (without excess) at depths z in layers li, assigned by zone
+    masks in priority order: capillary, artesian transition (the layer just
+    above the artesian layer, linear between hydrostatic at its top and
+    artesian at its base), artesian, hydrostatic, dry.
+    Returns (zone, u, u_top, u_bot).
+    """
+    tops = np.array([lay["top"] for lay in layers], dtype=float)
+    bots = np.array([lay["bot"] for lay in layers], dtype=float)
+    lid = np.array([lay["id"] for lay in layers])[li]
+    capillary = (z < water_depth) & (z >= water_depth - hc)
+    below = z >= water_depth
+    transition = (artesian_layer_id > 1) & (lid == artesian_layer_id - 1) & below
+    artesian = (artesian_layer_id > 0) & (lid >= artesian_layer_id) & below
+    zone = np.select([capillary, transition, artesian, below],
+                     [ZONE_CAPILLARY, ZONE_TRANSITION, ZONE_ARTESIAN, ZONE_HYDROSTATIC], ZONE_DRY)
+
+    z_top, z_bot = tops[li], bots[li]
+    u_top = np.maximum(0.0, (z_top - water_depth) * gamma_w)
+    u_bot = (z_bot - water_depth + artesian_head) * gamma_w
+    with np.errstate(invalid="ignore", divide="ignore"):
+        u_lin = np.where(z_bot > z_top, u_top + (z - z_top) * (u_bot - u_top) / (z_bot - z_top), u_bot)
+    u = np.select([zone == ZONE_CAPILLARY, zone == ZONE_TRANSITION, zone == ZONE_ARTESIAN, zone == ZONE_HYDROSTATIC],
+                  [-(water_depth - z) * gamma_w, u_lin, (z - water_depth + artesian_head) * gamma_w,
+                   (z - water_depth) * gamma_w], 0.0)
+    return zone, u, u_top, u_bot
+
+
+def profile_frame(prof, mode):
+    """Result table for one state (index into MODES)."""
+    types = np.array([lay["type"] for lay in prof["layers"]])[prof["layer"]]
+    return pd.DataFrame({
+        "Depth (z)": prof["z"],
+        "Soil Type": np.char.add(types.astype(str), prof["tag"].astype(str)),
+        "Total Stress (σ)": prof["sigma"][mode],
+        "Pore Pressure (u)": prof["u"][mode],
+        "Eff. Stress (σ')": prof["sig_eff"][mode],
+    })
+
+
+# =========================================================
+# STEP-BY-STEP LOG (built on demand)
+# =========================================================
+def profile_log(prof, mode):
+    """
+    Markdown/LaTeX calculation steps for one state. Formatting every point is
+    the expensive part of a profile, so this is only called when the log is
+    actually displayed.
+    """
+    z, li, sig, u = prof["z"], prof["layer"], prof["sigma"][mode], prof["u"][mode]
+    layers, wd, hc, gw, head = prof["layers"], prof["water_depth"], prof["hc"], prof["gamma_w"], prof["artesian_head"]
+    eff_wt = wd - hc
+    logs = []
+    for k in range(z.size):
+        lay = layers[li[k]]
+        first = k == 0 or li[k - 1] != li[k]
+        z_prev = lay["top"] if first else z[k - 1]
+        sig_prev = sig[k] if first else sig[k - 1]
+        dz = z[k] - z_prev
+        if dz > 0.0001:
+            wet = 0.5 * (z[k] + z_prev) > eff_wt
+            g_sym = "\\gamma_{sat}" if wet else "\\gamma_{dry}"
+            gam = lay["g_sat"] if wet else lay["g_dry"]
+            logs.append(f"**Layer {lay['id']} ({lay['type']}): {z_prev:.2f}m to {z[k]:.2f}m** (${g_sym}={gam}$)")
+            logs.append(f"$\\sigma = {sig_prev:.2f} + ({gam} \\times {dz:.2f}) = {sig[k]:.2f}$")
+
+        zone = prof["zone"][k]
+        if zone == ZONE_CAPILLARY:
+            u_text = f"-({wd} - {z[k]:.2f}) \\times {gw}"
+        elif zone == ZONE_TRANSITION:
+            u_t, u_b = prof["u_top"][k], prof["u_bot"][k]
+            u_text = (f"Linear: {u_t:.1f} + ({z[k]:.1f}-{lay['top']:.1f}) \\times "
+                      f"\\frac{{{u_b:.1f}-{u_t:.1f}}}{{{lay['bot']:.1f}-{lay['top']:.1f}}}")
+        elif zone == ZONE_ARTESIAN:
+            u_text = f"(({z[k]:.2f} - {wd}) + {head}) \\times {gw}"
+        elif zone == ZONE_HYDROSTATIC:
+            u_text = f"({z[k]:.2f} - {wd}) \\times {gw}"
+        else:
+            u_text = "0"
+        if prof["excess"][mode][k] > 0:
+            u_text += f" + {prof['surcharge']} (Excess)"
+
+        logs.append(f"**@ z={z[k]:.2f}m ({lay['type']}):**")
+        logs.append(f"$u = {u_text} = {u[k]:.2f}$")
+        logs.append(f"$\\sigma' = {sig[k]:.2f} - {u[k]:.2f} = \\mathbf{{{sig[k] - u[k]:.2f}}}$")
+        logs.append("---")
+    return logs
+
+
+# =========================================================
+# CONTINUOUS PROFILE OBJECT
+# =========================================================
+class StressProfile:
+    """
+    Piecewise-linear total stress, pore pressure and effective stress over
+    depth, stored at breakpoints. A depth may appear twice to represent a jump
+    (e.g. excess pore pressure switching on at a clay boundary). Queries use
+    searchsorted, so any depth or array of depths costs O(log n) per point;
+    beyond the end breakpoints the outer segments are extended linearly.
+    """
+
+    def __init__(self, z, sigma, u):
+        self.z = np.asarray(z, dtype=float)
+        self.values = {"sigma": np.asarray(sigma, dtype=float), "u": np.asarray(u, dtype=float)}
+        self.values["sigma_eff"] = self.values["sigma"] - self.values["u"]
+        dz = np.diff(self.z)
+        # Cumulative trapezoid integrals at the breakpoints (exact for linear pieces)
+        self._cum = {k: np.concatenate([[0.0], np.cumsum(0.5 * (v[1:] + v[:-1]) * dz)]) for k, v in self.values.items()}
+
+    @classmethod
+    def from_layers(cls, layers, water_depth, hc=0.0, surcharge=0.0, artesian_layer_id=0, artesian_head=0.0,
+                    gamma_w=9.81, mode=1):
+        """Profile of one state (index into MODES) for effective-stress-page layer dicts."""
+        prof = effective_stress_profiles(layers, water_depth, hc, surcharge, artesian_layer_id, artesian_head, gamma_w)
+        return cls.from_profiles(prof, mode)
+
+    @classmethod
+    def from_profiles(cls, prof, mode=1):
+        """Wrap one state of an `effective_stress_profiles` result."""
+        z, sigma, u = prof["z"], prof["sigma"][mode], prof["u"][mode]
+        # Pore pressure also jumps within a layer at the top of the capillary
+        # zone and at the water table (artesian zones): add the value just
+        # above as a duplicate breakpoint.
+        wd, li = prof["water_depth"], prof["layer"]
+        first = np.r_[True, li[1:] != li[:-1]]  # jumps at layer tops are already two points
+        k = np.flatnonzero(~first & np.isin(z, [wd - prof["hc"], wd]))
+        if k.size:
+            _, u_above, _, _ = _pore_pressure(z[k] - 1e-9, li[k], prof["layers"], wd, prof["hc"],
+                                              prof["artesian_layer_id"], prof["artesian_head"], prof["gamma_w"])
+            u_above = u_above + prof["excess"][mode][k]
+            jump = ~np.isclose(u_above, u[k])
+            k, u_above = k[jump], u_above[jump]
+            z, sigma, u = np.insert(z, k, z[k]), np.insert(sigma, k, sigma[k]), np.insert(u, k, u_above)
+        return cls(z, sigma, u)
+
+    def _segment(self, z, side):
+        k = np.searchsorted(self.z, z, side=side) - 1
+        return np.clip(k, 0, self.z.size - 2)
+
+    def value(self, name, z, side="right"):
+        """
+        Interpolated `name` ("sigma", "u" or "sigma_eff") at depth(s) z. At a
+        jump, side="right" gives the value just below and side="left" the value
+        just above.
+        """
+        z = np.asarray(z, dtype=float)
+        v = self.values[name]
+        if self.z.size == 1:
+            return np.full(z.shape, v[0]) if z.ndim else float(v[0])
+        k = self._segment(z, side)
+        z0, z1 = self.z[k], self.z[k + 1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            w = np.where(z1 > z0, (z - z0) / (z1 - z0), 0.0)
+        out = v[k] + w * (v[k + 1] - v[k])
+        return float(out) if out.ndim == 0 else out
+
+    def sigma(self, z, side="right"):
+        return self.value("sigma", z, side)
+
+    def u(self, z, side="right"):
+        return self.value("u", z, side)
+
+    def sigma_eff(self, z, side="right"):
+        return self.value("sigma_eff", z, side)
+
+    def integral(self, name, z1, z2):
+        """Exact integral of `name` from z1 to z2 (arrays broadcast), in kPa·m."""
+        def F(z):
+            z = np.asarray(z, dtype=float)
+            k = self._segment(z, "right")
+            return self._cum[name][k] + 0.5 * (self.values[name][k] + self.value(name, z)) * (z - self.z[k])
+        out = F(z2) - F(z1)
+        return float(out) if np.ndim(out) == 0 else out
+
+    def average(self, name, z1, z2):
+        """Depth-averaged `name` over [z1, z2]; the point value where z1 == z2."""
+        z1, z2 = np.asarray(z1, dtype=float), np.asarray(z2, dtype=float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out = np.where(z2 != z1, self.integral(name, z1, z2) / (z2 - z1), self.value(name, z1))
+        return float(out) if out.ndim == 0 else out
+
+
+# =========================================================
+# EXCAVATION HEAVE OVER AN ARTESIAN LAYER
+# =========================================================
+# Depths are from the original ground surface; z_base is the top of the
+# artesian layer and h_art its piezometric head above the surface. The
+# soil left between the excavation level and z_base resists the uplift
+# (z_base + h_art) gamma_w acting on its base.
+
+def plug_profile(h_clay, g_clay):
+    """Overburden of a uniform clay layer of thickness h_clay above the artesian layer."""
+    return StressProfile([0.0, h_clay], [0.0, g_clay * h_clay], [0.0, 0.0])
+
+
+def heave_fs(overburden, z_base, d_exc, h_art, gamma_w=9.81):
+    """
+    FS against base heave = plug weight / uplift for excavation depths d_exc
+    and heads h_art (arrays broadcast, e.g. heads[:, None] x depths[None, :]).
+    NaN once the excavation reaches z_base; inf where there is no uplift.
+    """
+    d, h = np.asarray(d_exc, dtype=float), np.asarray(h_art, dtype=float)
+    resist = overburden.sigma(z_base) - overburden.sigma(np.minimum(d, z_base))
+    uplift = (z_base + h) * gamma_w
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fs = np.where(d >= z_base, np.nan, np.where(uplift > 0, resist / uplift, np.inf))
+    return float(fs) if fs.ndim == 0 else fs
+
+
+def critical_excavation_depth(overburden, z_base, h_art, fs_target=1.0, gamma_w=9.81):
+    """
+    Deepest excavation with FS >= fs_target for each head in h_art, by brentq
+    on [0, z_base] (the plug weight falls monotonically with depth). NaN where
+    even the unexcavated ground is below the target.
+    """
+    from scipy.optimize import brentq
+
+    sig_base = overburden.sigma(z_base)
+
+    def solve(h):
+        uplift = (z_base + h) * gamma_w
+        if uplift <= 0:
+            return z_base
+        f = lambda d: sig_base - overburden.sigma(d) - fs_target * uplift
+        if f(0.0) < 0:
+            return np.nan
+        return brentq(f, 0.0, z_base, xtol=1e-6)
+
+    out = np.array([solve(h) for h in np.ravel(h_art)]).reshape(np.shape(h_art))
+    return float(out) if out.ndim == 0 else out
+
+
+def allowable_head(overburden, z_base, d_exc, fs_target=1.0, gamma_w=9.81):
+    """Largest artesian head above ground (m) with FS >= fs_target at depth d_exc (arrays broadcast)."""
+    d = np.asarray(d_exc, dtype=float)
+    resist = overburden.sigma(z_base) - overburden.sigma(np.minimum(d, z_base))
+    h = np.where(d >= z_base, np.nan, resist / (fs_target * gamma_w) - z_base)
+    return float(h) if h.ndim == 0 else h
+
+
+def required_drawdown(overburden, z_base, d_exc, h_art, fs_target=1.0, gamma_w=9.81):
+    """
+    Reduction of the artesian head (m) needed for FS = fs_target at depth
+    d_exc; zero where the excavation is already safe (arrays broadcast).
+    """
+    s = np.maximum(0.0, np.asarray(h_art, dtype=float) - allowable_head(overburden, z_base, d_exc, fs_target, gamma_w))
+    return float(s) if s.ndim == 0 else s
+
+
+# =========================================================
+# WATER-TABLE TIME SERIES
+# =========================================================
+# A fluctuating water table (piezometer log or seasonal / tidal function)
+# with a fixed capillary rise hc above it, drained surcharge and no
+# artesian layer. Stresses are evaluated on a depth x time grid.
+
+def water_level_function(t, mean_depth, seasonal_amp=0.0, seasonal_period=365.25, tidal_amp=0.0,
+                         tidal_period=12.42 / 24, phase=0.0):
+    """Water depth [m] at times t [days]: seasonal plus (semi-diurnal) tidal sine waves; positive amplitude = rise."""
+    t = np.asarray(t, dtype=float)
+    return (mean_depth - seasonal_amp * np.sin(2 * np.pi * t / seasonal_period + phase)
+            - tidal_amp * np.sin(2 * np.pi * t / tidal_period))
+
+
+def load_water_levels(source):
+    """Piezometer log from a CSV path or file-like object: first column time, second column water depth [m]."""
+    df = pd.read_csv(source)
+    t, wd = df.iloc[:, 0].to_numpy(dtype=float), df.iloc[:, 1].to_numpy(dtype=float)
+    keep = np.isfinite(t) & np.isfinite(wd)
+    order = np.argsort(t[keep], kind="stable")
+    return t[keep][order], wd[keep][order]
+
+
+def stress_history(layers, z, water_depth, hc=0.0, surcharge=0.0, gamma_w=9.81):
+    """
+    Total stress, pore pressure and effective stress, each (n_z, n_t), at
+    depths z for water depths water_depth (one per time). The overburden is
+    split into dry and saturated prefix sums of gamma dz, so
+    sigma(z) = S_dry(min(z, e)) + S_sat(z) - S_sat(min(z, e)) with e the top
+    of the capillary zone: no loop over depth or time.
+    """
+    bnd = np.concatenate([[layers[0]["top"]], [lay["bot"] for lay in layers]]).astype(float)
+    H = np.diff(bnd)
+    cum_dry = np.concatenate([[0.0], np.cumsum(H * [lay["g_dry"] for lay in layers])])
+    cum_sat = np.concatenate([[0.0], np.cumsum(H * [lay["g_sat"] for lay in layers])])
+
+    z = np.asarray(z, dtype=float)[:, None]
+    wd = np.asarray(water_depth, dtype=float)[None, :]
+    e = wd - hc
+    ze = np.minimum(z, np.maximum(e, bnd[0]))
+    sigma = surcharge + np.interp(ze, bnd, cum_dry) + np.interp(z, bnd, cum_sat) - np.interp(ze, bnd, cum_sat)
+    u = np.where(z >= wd, (z - wd) * gamma_w, np.where(z >= e, -(wd - z) * gamma_w, 0.0))
+    return sigma, u, sigma - u
+
+
+def turning_points(x):
+    """Indices of the first, the last and every local extreme of x (a plateau keeps its last point)."""
+    x = np.asarray(x, dtype=float)
+    if x.size < 3:
+        return np.arange(x.size)
+    step = np.sign(np.diff(x))
+    moving = np.flatnonzero(step)
+    s = step[moving]
+    turns = moving[1:][s[1:] != s[:-1]]
+    return np.unique(np.concatenate([[0], turns, [x.size - 1]]))
+
+
+def stress_envelopes(layers, z, water_depth, hc=0.0, surcharge=0.0, gamma_w=9.81, tol=0.0, max_elements=2**22):
+    """
+    Min / max effective stress and the number of stress reversals at every
+    depth over the whole water-level series, at full resolution.
+
+    Since gamma_sat - gamma_dry = n gamma_w <= gamma_w, sigma' at a fixed depth
+    never decreases as the water table falls, except for the loss of suction
+    when the capillary zone drops below it (water depth = z + hc). Its
+    extremes and reversals can therefore only occur at turning points of the
+    water level or next to those crossings: only these readings are evaluated
+    (all readings if a layer breaks the bound). The depth x reading grid is
+    processed in blocks of at most `max_elements`.
+    Reversals are counted with a dead band: a change of direction counts once
+    sigma' has moved more than `tol` [kPa] back from its last extreme.
+    Returns a dict of per-depth arrays plus the reading indices of the extremes.
+    """
+    z = np.asarray(z, dtype=float)
+    wd = np.asarray(water_depth, dtype=float)
+    monotone = all(lay["g_sat"] - lay["g_dry"] <= gamma_w + 1e-9 for lay in layers)
+    if not monotone:
+        idx = np.arange(wd.size)
+    else:
+        idx = turning_points(wd)
+        if hc > 0 and wd.size > 1:
+            band = np.searchsorted(np.unique(z + hc), wd)
+            cross = np.flatnonzero(band[1:] != band[:-1])
+            idx = np.unique(np.concatenate([idx, cross, cross + 1]))
+
+    n_z = z.size
+    s_min, s_max = np.full(n_z, np.inf), np.full(n_z, -np.inf)
+    i_min, i_max = np.zeros(n_z, dtype=int), np.zeros(n_z, dtype=int)
+    anchor, direction, reversals = None, np.zeros(n_z), np.zeros(n_z, dtype=int)
+    rows = np.arange(n_z)
+    block = max(1, max_elements // max(n_z, 1))
+    for k0 in range(0, idx.size, block):
+        ii = idx[k0:k0 + block]
+        se = stress_history(layers, z, wd[ii], hc, surcharge, gamma_w)[2]
+
+        j = np.argmin(se, axis=1)
+        lower = se[rows, j] < s_min
+        s_min[lower], i_min[lower] = se[rows, j][lower], ii[j[lower]]
+        j = np.argmax(se, axis=1)
+        higher = se[rows, j] > s_max
+        s_max[higher], i_max[higher] = se[rows, j][higher], ii[j[higher]]
+
+        # Dead-band reversal counter, sequential in time but vectorized over depth
+        if anchor is None:
+            anchor = se[:, 0].copy()
+        for col in se.T:
+            move = col - anchor
+            turn = ((direction >= 0) & (move < -tol)) | ((direction <= 0) & (move > tol))
+            reversals += turn & (direction != 0)
+            direction = np.where(turn, np.sign(move), direction)
+            anchor = np.where(direction * move > 0, col, anchor)
+
+    return {"z": z, "sig_eff_min": s_min, "sig_eff_max": s_max, "range": s_max - s_min,
+            "i_min": i_min, "i_max": i_max, "reversals": reversals, "cycles": reversals / 2.0,
+            "n_readings": wd.size, "n_evaluated": idx.size}